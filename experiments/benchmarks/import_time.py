@@ -0,0 +1,76 @@
+"""
+Measures the import time of experiments.globals and of each searcher with
+`python -X importtime`, and checks it against a budget. Each module is
+imported in a fresh interpreter, so its time includes all of its dependencies.
+
+Run from the repository root with:
+
+    python -m experiments.benchmarks.import_time
+"""
+import re
+import sys
+import subprocess
+from argparse import ArgumentParser
+from typing import Optional
+
+from experiments.globals import ALL_SEARCHERS
+
+# budget in seconds of the cumulative import time of each module
+IMPORT_TIME_BUDGETS = {
+    "experiments.globals": 1.0,
+    "CART": 2.0,
+    "DL8.5": 2.0,
+    "GOSDT": 2.0,
+    "MAPTree": 0.5,
+    "MCMC": 3.0,
+    "SMC": 3.0,
+}
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s*(\d+)\s*\|\s*(\d+)\s*\|\s*(\S+)")
+
+
+def measure_import_time(module: str) -> Optional[float]:
+    """
+    Returns the cumulative import time of module in seconds, or None if it
+    cannot be imported, e.g. because an optional dependency is missing.
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True)
+    if process.returncode != 0:
+        return None
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match is not None and match.group(3) == module:
+            return int(match.group(2)) / 1e6
+    return None
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('--repeats', '-r', default=5, type=int,
+                        help="number of measurements of each module, of which the fastest is reported")
+    args = parser.parse_args()
+
+    modules = {"experiments.globals": "experiments.globals"}
+    modules.update({name: searcher.entry_point.split(':')[0] for name, searcher in ALL_SEARCHERS.items()})
+
+    over_budget = []
+    print(f"{'module':<22}{'import time (s)':>18}{'budget (s)':>12}")
+    for name, module in modules.items():
+        times = [measure_import_time(module) for _ in range(args.repeats)]
+        if any(time is None for time in times):
+            print(f"{name:<22}{'unavailable':>18}{IMPORT_TIME_BUDGETS[name]:>12.2f}")
+            continue
+        time = min(times)
+        print(f"{name:<22}{time:>18.3f}{IMPORT_TIME_BUDGETS[name]:>12.2f}")
+        if time > IMPORT_TIME_BUDGETS[name]:
+            over_budget.append(name)
+
+    if over_budget:
+        print(f"Over budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Measures the candidate split search of the tree_smc baselines (SMC and MCMC),
+find_valid_dimensions and no_valid_split_exists, on the CP4IM datasets of
+fig2. Each call is timed on the rows of a random node, sampled as a random
+subset of the training rows.
+
+Run from the repository root, after setup_data.py, with:
+
+    python -m experiments.benchmarks.tree_smc_splits
+"""
+import os
+import time
+import numpy as np
+from argparse import ArgumentParser
+
+from experiments.globals import CP4IM_DATASET_NAMES, get_cp4im_data_path, get_full_cp4im_dataset
+from experiments.searchers.tree_smc.src.tree_utils import Tree, precompute, no_valid_split_exists, \
+        parser_add_common_options, parser_add_smc_options
+
+NUM_NODES = 1000
+SEED = 42
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('--datasets', '-d', nargs='*', default=CP4IM_DATASET_NAMES)
+    parser.add_argument('--num_nodes', '-n', default=NUM_NODES, type=int,
+                        help="number of random nodes each function is timed on")
+    args = parser.parse_args()
+
+    settings = parser_add_smc_options(parser_add_common_options()).parse_args(
+        ['--n_islands', '1', '--verbose', '0'])[0]
+    rng = np.random.default_rng(SEED)
+
+    print(f"{'dataset':<20}{'samples':>9}{'features':>10}"
+          f"{'find_valid_dimensions (us)':>28}{'no_valid_split_exists (us)':>28}")
+    for dataset in args.datasets:
+        if not os.path.exists(get_cp4im_data_path(dataset)):
+            print(f"{dataset:<20}{'unavailable':>19}")
+            continue
+        X, y = get_full_cp4im_dataset(dataset)
+        data = {
+            'x_train': X,
+            'y_train': y,
+            'n_train': X.shape[0],
+            'n_dim': X.shape[1],
+            'n_class': 2,
+        }
+        _, cache, _ = precompute(data, settings)
+        tree = Tree()
+        nodes = [
+            rng.choice(X.shape[0], size=rng.integers(2, X.shape[0] + 1), replace=False)
+            for _ in range(args.num_nodes)
+        ]
+
+        start = time.perf_counter()
+        for train_ids in nodes:
+            tree.find_valid_dimensions(data, cache, train_ids, settings)
+        find_time = (time.perf_counter() - start) / len(nodes)
+
+        start = time.perf_counter()
+        for train_ids in nodes:
+            no_valid_split_exists(data, cache, train_ids, settings)
+        exists_time = (time.perf_counter() - start) / len(nodes)
+
+        print(f"{dataset:<20}{X.shape[0]:>9}{X.shape[1]:>10}{find_time * 1e6:>28.1f}{exists_time * 1e6:>28.1f}")
+
+
+if __name__ == '__main__':
+    main()
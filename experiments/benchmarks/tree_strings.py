@@ -0,0 +1,81 @@
+"""
+Measures parsing, serializing and pickling BinaryClassificationTree with 10^4
+internal nodes, for a random tree and for a degenerate tree whose internal
+nodes form a single path, and checks that both round-trip and that the depth
+of the degenerate tree is its number of internal nodes.
+
+Run from the repository root with:
+
+    python -m experiments.benchmarks.tree_strings
+"""
+import time
+import pickle
+import numpy as np
+from argparse import ArgumentParser
+
+from experiments.searchers.binary_classification_tree import BinaryClassificationTree
+
+NUM_INTERNAL_NODES = 10 ** 4
+NUM_FEATURES = 100
+SEED = 42
+
+
+def random_tree_string(num_internal_nodes: int, rng: np.random.Generator) -> str:
+    # each internal node sends a uniform random number of the remaining
+    # internal nodes to its left subtree; built with an explicit stack
+    pieces = []
+    stack = [num_internal_nodes]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            pieces.append(item)
+        elif item > 0:
+            num_left = int(rng.integers(item))
+            stack += [")", item - 1 - num_left, str(rng.integers(NUM_FEATURES)), num_left]
+            pieces.append("(")
+    return "".join(pieces)
+
+
+def degenerate_tree_string(num_internal_nodes: int, rng: np.random.Generator) -> str:
+    features = [str(f) for f in rng.integers(NUM_FEATURES, size=num_internal_nodes)]
+    return "".join(f"({f}" for f in features) + ")" * num_internal_nodes
+
+
+def time_best(function, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('--repeats', '-r', default=5, type=int,
+                        help="number of measurements, of which the fastest is reported")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(SEED)
+    print(f"{'tree':<12}{'nodes':>8}{'parse (s)':>12}{'str (s)':>12}{'pickle (s)':>12}")
+    for name, tree_string in [
+        ("random", random_tree_string(NUM_INTERNAL_NODES, rng)),
+        ("degenerate", degenerate_tree_string(NUM_INTERNAL_NODES, rng)),
+    ]:
+        tree = BinaryClassificationTree.parse(tree_string)
+        assert str(tree) == tree_string
+        for i, leaf in enumerate(tree.get_all_leaves()):
+            leaf.label_counts = [i, 1]
+        copy = pickle.loads(pickle.dumps(tree))
+        assert str(copy) == tree_string
+        assert all(leaf.label_counts == [i, 1] for i, leaf in enumerate(copy.get_all_leaves()))
+        if name == "degenerate":
+            assert tree.depth() == NUM_INTERNAL_NODES
+        parse_time = time_best(lambda: BinaryClassificationTree.parse(tree_string), args.repeats)
+        str_time = time_best(lambda: str(tree), args.repeats)
+        pickle_time = time_best(lambda: pickle.loads(pickle.dumps(tree)), args.repeats)
+        print(f"{name:<12}{tree.size():>8}{parse_time:>12.4f}{str_time:>12.4f}{pickle_time:>12.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+# name of the directory next to each source file holding its cached version
+CACHE_DIR_NAME = ".cache"
+
+# bytes read at a time when hashing a source file
+CHECKSUM_CHUNK_SIZE = 2 ** 20
+
+
+def _checksum(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(CHECKSUM_CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _write_atomic(path: str, write):
+    # concurrent experiment processes may convert the same file at once, so
+    # every file is written under a unique name and then moved into place
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as fp:
+            write(fp)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def get_cache_paths(path: str):
+    directory, name = os.path.split(path)
+    stem = os.path.splitext(name)[0]
+    cache_dir = os.path.join(directory, CACHE_DIR_NAME)
+    return os.path.join(cache_dir, f"{stem}.npy"), os.path.join(cache_dir, f"{stem}.json")
+
+
+def load_cached_binary_data(path: str) -> np.ndarray:
+    """
+    Loads a whitespace-separated text file of binary values as a read-only
+    memory-mapped uint8 array. The file is parsed once and converted to a .npy
+    file next to it, along with the SHA-256 checksum of the source; later loads
+    map the .npy file without parsing or copying it. The conversion is redone
+    whenever the checksum of the source changes, and the checksum is only
+    recomputed when the source's size or modification time changes.
+    """
+    assert os.path.exists(path)
+    data_path, meta_path = get_cache_paths(path)
+    stat = os.stat(path)
+
+    meta = None
+    if os.path.exists(data_path) and os.path.exists(meta_path):
+        with open(meta_path) as fp:
+            meta = json.load(fp)
+        if meta['size'] != stat.st_size or meta['mtime_ns'] != stat.st_mtime_ns:
+            checksum = _checksum(path)
+            meta = meta if meta['sha256'] == checksum else None
+            if meta is not None:
+                # the source was only touched, so only its metadata is updated
+                meta.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                _write_atomic(meta_path, lambda fp: fp.write(json.dumps(meta).encode()))
+
+    if meta is None:
+        binary_data = np.loadtxt(path, delimiter=' ', dtype=np.int32, ndmin=2)
+        assert np.all((binary_data == 0) | (binary_data == 1))
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        _write_atomic(data_path, lambda fp: np.save(fp, binary_data.astype(np.uint8)))
+        meta = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': _checksum(path)}
+        _write_atomic(meta_path, lambda fp: fp.write(json.dumps(meta).encode()))
+
+    return np.load(data_path, mmap_mode='r')
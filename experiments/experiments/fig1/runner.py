@@ -1,56 +1,55 @@
-import pandas as pd
+from typing import List
 
-from experiments.globals import get_stratified_k_folds_cp4im_dataset, run_search, save_results
+from experiments.globals import get_stratified_k_folds_cp4im_dataset
+from experiments.scheduler import Task, TaskGroup, run_tasks
 from .constants import SEARCHERS_AND_PARAMS_LISTS, RHO
 
 
-def run(dataset: str):
-    print(f"Performance comparison on CP4IM dataset: {dataset}")
-    print("=====================================================")
-
-    results = []
+def get_tasks(dataset: str) -> List[Task]:
+    group = TaskGroup("fig1", dataset)
     for i, fold in enumerate(get_stratified_k_folds_cp4im_dataset(dataset)):
-        print(f"Fold: {i}")
         X_train, y_train, X_test, y_test = fold
         for searcher, params_list in SEARCHERS_AND_PARAMS_LISTS:
-            print(f"Searcher: {searcher}")
             for j, params in enumerate(params_list):
-                print(f"Params: {params}")
-
-                result = run_search(searcher, X_train, y_train, **params)
-                if result is None:
-                    print("Run Failed!!!")
-                    continue
-
-                tree = result['tree']
-                time = result['time']
-                timeout = result['timeout']
-
-                tree.fit(X_train, y_train)
-
-                # add results to results queue
-                train_acc = (tree.predict(X_train) == y_train).sum() / len(y_train)
-                test_acc = (tree.predict(X_test) == y_test).sum() / len(y_test)
-                train_sll = tree.log_likelihood(X_train, y_train, rho=RHO) / len(y_train)
-                test_sll = tree.log_likelihood(X_test, y_test, rho=RHO) / len(y_test)
-                size = tree.size()
-
-                print(f"Timed Out: {timeout}")
-                print(f"Test Accuracy: {test_acc}")
-                print(f"Test SLL: {test_sll}")
-
-                results.append({
-                    'searcher': searcher,
-                    'params_id': j,
-                    'fold': i,
-                    'tree': str(tree),
-                    'time': time,
-                    'train_acc': train_acc,
-                    'test_acc': test_acc,
-                    'train_sll': train_sll,
-                    'test_sll': test_sll,
-                    'size': size,
-                    'timeout': timeout,
-                })
-
-    save_results(pd.DataFrame(results), "fig1", dataset)
+                def process(result, searcher=searcher, params=params, j=j, i=i, fold=fold):
+                    X_train, y_train, X_test, y_test = fold
+                    tree = result['tree']
+                    time = result['time']
+                    timeout = result['timeout']
+
+                    tree.fit(X_train, y_train)
+
+                    # add results to results queue
+                    train_acc = (tree.predict(X_train) == y_train).sum() / len(y_train)
+                    test_acc = (tree.predict(X_test) == y_test).sum() / len(y_test)
+                    train_sll = tree.log_likelihood(X_train, y_train, rho=RHO) / len(y_train)
+                    test_sll = tree.log_likelihood(X_test, y_test, rho=RHO) / len(y_test)
+                    size = tree.size()
+
+                    print(f"{dataset} fold {i} {searcher} {params}: "
+                          f"timed out: {timeout}, test accuracy: {test_acc}, test SLL: {test_sll}")
+
+                    return {
+                        'searcher': searcher,
+                        'params_id': j,
+                        'fold': i,
+                        'tree': str(tree),
+                        'time': time,
+                        'train_acc': train_acc,
+                        'test_acc': test_acc,
+                        'train_sll': train_sll,
+                        'test_sll': test_sll,
+                        'size': size,
+                        'timeout': timeout,
+                        'overhead': result['overhead'],
+                    }
+
+                group.add(searcher, (X_train, y_train), params, process, {'fold': i})
+    return group.tasks
+
+
+def run(dataset: str, num_cpus: int = 1, memory_budget: float = None):
+    print(f"Performance comparison on CP4IM dataset: {dataset}")
+    print("=====================================================")
+
+    run_tasks(get_tasks(dataset), num_cpus, memory_budget)
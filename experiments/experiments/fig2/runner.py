@@ -1,63 +1,59 @@
-import pandas as pd
 from math import isclose
+from typing import List
 
-from experiments.globals import get_full_cp4im_dataset, run_search, save_results
+from experiments.globals import get_full_cp4im_dataset
+from experiments.scheduler import Task, TaskGroup, run_tasks
 from .constants import SEARCHERS_AND_PARAMS_LISTS, POSTERIOR, RANDOM_SEARCHERS, RANDOM_SEARCHER_SEEDS
 
 
-def run(dataset: str):
-    print(f"Speed comparison on CP4IM dataset: {dataset}")
-    print("=====================================================")
-
+def get_tasks(dataset: str) -> List[Task]:
     data = get_full_cp4im_dataset(dataset)
     X, y = data
 
-    results = []
-
+    group = TaskGroup("fig2", dataset)
     for searcher, params_list in SEARCHERS_AND_PARAMS_LISTS:
-        print(f"Searcher: {searcher}")
         for j, params in enumerate(params_list):
-            print(f"Params: {params}")
             for k, seed in enumerate(RANDOM_SEARCHER_SEEDS):
                 if searcher not in RANDOM_SEARCHERS and k > 0:
                     continue
 
                 if searcher in RANDOM_SEARCHERS:
-                    print(f"Seed: {seed}")
-                    params['seed'] = seed
+                    params = {**params, 'seed': seed}
 
-                result = run_search(searcher, X, y, **params)
-                if result is None:
-                    print("Run Failed!!!")
-                    continue
+                def process(result, searcher=searcher, j=j, k=k, params=params):
+                    tree = result['tree']
+                    time = result['time']
+                    tree.fit(X, y)
+                    size = tree.size()
+
+                    post = tree.log_posterior(X, y, **POSTERIOR)
+                    best_post = 0.0
 
-                tree = result['tree']
-                time = result['time']
-                tree.fit(X, y)
-                size = tree.size()
+                    if "lower_bound" in result:
+                        best_post = -result["lower_bound"]
+                    if "upper_bound" in result:
+                        assert(isclose(post, -result["upper_bound"]))
 
-                post = tree.log_posterior(X, y, **POSTERIOR)
-                best_post = 0.0
+                    print(f"{dataset} {searcher} {params}: time: {time}, log posterior: {post}")
 
-                if "lower_bound" in result:
-                    best_post = -result["lower_bound"]
-                if "upper_bound" in result:
-                    assert(isclose(post, -result["upper_bound"]))
+                    return {
+                        'searcher': searcher,
+                        'params_id': j,
+                        'tree': str(tree),
+                        'time': time,
+                        'post': post,
+                        'best_post': best_post,
+                        'size': size,
+                        'seed': k,
+                        'overhead': result['overhead'],
+                    }
 
-                print(f"Time: {time}")
-                print(f"Log Posterior: {post}")
+                group.add(searcher, (X, y), params, process)
+    return group.tasks
 
-                results.append({
-                    'searcher': searcher,
-                    'params_id': j,
-                    'tree': str(tree),
-                    'time': time,
-                    'post': post,
-                    'best_post': best_post,
-                    'size': size,
-                    'seed': k,
-                })
 
-    save_results(pd.DataFrame(results), "fig2", dataset)
+def run(dataset: str, num_cpus: int = 1, memory_budget: float = None):
+    print(f"Speed comparison on CP4IM dataset: {dataset}")
+    print("=====================================================")
 
-        
\ No newline at end of file
+    run_tasks(get_tasks(dataset), num_cpus, memory_budget)
@@ -1,57 +1,58 @@
-import pandas as pd
+from typing import List
 
-from experiments.globals import get_synth_data_samples, run_search, save_results
+from experiments.globals import get_synth_data_samples
+from experiments.scheduler import Task, TaskGroup, run_tasks
 from .constants import SEARCHERS_AND_PARAMS_LISTS, NOISE_VALUES, SAMPLE_SIZE_VALUES, RHO
 
 
-def run(tree_id: int):
-    print(f"Performance comparison on synthetic tree-generated data for tree {tree_id}")
-    print("=====================================================")
-
-    results = []
+def get_tasks(tree_id: int) -> List[Task]:
+    group = TaskGroup("fig3", f"tree{tree_id}")
     for i, sample_size in enumerate(SAMPLE_SIZE_VALUES):
-        print(f"Sample Size: {sample_size}")
         for j, noise in enumerate(NOISE_VALUES):
-            print(f"Noise: {noise}")
             data = get_synth_data_samples(tree_id, sample_size, noise)
             X_train, y_train, X_test, y_test = data
             for searcher, params_list in SEARCHERS_AND_PARAMS_LISTS:
-                print(f"Searcher: {searcher}")
                 for k, params in enumerate(params_list):
-                    print(f"Params: {params}")
-
-                    result = run_search(searcher, X_train, y_train, **params)
-                    if result is None:
-                        print("Run Failed!!!")
-                        continue
-
-                    tree = result['tree']
-                    time = result['time']
-
-                    tree.fit(X_train, y_train)
-
-                    # add results to results queue
-                    train_acc = (tree.predict(X_train) == y_train).sum() / len(y_train)
-                    test_acc = (tree.predict(X_test) == y_test).sum() / len(y_test)
-                    train_sll = tree.log_likelihood(X_train, y_train, rho=RHO) / len(y_train)
-                    test_sll = tree.log_likelihood(X_test, y_test, rho=RHO) / len(y_test)
-                    size = tree.size()
-
-                    print(f"Test Acc: {test_acc}")
-
-                    results.append({
-                        'sample_size_id': i,
-                        'noise_id': j,
-                        'tree_data_id': tree_id,
-                        'searcher': searcher,
-                        'params_id': k,
-                        'tree': str(tree),
-                        'time': time,
-                        'train_acc': train_acc,
-                        'test_acc': test_acc,
-                        'train_sll': train_sll,
-                        'test_sll': test_sll,
-                        'size': size,
-                    })
-
-    save_results(pd.DataFrame(results), "fig3", f"tree{tree_id}")
+                    def process(result, searcher=searcher, params=params, i=i, j=j, k=k, data=data):
+                        X_train, y_train, X_test, y_test = data
+                        tree = result['tree']
+                        time = result['time']
+
+                        tree.fit(X_train, y_train)
+
+                        # add results to results queue
+                        train_acc = (tree.predict(X_train) == y_train).sum() / len(y_train)
+                        test_acc = (tree.predict(X_test) == y_test).sum() / len(y_test)
+                        train_sll = tree.log_likelihood(X_train, y_train, rho=RHO) / len(y_train)
+                        test_sll = tree.log_likelihood(X_test, y_test, rho=RHO) / len(y_test)
+                        size = tree.size()
+
+                        print(f"tree {tree_id} sample size {SAMPLE_SIZE_VALUES[i]} noise {NOISE_VALUES[j]} "
+                              f"{searcher} {params}: test accuracy: {test_acc}")
+
+                        return {
+                            'sample_size_id': i,
+                            'noise_id': j,
+                            'tree_data_id': tree_id,
+                            'searcher': searcher,
+                            'params_id': k,
+                            'tree': str(tree),
+                            'time': time,
+                            'train_acc': train_acc,
+                            'test_acc': test_acc,
+                            'train_sll': train_sll,
+                            'test_sll': test_sll,
+                            'size': size,
+                            'overhead': result['overhead'],
+                        }
+
+                    group.add(searcher, (X_train, y_train), params, process,
+                              {'sample_size': sample_size, 'noise': noise})
+    return group.tasks
+
+
+def run(tree_id: int, num_cpus: int = 1, memory_budget: float = None):
+    print(f"Performance comparison on synthetic tree-generated data for tree {tree_id}")
+    print("=====================================================")
+
+    run_tasks(get_tasks(tree_id), num_cpus, memory_budget)
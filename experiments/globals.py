@@ -1,18 +1,19 @@
 import os
-import pandas as pd
+import atexit
+import importlib
+import subprocess
 import numpy as np
-from multiprocessing import Process, Queue, TimeoutError
-from queue import Empty
 from datetime import datetime
+from functools import lru_cache
 from glob import glob
-from sklearn.model_selection import StratifiedKFold
+from typing import TYPE_CHECKING, Any, Callable
 
-from experiments.searchers.maptree import run as maptree_search
-from experiments.searchers.mcmc import run as mcmc_search
-from experiments.searchers.smc import run as smc_search
-from experiments.searchers.cart import run as cart_search
-from experiments.searchers.dl85 import run as dl85_search
-from experiments.searchers.gosdt import run as gosdt_search
+from experiments.worker_pool import WorkerPool
+from experiments.results_store import ResultsStore
+from experiments.dataset_cache import load_cached_binary_data
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 DIR_DATA_CP4IM = os.path.join("data", "cp4im")
 DIR_DATA_SYNTH = os.path.join("data", "synth")
@@ -39,6 +40,10 @@ CP4IM_DATASET_NAMES = sorted([
 
 DIR_RESULTS_DATA = os.path.join("experiments", "results", "data")
 DIR_RESULTS_FIGS = os.path.join("experiments", "results", "figures")
+DIR_RESULTS_STORE = os.path.join(DIR_RESULTS_DATA, "store")
+# name of the results store file of a process that runs the jobs of all
+# experiments, rather than one job of a cluster array
+RESULTS_STORE_NAME_ALL_JOBS = "all"
 TIMESTAMP_FORMAT = "%Y-%m-%d-%H:%M:%S"
 
 CP4IM_NUM_FOLDS = 10
@@ -53,71 +58,82 @@ SEED_SYNTH_TREE_GENERATOR = 42
 SEED_SYNTH_DATA_GENERATOR = 21
 
 
-def search_target_decorator(search, queue: Queue):
-    def search_target_func(*args, **kwargs):
-        queue.put(search(*args, **kwargs))
-    return search_target_func
-
+class LazySearcher:
+    """
+    Searcher entry point, given as "module:function", that is only imported
+    when first called. Only the entry point is pickled, so a worker process
+    imports the modules of the searchers it actually runs.
+    """
+    def __init__(self, entry_point: str):
+        self.entry_point = entry_point
+        self._function = None
 
-# need to create actual functions in order to pickle :(
-def maptree_search_wrapper(queue: Queue, *args, **kwargs):
-    return search_target_decorator(maptree_search, queue)(*args, **kwargs)
+    def load(self) -> Callable[..., Any]:
+        if self._function is None:
+            module, function = self.entry_point.split(':')
+            self._function = getattr(importlib.import_module(module), function)
+        return self._function
 
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
 
-def mcmc_search_wrapper(queue: Queue, *args, **kwargs):
-    return search_target_decorator(mcmc_search, queue)(*args, **kwargs)
+    def __getstate__(self):
+        return {'entry_point': self.entry_point, '_function': None}
 
 
-def smc_search_wrapper(queue: Queue, *args, **kwargs):
-    return search_target_decorator(smc_search, queue)(*args, **kwargs)
-
+ALL_SEARCHERS = {
+    "CART": LazySearcher("experiments.searchers.cart:run"),
+    "DL8.5": LazySearcher("experiments.searchers.dl85:run"),
+    "GOSDT": LazySearcher("experiments.searchers.gosdt:run"),
+    "MAPTree": LazySearcher("experiments.searchers.maptree:run"),
+    "MCMC": LazySearcher("experiments.searchers.mcmc:run"),
+    "SMC": LazySearcher("experiments.searchers.smc:run"),
+}
 
-def cart_search_wrapper(queue: Queue, *args, **kwargs):
-    return search_target_decorator(cart_search, queue)(*args, **kwargs)
+_worker_pool = None
 
 
-def dl85_search_wrapper(queue: Queue, *args, **kwargs):
-    return search_target_decorator(dl85_search, queue)(*args, **kwargs)
+def limit_worker_threads():
+    # searchers are single-threaded, so concurrent workers must not each start
+    # a BLAS thread per core
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
 
 
-def gosdt_search_wrapper(queue: Queue, *args, **kwargs):
-    return search_target_decorator(gosdt_search, queue)(*args, **kwargs)
+def get_worker_pool(num_workers: int = 1) -> WorkerPool:
+    # the pool is created on first use and reused by every later run that
+    # needs at most as many workers
+    global _worker_pool
+    if _worker_pool is not None and _worker_pool.num_workers < num_workers:
+        close_worker_pool()
+    if _worker_pool is None:
+        _worker_pool = WorkerPool(ALL_SEARCHERS, num_workers, limit_worker_threads)
+        atexit.register(close_worker_pool)
+    return _worker_pool
 
 
-ALL_SEARCHERS = {
-    "CART": cart_search_wrapper,
-    "DL8.5": dl85_search_wrapper,
-    "GOSDT": gosdt_search_wrapper,
-    "MAPTree": maptree_search_wrapper,
-    "MCMC": mcmc_search_wrapper,
-    "SMC": smc_search_wrapper,
-}
+def close_worker_pool():
+    global _worker_pool
+    if _worker_pool is not None:
+        _worker_pool.close()
+        _worker_pool = None
 
 
 def run_search(searcher: str, *args, **kwargs):
     if searcher not in ALL_SEARCHERS:
         raise ValueError(f"{searcher} is not a valid searcher")
 
-    queue = Queue()
-    p = Process(target=ALL_SEARCHERS[searcher], args=(queue,) + args, kwargs=kwargs)
-
-    process_timeout = kwargs['time_limit'] * 2 if 'time_limit' in kwargs else None
-    p.start()
-    result = None
-    try:
-        result = queue.get(timeout=process_timeout)
-        p.join(timeout=5)  # give some time for a nice close
-    except (TimeoutError, Empty):
-        print("Process timed out")
-    finally:
-        p.close()
-        return result
+    time_limit = kwargs.get('time_limit', -1)
+    process_timeout = time_limit * 2 if time_limit > 0 else None
+    return get_worker_pool().run(searcher, *args, timeout=process_timeout, **kwargs)
 
 
 def load_binary_data(path):
-    assert os.path.exists(path)
-    binary_data = np.loadtxt(path, delimiter=' ', dtype=np.int32)
-    assert np.all((binary_data == 0) | (binary_data == 1))
+    # X and y are read-only views into the memory-mapped cached dataset
+    binary_data = load_cached_binary_data(path)
     X = binary_data[:, :-1]
     y = binary_data[:, -1]
     return X, y
@@ -134,6 +150,8 @@ def get_full_cp4im_dataset(dataset: str):
 
 
 def get_stratified_k_folds_cp4im_dataset(dataset: str, k: int = CP4IM_NUM_FOLDS):
+    # sklearn is only imported by the experiments that split folds
+    from sklearn.model_selection import StratifiedKFold
     file = get_cp4im_data_path(dataset)
     X, y = load_binary_data(file)
     skf = StratifiedKFold(n_splits=k, shuffle=True, random_state=SEED_CP4IM_STRATIFIED_FOLD_CONSTRUCTOR)
@@ -153,30 +171,52 @@ def get_synth_data_samples(tree_id: int, sample_size: int, noise: float):
     X_train, y_train = load_binary_data(path_train)
     X_test, y_test = load_binary_data(path_test)
 
-    # apply noise to the training data
+    # apply noise to a copy of the training labels
     rng = np.random.default_rng(SEED_SYNTH_DATA_GENERATOR)
     flip = rng.random((SYNTH_NUM_TREES, SYNTH_TOTAL_SAMPLES_PER_TREE)) < noise
-    y_train ^= flip[tree_id]
+    y_train = y_train ^ flip[tree_id]
 
     return X_train[:sample_size], y_train[:sample_size], X_test, y_test
 
 
-def save_results(results: pd.DataFrame, experiment: str, dataset: str):
-    df = pd.DataFrame(results)
-    timestamp = datetime.now().strftime(TIMESTAMP_FORMAT)
-    dir_dataset_results = os.path.join(DIR_RESULTS_DATA, experiment, dataset)
-    if not os.path.exists(dir_dataset_results):
-        os.makedirs(dir_dataset_results)
-
-    file = os.path.join(dir_dataset_results, f"results-{timestamp}.csv")
-    df.to_csv(file)
-    print(f"Saved results for experiment {experiment} on dataset {dataset} to file {file}")
+_results_store = None
 
 
-def get_latest_results(experiment: str, dataset: str) -> pd.DataFrame:
+@lru_cache(maxsize=None)
+def get_code_version() -> str:
+    # git is only run by the processes that store results, and only once
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def get_results_store(name: str = None) -> ResultsStore:
+    # the store is opened on first use under the given name, and reopened if
+    # a later call names another one
+    global _results_store
+    name = name or (_results_store.name if _results_store is not None else RESULTS_STORE_NAME_ALL_JOBS)
+    if _results_store is not None and _results_store.name != name:
+        _results_store.close()
+        _results_store = None
+    if _results_store is None:
+        _results_store = ResultsStore(DIR_RESULTS_STORE, name)
+    return _results_store
+
+
+def get_latest_results(experiment: str, dataset: str) -> 'pd.DataFrame':
+    # pandas is only imported by the plotters that read results
+    import pandas as pd
+    results = get_results_store().get_latest(experiment, dataset)
+    if len(results) > 0:
+        return results
+
+    # results saved before the results store are read from their CSV files
     results_dir = os.path.join(DIR_RESULTS_DATA, experiment, dataset)
     if not os.path.exists(results_dir):
-        raise ValueError(f"Results directory does not exist: {results_dir}")
+        raise ValueError(f"No results for experiment {experiment} on dataset {dataset}")
 
     results_files = [
         os.path.basename(f) for f in
@@ -188,5 +228,3 @@ def get_latest_results(experiment: str, dataset: str) -> pd.DataFrame:
     ]
     most_recent_results_file = results_files[timestamps.index(max(timestamps))]
     return pd.read_csv(os.path.join(results_dir, most_recent_results_file))
-
-
@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from glob import glob
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _to_json(value: Dict[str, Any]) -> str:
+    # numpy scalars are converted to the python scalars they wrap
+    return json.dumps(value, sort_keys=True, default=lambda o: o.item() if hasattr(o, 'item') else str(o))
+
+
+# seconds a write waits for another connection to the same file to finish
+BUSY_TIMEOUT = 60
+
+
+class ResultsStore:
+    """
+    SQLite store of experiment results. Every run is stored as soon as it
+    completes, keyed by a hash of its experiment, dataset, configuration (e.g.
+    searcher, params and data slice) and the code version, so interrupted
+    experiments can skip the runs they already completed.
+
+    Each process writing results, e.g. each job of a cluster array, writes to
+    a file of its own in the directory, named after it, as SQLite locking is
+    not reliable across hosts or on network filesystems. Runs are looked up
+    and results read across the files of all writers.
+    """
+    def __init__(self, directory: str, name: str):
+        self.directory = directory
+        self.name = name
+        self.path = os.path.join(directory, f"results-{name}.sqlite")
+        self._lock = threading.Lock()
+        self._conn = None
+        self._keys = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # the file is created on the first write, so readers do not add
+        # empty files
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS results (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        key TEXT UNIQUE NOT NULL,
+                        experiment TEXT NOT NULL,
+                        dataset TEXT NOT NULL,
+                        config TEXT NOT NULL,
+                        version TEXT NOT NULL,
+                        created REAL NOT NULL,
+                        row TEXT NOT NULL
+                    )
+                """)
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS results_experiment_dataset ON results (experiment, dataset)")
+        return self._conn
+
+    def _query_all(self, query: str, params: Tuple = ()) -> List[Tuple]:
+        # files other than the one this store writes to are only opened for
+        # reading
+        rows = []
+        for path in sorted(glob(os.path.join(self.directory, 'results-*.sqlite'))):
+            if path == self.path and self._conn is not None:
+                rows += self._conn.execute(query, params).fetchall()
+                continue
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=BUSY_TIMEOUT)
+            try:
+                rows += conn.execute(query, params).fetchall()
+            finally:
+                conn.close()
+        return rows
+
+    @staticmethod
+    def get_key(experiment: str, dataset: str, config: Dict[str, Any], version: str) -> str:
+        return hashlib.sha256(_to_json([experiment, dataset, config, version]).encode()).hexdigest()
+
+    def has(self, key: str) -> bool:
+        with self._lock:
+            # the stored keys are read once; other writers run other runs, and
+            # the runs this store stores later are added as they are put
+            if self._keys is None:
+                self._keys = {key for key, in self._query_all("SELECT key FROM results")}
+            return key in self._keys
+
+    def put(self, experiment: str, dataset: str, config: Dict[str, Any], version: str, row: Dict[str, Any]):
+        key = self.get_key(experiment, dataset, config, version)
+        with self._lock, self._connect():
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, experiment, dataset, config, version, created, row) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, experiment, dataset, _to_json(config), version, time.time(), _to_json(row)))
+            if self._keys is not None:
+                self._keys.add(key)
+
+    def get_latest(self, experiment: str, dataset: str) -> 'pd.DataFrame':
+        # the latest row of each configuration across all writers, in the
+        # order they were stored
+        with self._lock:
+            rows = self._query_all(
+                "SELECT config, created, row FROM results WHERE experiment = ? AND dataset = ?",
+                (experiment, dataset))
+        latest = {}
+        for config, created, row in sorted(rows, key=lambda row: row[1]):
+            latest.pop(config, None)
+            latest[config] = row
+        # pandas is only imported by the plotters that read results
+        import pandas as pd
+        return pd.DataFrame([json.loads(row) for row in latest.values()])
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
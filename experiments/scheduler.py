@@ -0,0 +1,172 @@
+import os
+import threading
+import traceback
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from experiments.globals import get_code_version, get_results_store, get_worker_pool, run_search
+
+# memory of a worker process with all searchers imported
+WORKER_BASE_MEMORY = 300 * 2 ** 20
+
+# rough seconds per sample-feature entry and unit of work of each searcher,
+# only used to order runs by their expected length
+SEARCHER_SECONDS_PER_ENTRY = {
+    "CART": 1e-7,
+    "DL8.5": 1e-5,
+    "GOSDT": 1e-5,
+    "MAPTree": 1e-8,
+    "MCMC": 1e-6,
+    "SMC": 1e-6,
+}
+
+# rough bytes per expansion of a MAPTree search and expansions per second of
+# searches that only have a time limit
+MAPTREE_BYTES_PER_EXPANSION = 2 ** 10
+MAPTREE_EXPANSIONS_PER_SECOND = 10 ** 5
+
+
+def count_physical_cores() -> int:
+    """
+    Returns the number of physical cores this process may run on. Hardware
+    threads of the same core share its execution units, so runs on them slow
+    each other down; falls back to the number of logical CPUs where the core
+    topology cannot be read.
+    """
+    cpus = os.sched_getaffinity(0)
+    cores = set()
+    for cpu in cpus:
+        try:
+            with open(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list") as f:
+                cores.add(f.read().strip())
+        except OSError:
+            return len(cpus)
+    return len(cores)
+
+
+def estimate_cost(searcher: str, params: Dict[str, Any], X: np.ndarray) -> float:
+    if params.get('time_limit', -1) > 0:
+        return params['time_limit']
+    work = params.get('num_expansions', params.get('num_iterations', params.get('num_particles', 1)))
+    if work is None or work < 0:
+        work = MAPTREE_EXPANSIONS_PER_SECOND
+    return SEARCHER_SECONDS_PER_ENTRY.get(searcher, 1e-6) * X.size * work
+
+
+def estimate_memory(searcher: str, params: Dict[str, Any], X: np.ndarray) -> float:
+    memory = WORKER_BASE_MEMORY + 10 * X.nbytes
+    if searcher == "MAPTree":
+        num_expansions = params.get('num_expansions', -1)
+        if num_expansions < 0:
+            num_expansions = MAPTREE_EXPANSIONS_PER_SECOND * max(params.get('time_limit', 1), 1)
+        memory += MAPTREE_BYTES_PER_EXPANSION * num_expansions
+    return memory
+
+
+@dataclass
+class Task:
+    searcher: str
+    args: Tuple
+    params: Dict[str, Any]
+    on_result: Callable[[Optional[Dict[str, Any]]], None]
+    cost: float
+    memory: float
+    num_threads: int = 1
+
+
+@dataclass
+class TaskGroup:
+    """
+    Runs of one experiment on one dataset. Each run's result is processed into
+    a row and stored as soon as it completes, keyed by its configuration (the
+    searcher, its params and the data slice it ran on) and the code version.
+    Runs whose rows are already stored are skipped, so an interrupted
+    experiment resumes where it stopped.
+    """
+    experiment: str
+    dataset: str
+    tasks: List[Task] = field(default_factory=list)
+
+    def add(self, searcher: str, args: Tuple, params: Dict[str, Any],
+            process: Callable[[Dict[str, Any]], Dict[str, Any]],
+            data_slice: Dict[str, Any] = None) -> Optional[Task]:
+        store = get_results_store()
+        config = {'searcher': searcher, 'params': params, **(data_slice or {})}
+        if store.has(store.get_key(self.experiment, self.dataset, config, get_code_version())):
+            return None
+
+        def on_result(result: Optional[Dict[str, Any]]):
+            if result is None:
+                print(f"Run Failed!!! ({searcher}: {params})")
+            else:
+                store.put(self.experiment, self.dataset, config, get_code_version(), process(result))
+
+        X = args[0]
+        task = Task(searcher, args, params, on_result,
+                    estimate_cost(searcher, params, X), estimate_memory(searcher, params, X))
+        self.tasks.append(task)
+        return task
+
+
+def run_tasks(tasks: List[Task], num_cpus: int = None, memory_budget: float = None):
+    """
+    Runs tasks concurrently, longest first. A task only starts once enough
+    CPUs and memory are free for it, and shorter tasks that fit are started
+    while a longer one waits. Every searcher is single-threaded, so at most
+    num_cpus tasks run at once, by default one per physical core. If a task
+    raises, e.g. because its result cannot be stored, no further tasks are
+    started and the error is raised once the running tasks complete.
+    """
+    num_cpus = num_cpus or count_physical_cores()
+    memory_budget = memory_budget or float('inf')
+    get_worker_pool(num_cpus)
+
+    pending = sorted(tasks, key=lambda task: task.cost, reverse=True)
+    free = {'cpus': num_cpus, 'memory': memory_budget}
+    freed = threading.Condition()
+    errors = []
+
+    def requirements(task: Task) -> Tuple[int, float]:
+        # a task larger than the whole budget runs on its own
+        return min(task.num_threads, num_cpus), min(task.memory, memory_budget)
+
+    def run(task: Task):
+        try:
+            task.on_result(run_search(task.searcher, *task.args, **task.params))
+        except Exception as error:
+            traceback.print_exc()
+            with freed:
+                errors.append(error)
+        finally:
+            cpus, memory = requirements(task)
+            with freed:
+                free['cpus'] += cpus
+                free['memory'] += memory
+                freed.notify_all()
+
+    def next_fitting_task() -> Optional[Task]:
+        for i, task in enumerate(pending):
+            cpus, memory = requirements(task)
+            if cpus <= free['cpus'] and memory <= free['memory']:
+                return pending.pop(i)
+        return None
+
+    with ThreadPoolExecutor(num_cpus) as executor:
+        while pending:
+            with freed:
+                task = None
+                while task is None and not errors:
+                    task = next_fitting_task()
+                    if task is None:
+                        freed.wait()
+                if task is None:
+                    break
+                cpus, memory = requirements(task)
+                free['cpus'] -= cpus
+                free['memory'] -= memory
+            executor.submit(run, task)
+
+    if errors:
+        raise RuntimeError(f"{len(errors)} runs failed; {len(pending)} runs were not started") from errors[0]
@@ -1,14 +1,16 @@
+import re
 import numpy as np
 from typing import Tuple
 from math import lgamma
 
 
+# the tokens of a tree string: parentheses and feature indices
+TREE_TOKEN = re.compile(r'[()]|\d+')
+
+
 def get_num_valid_splits(X):
-    num_valid = 0
-    for f in range(X.shape[1]):
-        if 0 < np.count_nonzero(X[:, f]) < X.shape[0]:
-            num_valid += 1
-    return num_valid
+    num_nonzero = np.count_nonzero(X, axis=0)
+    return int(np.count_nonzero((0 < num_nonzero) & (num_nonzero < X.shape[0])))
 
 
 def log_prob_split(depth: int, alpha: float, beta: float) -> float:
@@ -23,17 +25,90 @@ def log_beta(count: Tuple[float, float]) -> float:
     return lgamma(count[0]) + lgamma(count[1]) - lgamma(count[0] + count[1])
 
 
-def log_likelihood(y, rho: Tuple[float, float]) -> float:
-    count = np.bincount(y, minlength=2)
+def log_likelihood_from_counts(count, rho: Tuple[float, float]) -> float:
     return log_beta((count[0] + rho[0], count[1] + rho[1])) - log_beta(rho)
 
 
+def log_likelihood(y, rho: Tuple[float, float]) -> float:
+    return log_likelihood_from_counts(np.bincount(y, minlength=2), rho)
+
+
 def split(X, feature: int) -> Tuple[np.ndarray, np.ndarray]:
     left = np.nonzero(X[:, feature] == False)
     right = np.nonzero(X[:, feature] == True)
     return left, right
 
 
+class CompiledTree:
+    """
+    Flat representation of a tree: parallel arrays indexed by the nodes in
+    preorder. Leaves have feature -1 and children -1.
+    """
+    def __init__(self, root: 'BinaryClassificationTree'):
+        self.nodes = []
+        self.depth = []
+        stack = [(root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            self.nodes.append(node)
+            self.depth.append(depth)
+            if not node.is_leaf():
+                stack.append((node.right, depth + 1))
+                stack.append((node.left, depth + 1))
+
+        num_nodes = len(self.nodes)
+        index = {id(node): i for i, node in enumerate(self.nodes)}
+        self.feature = np.array([-1 if node.is_leaf() else node.feature for node in self.nodes], dtype=np.int64)
+        self.left = np.array([-1 if node.is_leaf() else index[id(node.left)] for node in self.nodes], dtype=np.int64)
+        self.right = np.array([-1 if node.is_leaf() else index[id(node.right)] for node in self.nodes], dtype=np.int64)
+        self.depth = np.array(self.depth, dtype=np.int64)
+        self.leaves = np.flatnonzero(self.feature < 0)
+        # the internal nodes grouped by depth, from the deepest, with a single
+        # sort so that deep trees are not scanned once per level
+        internal = np.flatnonzero(self.feature >= 0)
+        internal = internal[np.argsort(-self.depth[internal], kind='stable')]
+        levels = np.flatnonzero(np.diff(self.depth[internal])) + 1
+        self.internal_by_depth = np.split(internal, levels)
+
+    def apply(self, X) -> np.ndarray:
+        # every row descends one level per pass, so only the index of each
+        # row's current node is updated rather than copying submatrices
+        node = np.zeros(X.shape[0], dtype=np.int64)
+        active = np.flatnonzero(self.feature[node] >= 0)
+        while active.size:
+            current = node[active]
+            go_right = X[active, self.feature[current]] != 0
+            node[active] = np.where(go_right, self.right[current], self.left[current])
+            active = active[self.feature[node[active]] >= 0]
+        return node
+
+    def get_label_counts(self, X, y) -> np.ndarray:
+        # label counts of every node, from the counts of the leaves up
+        y = np.asarray(y, dtype=np.int64)
+        num_labels = max(2, int(y.max()) + 1) if y.size else 2
+        counts = np.bincount(self.apply(X) * num_labels + y, minlength=len(self.nodes) * num_labels)
+        return self.sum_up(counts.reshape(len(self.nodes), num_labels))
+
+    def sum_up(self, values: np.ndarray) -> np.ndarray:
+        # sets the values of the internal nodes, one level at a time from the
+        # deepest, to the sums of the values of their leaves
+        for nodes in self.internal_by_depth:
+            values[nodes] = values[self.left[nodes]] + values[self.right[nodes]]
+        return values
+
+    def get_column_sums(self, X) -> Tuple[np.ndarray, np.ndarray]:
+        # number of rows and column sums of every node, from a single pass over
+        # the rows sorted by leaf
+        leaf = self.apply(X)
+        num_rows = self.sum_up(np.bincount(leaf, minlength=len(self.nodes)))
+        column_sums = np.zeros((len(self.nodes), X.shape[1]), dtype=np.int64)
+        order = np.argsort(leaf, kind='stable')
+        nonempty, starts = np.unique(leaf[order], return_index=True)
+        if nonempty.size:
+            column_sums[nonempty] = np.add.reduceat(X[order], starts, axis=0, dtype=np.int64)
+        return num_rows, self.sum_up(column_sums)
+
+
 class BinaryClassificationTree:
     def __init__(self,
                  left: 'BinaryClassificationTree' = None,
@@ -44,11 +119,37 @@ class BinaryClassificationTree:
         self.right = right
         self.feature = feature
         self.label_counts = None
+        self._compiled = None
+
+    def __getstate__(self):
+        # trees are pickled as their string and the label counts of their
+        # nodes in preorder, so deep trees are not pickled recursively
+        label_counts = [node.label_counts for node in self.compile().nodes]
+        return str(self), label_counts
+
+    def __setstate__(self, state):
+        tree, label_counts = state
+        root = BinaryClassificationTree.parse(tree)
+        self.left = root.left
+        self.right = root.right
+        self.feature = root.feature
+        self._compiled = None
+        for node, node_label_counts in zip(self.compile().nodes, label_counts):
+            node.label_counts = node_label_counts
 
     def __str__(self):
-        if self.is_leaf():
-            return ""
-        return f"({self.left}{self.feature}{self.right})"
+        # the string is built from an explicit stack of nodes and pieces of
+        # text, so deep trees neither recurse nor copy nested strings
+        pieces = []
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                pieces.append(item)
+            elif not item.is_leaf():
+                stack += [")", item.right, str(item.feature), item.left]
+                pieces.append("(")
+        return "".join(pieces)
 
     @classmethod
     def parse(cls, tree: str) -> 'BinaryClassificationTree':
@@ -57,80 +158,81 @@ class BinaryClassificationTree:
         if tree in ['', 'nan']:
             return BinaryClassificationTree()
 
-        def parse_feature(tree: str, i: int) -> Tuple[int, int]:
-            j = i + 1
-            while tree[j] not in ['(', ')']:
-                j += 1
-            return int(tree[i:j]), j
-
-        def parse_node(tree: str, i: int = 0) -> Tuple[
-                BinaryClassificationTree, int]:
-            if tree == '':
-                return BinaryClassificationTree(), i
-            if tree[i] == '(':
-                left, i = parse_node(tree, i + 1)
-                feature, i = parse_feature(tree, i)
-                right, i = parse_node(tree, i)
-                return BinaryClassificationTree(left, right, feature), i + 1
+        # single pass over the tokens; each open node is a [left, feature]
+        # pair on the stack, and node is the last subtree that was closed
+        stack = []
+        node = None
+        for token in TREE_TOKEN.findall(tree):
+            if token == '(':
+                stack.append([None, None])
+                node = None
+            elif token == ')':
+                left, feature = stack.pop()
+                right = BinaryClassificationTree() if node is None else node
+                node = BinaryClassificationTree(left, right, feature)
             else:
-                return BinaryClassificationTree(), i
-
-        return parse_node(tree)[0]
+                stack[-1][0] = BinaryClassificationTree() if node is None else node
+                stack[-1][1] = int(token)
+                node = None
+        assert not stack, f"Unbalanced tree string: {tree}"
+        return BinaryClassificationTree() if node is None else node
 
     def is_leaf(self) -> bool:
         return self.feature is None
 
     def size(self) -> int:
-        if self.is_leaf():
-            return 1
-        return 1 + self.left.size() + self.right.size()
+        return len(self.compile().nodes)
 
     def depth(self) -> int:
-        if self.is_leaf():
-            return 0
-        return max(self.left.depth(), self.right.depth())
+        return int(self.compile().depth.max())
+
+    def compile(self) -> CompiledTree:
+        # the structure is compiled once; trees are not modified after they
+        # are built, except for their label counts
+        if self._compiled is None:
+            self._compiled = CompiledTree(self)
+        return self._compiled
 
     def fit(self, X, y):
-        self.label_counts = np.bincount(y, minlength=2)
-        if self.is_leaf():
-            return
-        left, right = split(X, self.feature)
-        self.left.fit(X[left], y[left])
-        self.right.fit(X[right], y[right])
+        compiled = self.compile()
+        for node, label_counts in zip(compiled.nodes, compiled.get_label_counts(X, y)):
+            node.label_counts = label_counts
 
     def predict(self, X):
         if self.is_leaf():
             assert (self.label_counts is not None)
             return np.argmax(self.label_counts)
-        left, right = split(X, self.feature)
-        y = np.zeros(X.shape[0], dtype=bool)
-        y[left] = self.left.predict(X[left])
-        y[right] = self.right.predict(X[right])
-        return y
+        compiled = self.compile()
+        labels = np.zeros(len(compiled.nodes), dtype=bool)
+        for i in compiled.leaves:
+            assert (compiled.nodes[i].label_counts is not None)
+            labels[i] = np.argmax(compiled.nodes[i].label_counts)
+        return labels[compiled.apply(X)]
 
     def get_all_leaves(self):
-        if self.is_leaf():
-            return [self]
-        return self.left.get_all_leaves() + self.right.get_all_leaves()
+        compiled = self.compile()
+        return [compiled.nodes[i] for i in compiled.leaves]
 
     def log_prior(self, X, alpha, beta, depth=0):
-        if X.shape[0] == 0:
+        compiled = self.compile()
+        num_rows, column_sums = compiled.get_column_sums(X)
+        if np.any(num_rows == 0):
             return -np.inf
-        num_valid_splits = get_num_valid_splits(X)
-        if self.is_leaf():
-            return log_prob_stop(depth, alpha,
-                                 beta) if num_valid_splits else 0.0
-        left, right = split(X, self.feature)
-        return log_prob_split(depth, alpha, beta) - np.log(num_valid_splits) + \
-            self.left.log_prior(X[left], alpha, beta, depth + 1) + \
-            self.right.log_prior(X[right], alpha, beta, depth + 1)
+        num_valid_splits = np.count_nonzero((0 < column_sums) & (column_sums < num_rows[:, None]), axis=1)
+        depths = depth + compiled.depth
+        is_leaf = compiled.feature < 0
+        with np.errstate(divide='ignore'):
+            log_prior = np.where(
+                is_leaf,
+                np.where(num_valid_splits > 0, log_prob_stop(depths, alpha, beta), 0.0),
+                log_prob_split(depths, alpha, beta) - np.log(np.where(is_leaf, 1, num_valid_splits)),
+            )
+        return float(log_prior.sum())
 
     def log_likelihood(self, X, y, rho):
-        if self.is_leaf():
-            return log_likelihood(y, rho)
-        left, right = split(X, self.feature)
-        return self.left.log_likelihood(X[left], y[left], rho) + \
-            self.right.log_likelihood(X[right], y[right], rho)
+        compiled = self.compile()
+        counts = compiled.get_label_counts(X, y)
+        return sum(log_likelihood_from_counts(counts[i], rho) for i in compiled.leaves)
 
     def log_posterior(self, X, y, alpha, beta, rho):
         return self.log_prior(X, alpha, beta) + self.log_likelihood(X, y, rho)
@@ -112,7 +112,7 @@ def sample_labels_tree(p, data, alpha_vec, range_n_class, param, settings, cache
 
 
 def sample_tree(data, settings, param, cache, cache_tmp):
-    p = TreeMCMC(list(range(data['n_train'])), param, settings, cache_tmp)
+    p = TreeMCMC(np.arange(data['n_train']), param, settings, cache_tmp)
     grow_nodes = [0]
     while grow_nodes:
         node_id = grow_nodes.pop(0)
@@ -432,7 +432,7 @@ class TreeMCMC(Tree):
         for node in nodes_subtree:
             self.loglik_new[node] = -np.inf
             self.logprior_new[node] = -np.inf
-            self.train_ids_new[node] = []
+            self.train_ids_new[node] = np.zeros(0, dtype=int)
             if settings.optype == 'class':
                 self.counts_new[node] = np.zeros(self.counts[node].shape)
             else:
@@ -442,20 +442,21 @@ class TreeMCMC(Tree):
                 self.param_n_new[node] = self.param_n[node] * 0.0
 
     def evaluate_new_subtree(self, data, node_id_start, param, nodes_subtree, cache, settings):
-        for i in self.train_ids[node_id_start]:
-            x_, y_ = data['x_train'][i, :], data['y_train'][i]
-            node_id = copy(node_id_start)
-            while True:
-                self.counts_new[node_id][y_] += 1
-                self.train_ids_new[node_id].append(i)
-                if node_id in self.leaf_nodes:
-                    break
-                left, right = get_children_id(node_id)
-                feat_id, split, idx_split_global = self.node_info_new[node_id]           # splitting on new criteria
-                if x_[feat_id] <= split:
-                    node_id = left
-                else:
-                    node_id = right
+        # the train ids of each node are partitioned between its children with
+        # one mask, from node_id_start down
+        stack = [(node_id_start, np.asarray(self.train_ids[node_id_start], dtype=int))]
+        while stack:
+            node_id, train_ids = stack.pop()
+            self.counts_new[node_id] += np.bincount(data['y_train'][train_ids], \
+                    minlength=len(self.counts_new[node_id]))
+            self.train_ids_new[node_id] = train_ids
+            if node_id in self.leaf_nodes:
+                continue
+            left, right = get_children_id(node_id)
+            feat_id, split, idx_split_global = self.node_info_new[node_id]           # splitting on new criteria
+            go_left = data['x_train'][train_ids, feat_id] <= split
+            stack.append((left, train_ids[go_left]))
+            stack.append((right, train_ids[~go_left]))
         for node_id in nodes_subtree:
             if np.sum(self.counts_new[node_id]) > 0:
                 self.loglik_new[node_id] = compute_dirichlet_normalizer_fast(self.counts_new[node_id], cache)
@@ -31,7 +31,7 @@ from .tree_utils import parser_add_common_options, parser_add_smc_options, parse
                            parser_check_smc_options, load_data, plot_particles, \
                            get_depth, get_children_id, get_filename_smc, \
                            compute_test_metrics_classification, compute_test_metrics_regression, compute_test_metrics, \
-                           stop_split, compute_dirichlet_normalizer, compute_normal_normalizer, \
+                           stop_split, feat_val2idx, compute_dirichlet_normalizer, compute_normal_normalizer, \
                            compute_dirichlet_normalizer_fast, evaluate_predictions, init_left_right_statistics, \
                            subsample_features, compute_left_right_statistics, compute_entropy, \
                            precompute, evaluate_predictions_fast, evaluate_performance_tree
@@ -134,7 +134,7 @@ class Particle(Tree):
                                             n_points_right, param, cache, settings)[0]
                     logprob_term1 = settings.temper_factor * (loglik_left + loglik_right - loglik_nosplit)
                     if x_ < x_max:
-                        idx_split_end = cache['feat_val2idx'][feat_id][x_] - idx_min - 1 # -1 required since idx_min is always 1 less than val2idx
+                        idx_split_end = feat_val2idx(cache, feat_id, x_) - idx_min - 1 # -1 required since idx_min is always 1 less than val2idx
                         if settings.verbose >= 3:
                             print('i_tmp = %s, idx_split_start = %s, idx_split_end = %s' % (i_tmp, idx_split_start, idx_split_end))
                         logprob_tmp[idx_split_start:(idx_split_end+1)] += logprob_term1
@@ -665,7 +665,7 @@ def evaluate_predictions_smc(particles, data, x, y, settings, param, weights):
 
 def init_smc(data, settings):
     param, cache, cache_tmp = precompute(data, settings)
-    particles = [Particle(list(range(data['n_train'])), param, settings, cache_tmp) \
+    particles = [Particle(np.arange(data['n_train']), param, settings, cache_tmp) \
             for n in range(settings.n_particles)]
     if settings.include_child_prob == 1:
         log_weights = np.array([(p.loglik[0] + np.log(p.compute_pnosplit(0, param))) for p in particles]) \
@@ -784,28 +784,29 @@ class Tree(object):
 
     def find_valid_dimensions(self, data, cache, train_ids, settings):
         score_feat = cache['prob_feat']
-        first_time = True
         if settings.verbose >= 3:
             print('original score_feat = %s' % score_feat)
         feat_split_info = {}
-        for feat_id in cache['range_n_dim']:
-            x_min = np.min(data['x_train'][train_ids, feat_id])
-            x_max = np.max(data['x_train'][train_ids, feat_id])
-            idx_min = cache['feat_val2idx'][feat_id][x_min]
-            idx_max = cache['feat_val2idx'][feat_id][x_max]
-            feat_score_cumsum_prior_current = cache['feat_score_cumsum_prior'][feat_id] 
+        # min and max of all features over the node's rows at once; a feature
+        # can only be split if they differ
+        x_node = data['x_train'][train_ids]
+        x_min_all = np.min(x_node, axis=0)
+        x_max_all = np.max(x_node, axis=0)
+        splittable = x_min_all != x_max_all
+        if not np.all(splittable):
+            score_feat = cache['prob_feat'].copy()
+            score_feat[~splittable] = 0
+        for feat_id in np.flatnonzero(splittable).tolist():
+            x_min = x_min_all[feat_id]
+            x_max = x_max_all[feat_id]
+            idx_min = feat_val2idx(cache, feat_id, x_min)
+            idx_max = feat_val2idx(cache, feat_id, x_max)
             if settings.verbose >= 3:
                 print('x_min = %s, x_max = %s, idx_min = %s, idx_max = %s' % \
                         (x_min, x_max, idx_min, idx_max))
-            if idx_min == idx_max:
-                if first_time:          # lazy copy
-                    score_feat = cache['prob_feat'].copy()
-                    first_time = False
-                score_feat[feat_id] = 0
-            else:
-                feat_split_info[feat_id] = [idx_min, idx_max, x_min, x_max, \
-                        feat_score_cumsum_prior_current]
-        feat_id_valid = [feat_id for feat_id in cache['range_n_dim'] if score_feat[feat_id] > 0]
+            feat_split_info[feat_id] = [idx_min, idx_max, x_min, x_max, \
+                    cache['feat_score_cumsum_prior'][feat_id]]
+        feat_id_valid = np.flatnonzero(score_feat > 0).tolist()
         split_not_supported = (len(feat_id_valid) == 0)
         if settings.verbose >= 3:
             print('in find_valid_dimensions now')
@@ -1103,6 +1104,11 @@ def compute_test_metrics(y_test, pred_prob):
     return (acc, log_prob)
 
 
+def feat_val2idx(cache, feat_id, x):
+    # idx of a training value of feat_id among its sorted unique values
+    return int(np.searchsorted(cache['feat_unique_values'][feat_id], x))
+
+
 def stop_split(train_ids, settings, data, cache):
     if (len(train_ids) <= settings.min_size):
         op = True
@@ -1241,17 +1247,16 @@ def subsample_features(settings, feat_id_valid, score_feat, split_not_supported)
 
 
 def compute_left_right_statistics(data, param, cache, train_ids, feat_id_chosen, split_chosen, settings):
-    train_ids_left = [train_id for train_id in train_ids if \
-            data['x_train'][train_id, feat_id_chosen] <= split_chosen]
-    train_ids_right = [train_id for train_id in train_ids if \
-            data['x_train'][train_id, feat_id_chosen] > split_chosen]
+    # node membership is a numpy array of train ids, partitioned with one mask
+    train_ids = np.asarray(train_ids, dtype=int)
+    go_left = data['x_train'][train_ids, feat_id_chosen] <= split_chosen
+    train_ids_left = train_ids[go_left]
+    train_ids_right = train_ids[~go_left]
     cache_tmp = {}
     if settings.optype == 'class':
-        range_n_class = cache['range_n_class']
-        cnt_left_chosen = hist_count(data['y_train'][train_ids_left], \
-                range_n_class)
-        cnt_right_chosen = hist_count(data['y_train'][train_ids_right], \
-                range_n_class)
+        n_class = len(cache['range_n_class'])
+        cnt_left_chosen = np.bincount(data['y_train'][train_ids_left], minlength=n_class)
+        cnt_right_chosen = np.bincount(data['y_train'][train_ids_right], minlength=n_class)
         loglik_left = compute_dirichlet_normalizer_fast(cnt_left_chosen, cache)
         loglik_right = compute_dirichlet_normalizer_fast(cnt_right_chosen, cache)
         cache_tmp['cnt_left_chosen'] = cnt_left_chosen
@@ -1346,25 +1351,22 @@ def precompute(data, settings):
         else:
             cache['nn_prior_term'] = 0.5 * np.log(param.mu_prec) - 0.5 * param.mu_prec * param.mu_mean * param.mu_mean
         cache['half_log_2pi'] = 0.5 * np.log(2 * math.pi)
-    feat_val2idx = {}   # maps unique values to idx for feat_score_cumsum
+    feat_unique_values = {}   # sorted unique values, whose idx are the idx for feat_score_cumsum
     feat_idx2midpoint = {}   # maps idx of interval to midpoint
     feat_score_cumsum_prior = {}         # cumsum of scores of each interval for prior
     feat_k_log_prior = (-np.log(float(data['n_dim']))) * np.ones(data['n_dim'])         # log prior of k
     for feat_id in cache['range_n_dim']:
         x_tmp = data['x_train'][:, feat_id]
         idx_sort = np.argsort(x_tmp)
-        feat_unique_values = np.unique(x_tmp[idx_sort])
-        feat_val2idx[feat_id] = {}
-        n_unique = len(feat_unique_values)
-        for n, x_n in enumerate(feat_unique_values):
-            feat_val2idx[feat_id][x_n] = n     # even min value may be looked up
+        feat_unique_values[feat_id] = np.unique(x_tmp[idx_sort])
+        n_unique = len(feat_unique_values[feat_id])
         # first "interval" has width 0 since points to the left of that point are chosen with prob 0
         feat_idx2midpoint[feat_id] = np.zeros(n_unique)
-        feat_idx2midpoint[feat_id][1:] = (feat_unique_values[1:] + feat_unique_values[:-1]) / 2.0
+        feat_idx2midpoint[feat_id][1:] = (feat_unique_values[feat_id][1:] + feat_unique_values[feat_id][:-1]) / 2.0
         # each interval is represented by its midpoint
-        diff_feat_unique_values = np.diff(feat_unique_values)
+        diff_feat_unique_values = np.diff(feat_unique_values[feat_id])
         log_diff_feat_unique_values_norm = np.log(diff_feat_unique_values) \
-                            - np.log(feat_unique_values[-1] - feat_unique_values[0])
+                            - np.log(feat_unique_values[feat_id][-1] - feat_unique_values[feat_id][0])
         feat_score_prior_tmp = np.zeros(n_unique)
         feat_score_prior_tmp[1:] = diff_feat_unique_values
         feat_score_cumsum_prior[feat_id] = np.cumsum(feat_score_prior_tmp)
@@ -1373,7 +1375,7 @@ def precompute(data, settings):
             print(n_unique, len(feat_score_cumsum_prior[feat_id]))
             print('x (sorted) =  %s' % (x_tmp[idx_sort]))
             print('y (corresponding to sorted x) = %s' % (data['y_train'][idx_sort]))
-    cache['feat_val2idx'] = feat_val2idx
+    cache['feat_unique_values'] = feat_unique_values
     cache['feat_idx2midpoint'] = feat_idx2midpoint
     cache['feat_score_cumsum_prior'] = feat_score_cumsum_prior
     if settings.proposal == 'prior':
@@ -1430,16 +1432,8 @@ def generate_tree(alpha_split, beta_split):
 
 def no_valid_split_exists(data, cache, train_ids, settings):
 # faster way to check for existence of valid split than find_valid_dimensions
-    op = True
-    for feat_id in cache['range_n_dim']: 
-        x_min = np.min(data['x_train'][train_ids, feat_id])
-        x_max = np.max(data['x_train'][train_ids, feat_id])
-        idx_min = cache['feat_val2idx'][feat_id][x_min]
-        idx_max = cache['feat_val2idx'][feat_id][x_max]
-        if idx_min != idx_max:
-            op = False
-            break
-    return op
+    x_node = data['x_train'][train_ids]
+    return not np.any(np.min(x_node, axis=0) != np.max(x_node, axis=0))
 
 
 def compute_gamma_param(min_val, alpha, q, init_val=-1.0):
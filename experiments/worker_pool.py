@@ -0,0 +1,220 @@
+import time
+import queue
+import threading
+import traceback
+import numpy as np
+from collections import OrderedDict
+from multiprocessing import Process, Pipe, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# number of shared arrays kept alive by the pool and attached in each worker
+SHARED_ARRAY_CACHE_SIZE = 16
+
+# seconds a worker is given to exit before it is killed
+WORKER_SHUTDOWN_TIMEOUT = 5
+
+
+class SharedArray:
+    """
+    Picklable reference to a numpy array in shared memory. Only the name of the
+    shared memory block, the shape and the dtype are sent to workers.
+    """
+    def __init__(self, name: str, shape: Tuple[int, ...], dtype: str):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+    @classmethod
+    def create(cls, array: np.ndarray) -> Tuple['SharedArray', SharedMemory]:
+        array = np.ascontiguousarray(array)
+        shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        return cls(shm.name, array.shape, array.dtype.str), shm
+
+    def view(self, shm: SharedMemory) -> np.ndarray:
+        view = np.ndarray(self.shape, dtype=np.dtype(self.dtype), buffer=shm.buf)
+        view.flags.writeable = False
+        return view
+
+
+def _close(shm: SharedMemory):
+    try:
+        shm.close()
+    except BufferError:
+        # a view into the block is still alive; it is unmapped once collected
+        pass
+
+
+def _worker_main(conn, functions: Dict[str, Callable], initializer: Optional[Callable]):
+    if initializer is not None:
+        initializer()
+    attached = OrderedDict()
+
+    def resolve(arg):
+        if not isinstance(arg, SharedArray):
+            return arg
+        if arg.name not in attached:
+            if len(attached) >= SHARED_ARRAY_CACHE_SIZE:
+                _, (_, old_shm) = attached.popitem(last=False)
+                _close(old_shm)
+            shm = SharedMemory(name=arg.name)
+            attached[arg.name] = (arg.view(shm), shm)
+        attached.move_to_end(arg.name)
+        return attached[arg.name][0]
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        try:
+            searcher, args, kwargs = task
+            args = tuple(resolve(arg) for arg in args)
+            kwargs = {key: resolve(value) for key, value in kwargs.items()}
+            conn.send((functions[searcher](*args, **kwargs), None))
+        except Exception:
+            conn.send((None, traceback.format_exc()))
+        finally:
+            # views of this run must not keep evicted blocks open
+            task = args = kwargs = None
+
+    # drop the views before closing the blocks they point into
+    blocks = [shm for _, shm in attached.values()]
+    attached.clear()
+    for shm in blocks:
+        _close(shm)
+
+
+class _Worker:
+    def __init__(self, functions: Dict[str, Callable], initializer: Optional[Callable]):
+        self.conn, child_conn = Pipe()
+        self.process = Process(target=_worker_main, args=(child_conn, functions, initializer), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self, kill: bool = False):
+        if not kill:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=WORKER_SHUTDOWN_TIMEOUT)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+        self.process.close()
+
+
+class WorkerPool:
+    """
+    Pool of long-lived worker processes running searches.
+
+    Numpy arrays passed to run are copied into shared memory once and sent to
+    the workers by reference; the most recently used arrays stay shared, so
+    repeated runs on the same data do not copy it again. A worker that exceeds
+    a run's timeout is killed and replaced, while the other workers keep their
+    imports and attached data. run can be called from several threads at once,
+    each run occupying one worker.
+    """
+    def __init__(self, functions: Dict[str, Callable], num_workers: int = 1,
+                 initializer: Optional[Callable] = None):
+        assert num_workers > 0
+        self.functions = functions
+        self.num_workers = num_workers
+        self.initializer = initializer
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._shared = OrderedDict()
+        # workers must share the pool's resource tracker; a tracker of their
+        # own would unlink the blocks they attached when they are killed
+        resource_tracker.ensure_running()
+        for _ in range(num_workers):
+            self._idle.put(_Worker(functions, initializer))
+
+    def __enter__(self) -> 'WorkerPool':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _share(self, array: np.ndarray) -> SharedArray:
+        # arrays are keyed by identity; the pool holds a reference to each
+        # shared array, so an identity is not reused while it is shared.
+        # Arrays of runs in progress are pinned and never evicted.
+        with self._lock:
+            key = id(array)
+            if key not in self._shared:
+                unpinned = [k for k, entry in self._shared.items() if entry[3] == 0]
+                for old_key in unpinned[:max(len(self._shared) - SHARED_ARRAY_CACHE_SIZE + 1, 0)]:
+                    _, _, old_shm, _ = self._shared.pop(old_key)
+                    old_shm.close()
+                    old_shm.unlink()
+                ref, shm = SharedArray.create(array)
+                self._shared[key] = [array, ref, shm, 0]
+            self._shared.move_to_end(key)
+            self._shared[key][3] += 1
+            return self._shared[key][1]
+
+    def _unpin(self, arrays):
+        with self._lock:
+            for array in arrays:
+                self._shared[id(array)][3] -= 1
+
+    def run(self, searcher: str, *args, timeout: Optional[float] = None, **kwargs) -> Optional[Dict[str, Any]]:
+        if searcher not in self.functions:
+            raise ValueError(f"{searcher} is not a valid searcher")
+
+        start = time.perf_counter()
+        arrays = [arg for arg in list(args) + list(kwargs.values()) if isinstance(arg, np.ndarray)]
+        args = tuple(self._share(arg) if isinstance(arg, np.ndarray) else arg for arg in args)
+        kwargs = {
+            key: self._share(value) if isinstance(value, np.ndarray) else value
+            for key, value in kwargs.items()
+        }
+
+        worker = self._idle.get()
+        received = False
+        try:
+            worker.conn.send((searcher, args, kwargs))
+            if worker.conn.poll(timeout):
+                result, error = worker.conn.recv()
+                received = True
+            else:
+                print("Process timed out")
+        except (EOFError, OSError):
+            print("Process died")
+        finally:
+            # a worker is only idle once its result is received; one that
+            # timed out, died or was waited for when the run was interrupted,
+            # e.g. by KeyboardInterrupt, may still be running, so it is replaced
+            if received:
+                self._idle.put(worker)
+            else:
+                worker.stop(kill=True)
+                self._idle.put(_Worker(self.functions, self.initializer))
+            self._unpin(arrays)
+
+        if not received:
+            return None
+
+        if error is not None:
+            print(error)
+            return None
+
+        # time spent outside of the search itself, e.g. on dispatching the
+        # run, sharing its data and returning its result
+        result['overhead'] = time.perf_counter() - start - result.get('time', 0.0)
+        return result
+
+    def close(self):
+        for _ in range(self.num_workers):
+            self._idle.get().stop()
+        with self._lock:
+            for _, _, shm, _ in self._shared.values():
+                shm.close()
+                shm.unlink()
+            self._shared.clear()
@@ -0,0 +1,90 @@
+#include <iostream>
+#include <stdlib.h>
+#include <getopt.h>
+#include <string>
+#include <vector>
+#include <chrono>
+
+#include "data/binary_data_loader.h"
+#include "search/befs_map_search.h"
+
+// Compares the run time of the search with the approximate and the exact
+// subproblem cache on the same data and expansion budget.
+int main(int argc, char** argv) {
+  std::string file;
+  double alpha = 0.95;
+  double beta = 0.5;
+  std::vector<double> rho = {2.5, 2.5};
+  long long numExpansions = BestFirstSearchMAPSearch::INF_EXPANSIONS;
+  int numRepeats = 5;
+
+  struct option longopts[] = {
+    { "file", required_argument, NULL, 'f' },
+    { "alpha", optional_argument, NULL, 'a' },
+    { "beta", optional_argument, NULL, 'b' },
+    { "expansions", optional_argument, NULL, 'e' },
+    { "repeats", optional_argument, NULL, 'n' },
+    { NULL, 0, NULL, 0 }
+  };
+
+  while (true) {
+    int opt = getopt_long(argc, argv, "f:a:b:e:n:", longopts, 0);
+    if (opt == -1) break;
+    switch (opt) {
+      case 'f': {
+        file = std::string(optarg);
+        break;
+      }
+      case 'a': {
+        alpha = std::atof(optarg);
+        break;
+      }
+      case 'b': {
+        beta = std::atof(optarg);
+        break;
+      }
+      case 'e': {
+        numExpansions = std::atoll(optarg);
+        break;
+      }
+      case 'n': {
+        numRepeats = std::atoi(optarg);
+        break;
+      }
+      case '?': {
+        std::cout << "Usage: " << argv[0] << " -f <file> [-a <alpha>] [-b <beta>] [-e <expansions>] [-n <repeats>]" << std::endl;
+        return EXIT_FAILURE;
+        break;
+      }
+    }
+  }
+
+  BinaryDataLoader bdl(file);
+  DataManager dm(bdl.getFeatures(), bdl.getLabels());
+  TreeLikelihood likelihood(rho);
+  BCARTTreePrior prior(alpha, beta);
+
+  std::array<double, 2> bestTimes = {0.0, 0.0};
+  for (bool exactCache : {false, true}) {
+    for (int i = 0; i < numRepeats; i++) {
+      auto start = std::chrono::steady_clock::now();
+      BestFirstSearchMAPSearch search(dm, likelihood, prior, numExpansions,
+          BestFirstSearchMAPSearch::INF_TIME_LIMIT, exactCache);
+      Solution result = search.search();
+      auto stop = std::chrono::steady_clock::now();
+
+      double time = std::chrono::duration<double, std::milli>(stop - start).count();
+      if (i == 0 || time < bestTimes[exactCache]) bestTimes[exactCache] = time;
+      if (i == 0) {
+        std::cout << (exactCache ? "Exact" : "Approximate") << " cache upper bound: "
+          << result.upperBound << ", tree: " << result.treeRepresentation << std::endl;
+      }
+    }
+  }
+
+  std::cout << "Approximate cache time (ms): " << bestTimes[false] << std::endl;
+  std::cout << "Exact cache time (ms): " << bestTimes[true] << std::endl;
+  std::cout << "Exact cache overhead (%): " << 100.0 * (bestTimes[true] / bestTimes[false] - 1.0) << std::endl;
+
+  return EXIT_SUCCESS;
+}
@@ -2,7 +2,7 @@
 #include <stdlib.h>
 #include <getopt.h>
 #include <string>
-#include <array>
+#include <vector>
 #include <chrono>
 
 #include "data/binary_data_loader.h"
@@ -12,7 +12,7 @@ int main(int argc, char** argv) {
   std::string file;
   double alpha = 0.8;
   double beta = 1.0;
-  std::array<double, 2> rho = {1.0, 1.0};
+  std::vector<double> rho = {1.0, 1.0};
 
   struct option longopts[] = {
     { "file", required_argument, NULL, 'f' },
@@ -53,11 +53,12 @@ int main(int argc, char** argv) {
   }
 
   BinaryDataLoader bdl(file);
-  std::vector<std::vector<bool>> features = bdl.getFeatures();
-  std::vector<bool> labels = bdl.getLabels();
+  DataManager dm(bdl.getFeatures(), bdl.getLabels());
+  TreeLikelihood likelihood(rho);
+  BCARTTreePrior prior(alpha, beta);
 
   auto start = std::chrono::high_resolution_clock::now();
-  BestFirstSearchMAPSearch search(features, labels, alpha, beta, rho);
+  BestFirstSearchMAPSearch search(dm, likelihood, prior);
   Solution result = search.search();
   auto stop = std::chrono::high_resolution_clock::now();
 
@@ -22,6 +22,22 @@
 //! Number of unsigned long longs in the ApproxBitsetCacheKey.
 #define APPROX_BITSET_CACHE_NUM_ULL_HASH_VALUES 2
 
+/**
+ * @brief Hash values of a bitset.
+ * 
+ * Each hash value is a weighted sum of the bitset's blocks, so the hash values
+ * of the two sides of a split add up to the hash values of the split bitset.
+ */
+typedef std::array<unsigned long long, APPROX_BITSET_CACHE_NUM_ULL_HASH_VALUES> BitsetHash;
+
+/**
+ * @struct BitsetHashHash
+ * @brief Hash function for BitsetHash.
+ */
+struct BitsetHashHash {
+    size_t operator()(const BitsetHash &hashedBitset) const;
+};
+
 /**
  * @struct ApproxBitsetCacheKey
  * @brief Key for the ApproxBitsetCache.
@@ -30,7 +46,7 @@
  * and the depth.
  */
 struct ApproxBitsetCacheKey {
-    std::array<unsigned long long, APPROX_BITSET_CACHE_NUM_ULL_HASH_VALUES> hashedBitset;
+    BitsetHash hashedBitset;
     size_t depth = 0;
     friend bool operator==(const ApproxBitsetCacheKey &lhs, const ApproxBitsetCacheKey &rhs);
 };
@@ -71,11 +87,46 @@ class ApproxBitsetCache : BaseCache {
             Subproblem& subproblem
         ) override;
 
+        /**
+         * @brief Stores the provided value for the provided key.
+         * @param key The key to store the value for.
+         * @param value The value to store.
+         * @returns void
+         */
+        void put(
+            const ApproxBitsetCacheKey& key,
+            void *value
+        );
+
+        /**
+         * @brief Retrieves the value for the provided key.
+         * @param key The key to retrieve the value for.
+         * @returns The value for the provided key, or nullptr if there is none.
+         */
+        void *get(
+            const ApproxBitsetCacheKey& key
+        ) const;
+
+        /**
+         * @brief Removes all stored values.
+         * @returns void
+         */
+        void clear();
+
         /**
          * @implements BaseCache::size
          */
         size_t size() const override;
 
+        /**
+         * @brief Computes the hash values of the provided bitset.
+         * @param bitset The bitset to hash.
+         * @returns The hash values of the bitset.
+         */
+        BitsetHash hashBitset(
+            const Bitset& bitset
+        ) const;
+
         static constexpr std::array<BLOCK, APPROX_BITSET_CACHE_NUM_ULL_HASH_VALUES> BLOCK_MULT_BASE = {
             377424577268497867ULL,
             285989758769553131ULL,
@@ -0,0 +1,118 @@
+/**
+ * @file canonical_bitset_store.h
+ * @brief Collision-free identifiers for bitsets.
+ * 
+ * This file contains a store which assigns every distinct bitset a unique
+ * identifier. Bitsets are first looked up by a hash of their canonical form
+ * and hits are then verified against the stored canonical form, so unlike
+ * ApproxBitsetCache, two bitsets receive the same identifier only if they are
+ * identical. Canonical forms are kept compactly in an arena as the indices and
+ * values of the non-empty blocks.
+ */
+
+#ifndef CANONICAL_BITSET_STORE_H
+#define CANONICAL_BITSET_STORE_H
+
+#include <cstddef>
+#include <unordered_map>
+#include <vector>
+
+#include "constants.h"
+#include "cache/approx_bitset_cache.h"
+#include "data/bitset.h"
+#include "data/fixed_bitset.h"
+
+/**
+ * @class CanonicalBitsetStore
+ * @brief Assigns unique identifiers to bitsets by their canonical forms.
+ * 
+ * Identifiers are returned as BitsetHash values so that they can be used
+ * wherever bitset hash values are, and two identifiers are equal if and only if
+ * the identified bitsets are identical.
+ */
+class CanonicalBitsetStore {
+    public:
+        /**
+         * @brief Returns the identifier of the provided bitset, storing its
+         * canonical form if it has not been seen before.
+         * @param bitset The bitset to identify.
+         * @returns The identifier of the bitset.
+         */
+        BitsetHash identify(
+            const Bitset& bitset
+        );
+
+        /**
+         * @brief Returns the identifier of the intersection of a bitset with a
+         * mask or its complement, storing its canonical form if it has not
+         * been seen before.
+         * @param indices The block indices of the bitset's canonical form.
+         * @param values The block values of the bitset's canonical form.
+         * @param mask The mask to intersect the bitset with.
+         * @param value Whether to intersect with the mask (true) or its
+         * complement (false).
+         * @returns The identifier of the intersection.
+         * @see Bitset::canonicalForm
+         * 
+         * This avoids applying and reverting the mask on the bitset, as well
+         * as sorting its blocks, when identifying several of its subsets.
+         */
+        BitsetHash identifyIntersection(
+            const std::vector<unsigned int>& indices,
+            const std::vector<BLOCK>& values,
+            const FixedBitset& mask,
+            bool value = true
+        );
+
+        /**
+         * @brief Returns the number of distinct bitsets stored.
+         * @returns The number of distinct bitsets stored.
+         */
+        size_t size() const;
+
+        /**
+         * @brief Returns the number of blocks stored across all canonical
+         * forms.
+         * @returns The number of blocks stored in the arena.
+         */
+        size_t numStoredBlocks() const;
+
+        //! Returns the arena offsets, one past the end of each canonical form.
+        const std::vector<size_t>& getOffsets() const { return offsets_; };
+
+        //! Returns the block indices of all canonical forms in the arena.
+        const std::vector<unsigned int>& getIndices() const { return indices_; };
+
+        //! Returns the block values of all canonical forms in the arena.
+        const std::vector<BLOCK>& getValues() const { return values_; };
+
+        /**
+         * @brief Replaces the contents of the store with the provided arena.
+         * @param offsets The arena offsets, as returned by getOffsets.
+         * @param indices The block indices, as returned by getIndices.
+         * @param values The block values, as returned by getValues.
+         * @returns void
+         * 
+         * Identifiers are the positions of the canonical forms in the arena,
+         * so they are the same as in the store the arena was taken from.
+         */
+        void assign(
+            std::vector<size_t> offsets,
+            std::vector<unsigned int> indices,
+            std::vector<BLOCK> values
+        );
+
+    private:
+        std::unordered_multimap<size_t, size_t> ids_;
+        std::vector<size_t> offsets_ = std::vector<size_t>(1, 0);
+        std::vector<unsigned int> indices_;
+        std::vector<BLOCK> values_;
+        std::vector<unsigned int> canonicalIndices_;
+        std::vector<BLOCK> canonicalValues_;
+
+        BitsetHash identifyCanonicalForm();
+        static size_t hashCanonicalForm(const unsigned int *indices, const BLOCK *values, size_t length);
+        bool matches(size_t id) const;
+};
+
+#endif
@@ -0,0 +1,33 @@
+/**
+ * @file structure_store.h
+ * @brief Prior-independent subproblem information shared between searches.
+ * 
+ * This file contains the definition of the StructureStore struct, which
+ * bundles the caches of a search that only depend on the data: the structure
+ * of the expanded subproblems and, in exact cache mode, the canonical forms
+ * their identifiers refer to. Searches over the same data with different
+ * priors or likelihoods can share a store, so that each subproblem's valid
+ * splits and label counts are only computed from its bitset once.
+ */
+
+#ifndef STRUCTURE_STORE_H
+#define STRUCTURE_STORE_H
+
+#include "cache/canonical_bitset_store.h"
+#include "cache/subproblem_structure_cache.h"
+
+/**
+ * @struct StructureStore
+ * @brief Subproblem structure shared between searches over the same data.
+ * 
+ * A store must only be shared between searches over the same DataManager and
+ * with the same cache mode, since entries are keyed by bitset hash values in
+ * approximate mode and by canonical identifiers in exact mode. It is not
+ * thread-safe, so searches sharing it must run one after the other.
+ */
+struct StructureStore {
+    SubproblemStructureCache structureCache;
+    CanonicalBitsetStore canonicalStore;
+};
+
+#endif
@@ -0,0 +1,81 @@
+/**
+ * @file subproblem_structure_cache.h
+ * @brief Depth-independent cache of subproblem structure.
+ * 
+ * This file contains a cache which stores the parts of a subproblem that only
+ * depend on its set of points: its label counts, its valid splits, and the
+ * label counts and bitset hashes of the children of each valid split. The
+ * same set of points can be reached at several depths, and only the prior
+ * terms of the corresponding OR nodes depend on the depth, so the structure
+ * can be reused to build the OR nodes at every depth without touching the
+ * subproblem's bitset again. Like ApproxBitsetCache, entries are identified
+ * by bitset hash values and may return false positives unless the hash values
+ * come from a CanonicalBitsetStore.
+ */
+
+#ifndef SUBPROBLEM_STRUCTURE_CACHE_H
+#define SUBPROBLEM_STRUCTURE_CACHE_H
+
+#include <cstddef>
+#include <unordered_map>
+#include <vector>
+#include <array>
+
+#include "cache/approx_bitset_cache.h"
+
+/**
+ * @struct SubproblemStructure
+ * @brief Depth-independent information about a subproblem.
+ * 
+ * splitLabelCounts holds the label counts of the right child (feature = 1) of
+ * each valid split one after the other, so those of the i-th valid split are
+ * its entries i * K to (i + 1) * K - 1 for K classes; the left child's label
+ * counts are the differences between the subproblem's and the right child's. The i-th entry
+ * of splitHashes holds the bitset hash values of the left and right child of
+ * the i-th valid split.
+ */
+struct SubproblemStructure {
+    LabelCounts labelCounts;
+    size_t numValidSplits;
+    std::vector<size_t> validSplits;
+    std::vector<long long> splitLabelCounts;
+    std::vector<std::array<BitsetHash, 2>> splitHashes;
+};
+
+/**
+ * @class SubproblemStructureCache
+ * @brief Cache of subproblem structure keyed by bitset hash values.
+ */
+class SubproblemStructureCache {
+    public:
+        /**
+         * @brief Stores the provided structure for the provided bitset hash.
+         * @param hashedBitset The hash values of the subproblem's bitset.
+         * @param structure The structure to store.
+         * @returns The stored structure.
+         */
+        const SubproblemStructure& put(
+            const BitsetHash& hashedBitset,
+            SubproblemStructure&& structure
+        );
+
+        /**
+         * @brief Retrieves the structure for the provided bitset hash.
+         * @param hashedBitset The hash values of the subproblem's bitset.
+         * @returns The stored structure, or nullptr if there is none.
+         */
+        const SubproblemStructure *get(
+            const BitsetHash& hashedBitset
+        ) const;
+
+        /**
+         * @brief Returns the number of subproblems stored in the cache.
+         * @returns The number of subproblems stored in the cache.
+         */
+        size_t size() const;
+
+    private:
+        std::unordered_map<BitsetHash, SubproblemStructure, BitsetHashHash> cache_;
+};
+
+#endif
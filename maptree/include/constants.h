@@ -3,7 +3,13 @@
  * @brief Constants used throughout the library.
 */
 
+#include <vector>
+
 typedef unsigned long long BLOCK;
+
+//! Number of samples with each label, indexed by label.
+typedef std::vector<long long> LabelCounts;
+
 #define BLOCK_BITS 64
 #define FULL_BLOCK 0xFFFFFFFFFFFFFFFFULL
 #define NUM_BLOCKS(numBits) ((numBits + BLOCK_BITS - 1) / BLOCK_BITS)
\ No newline at end of file
@@ -40,8 +40,10 @@ class Bitset {
         , limit_(maxLevel + 1, numBlocks_)
         {
             for (size_t i = 0; i < numBlocks_; i++) indices_[i] = i;
-            BLOCK lastBlock = (1ULL << (numSamples % BLOCK_BITS)) - 1;
-            blocks_[numBlocks_ - 1].set(lastBlock);
+            if (numSamples % BLOCK_BITS != 0) {
+                BLOCK lastBlock = (1ULL << (numSamples % BLOCK_BITS)) - 1;
+                blocks_[numBlocks_ - 1].set(lastBlock);
+            }
         };
 
         /**
@@ -65,22 +67,52 @@ class Bitset {
          * the provided fixed bitset.
          */
         int countIntersection(const FixedBitset& other) const;
+
+        /**
+         * @brief Computes the weighted number of bits in this bitset for each
+         * of several weightings in a single pass over the bitset's blocks.
+         * @param weightMasks The weight masks of each weighting; bit i of a
+         * bit's weight is set if that bit is set in the i-th mask.
+         * @param counts Output for the sum of the weights of the bits in this
+         * bitset under each weighting.
+         * @returns void
+         */
+        void countWeightedIntersections(
+            const std::vector<std::vector<FixedBitset>>& weightMasks,
+            std::vector<long long>& counts
+        ) const;
         
         /**
          * @brief Checks if this bitset is a subset of the provided fixed
-         * bitset.
+         * bitset or of its complement.
          * @param other The fixed bitset to check if this bitset is a subset of.
+         * @param value Whether to check against the fixed bitset (true) or
+         * its complement (false).
          * @returns True if this bitset is a subset of the provided fixed
-         * bitset, false otherwise.
+         * bitset or its complement, false otherwise.
          */
-        bool isSubset(const FixedBitset& other) const;
+        bool isSubset(const FixedBitset& other, bool value = true) const;
 
         /**
-         * @brief Updates the bitset by applying the provided mask.
+         * @brief Updates the bitset by applying the provided mask or its
+         * complement.
          * @param other The fixed bitset mask to apply to the bitset.
+         * @param value Whether to apply the mask (true) or its complement
+         * (false).
+         * @returns void
+         */
+        void intersect(const FixedBitset& other, bool value = true);
+
+        /**
+         * @brief Irreversibly restricts the original state of the bitset to
+         * the provided mask.
+         * @param other The fixed bitset mask to restrict the bitset to.
          * @returns void
+         * 
+         * Unlike intersect, this may only be called before any mask has been
+         * applied, and reset returns to the restricted state.
          */
-        void intersect(const FixedBitset& other);
+        void restrictBase(const FixedBitset& other);
 
         /**
          * @brief Reverses the last mask applied to the bitset.
@@ -101,6 +133,22 @@ class Bitset {
          */
         BLOCK sumOfBlocks(const std::vector<BLOCK>& blockWeights) const;
 
+        /**
+         * @brief Writes the non-empty blocks of the bitset in canonical form.
+         * @param indices Output for the indices of the non-empty blocks, in
+         * increasing order.
+         * @param values Output for the values of the non-empty blocks, in the
+         * same order as their indices.
+         * @returns void
+         * 
+         * Two bitsets contain the same bits if and only if their canonical
+         * forms are equal, regardless of the order in which masks were applied.
+         */
+        void canonicalForm(
+            std::vector<unsigned int>& indices,
+            std::vector<BLOCK>& values
+        ) const;
+
         /**
          * @brief Outputs the bitset as a string of its blocks.
          */
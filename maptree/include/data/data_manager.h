@@ -9,11 +9,14 @@
 #ifndef DATA_MANAGER_H
 #define DATA_MANAGER_H
 
+#include <cstddef>
+#include <functional>
 #include <vector>
 #include <array>
 #include <limits>
 
 #include "data/fixed_bitset.h"
+#include "data/threshold_binarizer.h"
 
 /**
  * @class DataManager
@@ -21,9 +24,29 @@
  * 
  * This class uses the provided features and labels to precompute feature and
  * label masks for the searchers. These masks are stored as vectors of blocks
- * (unsigned long longs) and used by searchers to quickly update subproblems. 1
- * bits in label masks indicate that the point at that bit's index contains the
- * mask's label or feature value and a 0 bit indicates that it does not.
+ * (unsigned long longs) and used by searchers to quickly update subproblems.
+ *
+ * Samples with identical feature vectors are collapsed into a single row, so
+ * every mask has one bit per unique row rather than one bit per sample. A 1 bit
+ * in a feature mask indicates that the row at that bit's index has the feature
+ * set; only this mask is stored, and searchers apply its complement for the
+ * feature's 0 value. Labels are classes numbered from 0, and there are at least two
+ * classes. Since a row may stand for several samples, labels are stored as
+ * weight masks: bit b of the i-th weight mask for a label is set if bit i of
+ * the number of samples in that row with that label is set. Weighted label
+ * counts can then be computed from popcounts of the weight masks.
+ *
+ * Features that are constant across all rows can never be split on, and
+ * features that are identical or complementary to another feature always
+ * induce the same partition of any subproblem. The DataManager groups such
+ * features into equivalence classes so that searchers only need to consider one
+ * representative feature per class, with the size of the class giving the
+ * number of valid splits that the representative stands for.
+ *
+ * Samples can optionally be assigned to groups, e.g. cross-validation folds.
+ * Samples are then only collapsed into the same row if they are in the same
+ * group, so that every row belongs to exactly one group and searchers can
+ * restrict themselves to any union of groups with a group mask.
  */
 class DataManager {
     public:
@@ -31,53 +54,211 @@ class DataManager {
             const std::vector<std::vector<bool>>& features,
             const std::vector<bool>& labels
         )
-        : numFeatures_(features[0].size())
-        , numSamples_(features.size())
-        , featureMasks_(numFeatures_ * 2, FixedBitset(numSamples_))
-        , labelMasks_(2, FixedBitset(numSamples_))
+        : DataManager(features, labels, std::vector<size_t>())
+        {}
+
+        DataManager(
+            const std::vector<std::vector<bool>>& features,
+            const std::vector<bool>& labels,
+            const std::vector<size_t>& groups
+        )
+        : DataManager(features, std::vector<int>(labels.begin(), labels.end()), groups)
+        {}
+
+        /**
+         * @param features The features of each sample.
+         * @param labels The class of each sample, numbered from 0.
+         * @param groups The group of each sample, numbered from 0, or an empty
+         * vector to put all samples in group 0.
+         * @param numClasses The number of classes, or 0 to use the largest
+         * label plus one. There are always at least two classes.
+         * @param weights The non-negative integer weight of each sample, or
+         * an empty vector to give every sample weight 1. A sample of weight w
+         * counts as w copies of it, and samples of weight 0 are dropped.
+         * @throws std::invalid_argument If no sample has positive weight.
+         */
+        DataManager(
+            const std::vector<std::vector<bool>>& features,
+            const std::vector<int>& labels,
+            const std::vector<size_t>& groups = std::vector<size_t>(),
+            size_t numClasses = 0,
+            const std::vector<int>& weights = std::vector<int>()
+        )
+        : numFeatures_(features.empty() ? 0 : features[0].size())
+        , numClasses_(numClasses)
         {
+            buildRows(features, labels, groups, weights);
             buildFeatureMasks(features);
-            buildLabelMasks(labels);
+            buildFeatureClasses();
+            buildLabelMasks();
+            buildGroupMasks();
         }
 
+        /**
+         * @param binarizer The binarizer whose threshold features to use.
+         * @param labels The class of each sample, numbered from 0.
+         * @param groups The group of each sample, numbered from 0, or an empty
+         * vector to put all samples in group 0.
+         * @param numClasses The number of classes, or 0 to use the largest
+         * label plus one.
+         * @param weights The non-negative integer weight of each sample, or
+         * an empty vector to give every sample weight 1.
+         * @throws std::invalid_argument If no sample has positive weight.
+         *
+         * Rows and feature masks are built from the binarizer's bins, so the
+         * binary features are never materialized.
+         */
+        DataManager(
+            const ThresholdBinarizer& binarizer,
+            const std::vector<int>& labels,
+            const std::vector<size_t>& groups = std::vector<size_t>(),
+            size_t numClasses = 0,
+            const std::vector<int>& weights = std::vector<int>()
+        );
+
+        /**
+         * @param numFeatures The number of features.
+         * @param indptr The start of each sample's entries in indices, followed
+         * by the total number of entries, as in a CSR matrix.
+         * @param indices The features that are 1 for each sample, in the order
+         * of the samples. All other features are 0.
+         * @param labels The class of each sample, numbered from 0.
+         * @param groups The group of each sample, numbered from 0, or an empty
+         * vector to put all samples in group 0.
+         * @param numClasses The number of classes, or 0 to use the largest
+         * label plus one.
+         * @param weights The non-negative integer weight of each sample, or
+         * an empty vector to give every sample weight 1.
+         * @throws std::invalid_argument If no sample has positive weight.
+         *
+         * Rows and feature masks are built from the sparse features directly,
+         * so the dense features are never materialized. The masks still take
+         * one bit per row and feature, so only building them scales with the
+         * number of nonzeros.
+         */
+        DataManager(
+            size_t numFeatures,
+            const std::vector<size_t>& indptr,
+            const std::vector<size_t>& indices,
+            const std::vector<int>& labels,
+            const std::vector<size_t>& groups = std::vector<size_t>(),
+            size_t numClasses = 0,
+            const std::vector<int>& weights = std::vector<int>()
+        );
+
         /**
          * @brief Returns the number of features in the data.
         */
         size_t getNumFeatures() const;
 
         /**
-         * @brief Returns the number of samples in the data.
+         * @brief Returns the number of samples in the data, which is their
+         * total weight.
          */
         size_t getNumSamples() const;
 
         /**
-         * @brief Returns the mask for the provided feature and feature value.
+         * @brief Returns the number of label classes.
+         */
+        size_t getNumClasses() const;
+
+        /**
+         * @brief Returns the number of unique rows in the data, which is the
+         * number of bits in each mask.
+         */
+        size_t getNumRows() const;
+
+        /**
+         * @brief Returns the features searchers should consider splitting on.
+         * @returns One representative feature for each class of identical or
+         * complementary non-constant features, in increasing order.
+         */
+        const std::vector<size_t>& getSearchFeatures() const;
+
+        /**
+         * @brief Returns the number of features represented by the provided
+         * feature.
+         * @param feature The feature to get the multiplicity of.
+         * @returns The size of the feature's equivalence class if it is a
+         * search feature, and 0 otherwise.
+         */
+        size_t getFeatureMultiplicity(
+            size_t feature
+        ) const;
+
+        /**
+         * @brief Returns the mask of the rows in which the provided feature is
+         * set.
          * @param feature The feature to get the mask for.
-         * @param value The feature value to get the mask for.
-         * @returns The mask for the provided feature and feature value.
+         * @returns The mask for the provided feature, whose complement is the
+         * mask of the rows in which the feature is not set.
          */
         const FixedBitset& getFeatureMask(
-            size_t feature,
-            bool value
+            size_t feature
         ) const;
 
         /**
-         * @brief Returns the mask for the provided label value.
-         * @param value The label value to get the mask for.
-         * @returns The mask for the provided label value.
+         * @brief Returns the weight masks for the provided label.
+         * @param label The label to get the weight masks for.
+         * @returns The weight masks for the provided label, where the i-th
+         * mask holds bit i of each row's count of samples with the label.
+         */
+        const std::vector<FixedBitset>& getLabelWeightMasks(
+            size_t label
+        ) const;
+
+        /**
+         * @brief Returns the weight masks of all labels.
+         * @returns The weight masks of each label, indexed by label.
+         * @see getLabelWeightMasks
+         */
+        const std::vector<std::vector<FixedBitset>>& getAllLabelWeightMasks() const;
+
+        /**
+         * @brief Returns the number of sample groups.
+         */
+        size_t getNumGroups() const;
+
+        /**
+         * @brief Returns the mask of the rows in or outside the provided group.
+         * @param group The group to get the mask for.
+         * @param value Whether to get the mask of the rows in the group (true)
+         * or of all other rows (false).
+         * @returns The mask for the provided group and value.
          */
-        const FixedBitset& getLabelMask(
+        const FixedBitset& getGroupMask(
+            size_t group,
             bool value
         ) const;
 
     private:
         size_t numFeatures_;
-        size_t numSamples_;
+        size_t numSamples_ = 0;
+        size_t numClasses_;
+        size_t numRows_ = 0;
+        size_t numGroups_ = 1;
+        std::vector<size_t> rowSamples_;
+        std::vector<long long> rowLabelCounts_;
+        std::vector<size_t> rowGroups_;
         std::vector<FixedBitset> featureMasks_;
-        std::vector<FixedBitset> labelMasks_;
+        std::vector<size_t> searchFeatures_;
+        std::vector<size_t> featureMultiplicities_;
+        std::vector<std::vector<FixedBitset>> labelWeightMasks_;
+        std::vector<FixedBitset> groupMasks_;
 
+        template <typename Row, typename RowHash = std::hash<Row>>
+        void buildRows(
+            const std::vector<Row>& rows,
+            const std::vector<int>& labels,
+            const std::vector<size_t>& groups,
+            const std::vector<int>& weights
+        );
         void buildFeatureMasks(const std::vector<std::vector<bool>>& features);
-        void buildLabelMasks(const std::vector<bool>& labels);
+        void buildFeatureMasks(const ThresholdBinarizer& binarizer);
+        void buildSparseFeatureMasks(const std::vector<std::vector<unsigned>>& rowFeatures);
+        void buildFeatureClasses();
+        void buildLabelMasks();
+        void buildGroupMasks();
 };
 
 #endif
@@ -39,6 +39,21 @@ class FixedBitset {
             const std::vector<bool>& bits
         );
 
+        /**
+         * @brief Sets the bit at the provided index.
+         * @param idx The index of the bit to set.
+         * @returns void
+        */
+        void setBit(
+            size_t idx
+        );
+
+        /**
+         * @brief Flips every bit of this bitset.
+         * @returns void
+        */
+        void flip();
+
         /**
          * @brief Returns the block at the provided index.
          * @param index The index of the block to access.
@@ -47,10 +62,45 @@ class FixedBitset {
         BLOCK getBlock(
             size_t blockIdx
         ) const;
+
+        /**
+         * @brief Checks if no bits are set in this bitset.
+         * @returns True if no bits are set, false otherwise.
+        */
+        bool empty() const;
+
+        /**
+         * @brief Checks if all bits are set in this bitset.
+         * @returns True if all bits are set, false otherwise.
+        */
+        bool full() const;
+
+        /**
+         * @brief Returns a hash of the blocks of this bitset.
+         * @returns A hash of the blocks of this bitset.
+        */
+        size_t hash() const;
+
+        /**
+         * @brief Checks if the provided bitset has exactly the bits set that
+         * are not set in this bitset.
+         * @param other The bitset to compare with.
+         * @returns True if the bitsets are complementary, false otherwise.
+        */
+        bool isComplement(
+            const FixedBitset& other
+        ) const;
+
+        /**
+         * @brief Checks if two bitsets have the same bits set.
+        */
+        friend bool operator==(const FixedBitset& lhs, const FixedBitset& rhs);
     
     private:
-        [[maybe_unused]] size_t numSamples_;
+        size_t numSamples_;
         std::vector<BLOCK> blocks_;
+
+        BLOCK fullBlock(size_t idx) const;
 };
 
 #endif
@@ -0,0 +1,107 @@
+/**
+ * @file threshold_binarizer.h
+ * @brief Binarizes continuous and ordinal features with thresholds.
+ */
+
+#ifndef THRESHOLD_BINARIZER_H
+#define THRESHOLD_BINARIZER_H
+
+#include <cstddef>
+#include <string>
+#include <vector>
+
+/**
+ * @struct FeatureThreshold
+ * @brief The column and threshold a binary feature is derived from.
+ *
+ * The binary feature is 1 for samples whose value in the column is greater
+ * than the threshold, so its right subtree holds those samples.
+ */
+struct FeatureThreshold {
+    size_t column;
+    double threshold;
+};
+
+/**
+ * @class ThresholdBinarizer
+ * @brief Derives binary threshold features from continuous or ordinal columns.
+ *
+ * Initialized with the (finite) values of each sample's columns, this class
+ * chooses candidate thresholds for each column and derives a binary feature
+ * per threshold. Thresholds are midpoints between consecutive unique values of
+ * a column, either all of them or only those at the column's quantiles.
+ *
+ * The binary features are never materialized. Instead, each sample's value in
+ * a column is replaced by its bin, the number of the column's thresholds below
+ * it, from which the DataManager builds feature masks directly. The features of
+ * a column are numbered consecutively in order of increasing threshold, so the
+ * j-th feature of a column is 1 for a sample iff the sample's bin exceeds j.
+ */
+class ThresholdBinarizer {
+    public:
+        /**
+         * @param values The column values of each sample.
+         * @param numQuantiles If 0, every midpoint between consecutive unique
+         * values is a threshold. Otherwise, only the midpoints below the
+         * numQuantiles-quantiles of each column are.
+         */
+        ThresholdBinarizer(
+            const std::vector<std::vector<double>>& values,
+            size_t numQuantiles = 0
+        )
+        : numColumns_(values.empty() ? 0 : values[0].size())
+        {
+            buildThresholds(values, numQuantiles);
+            buildBins(values);
+        }
+
+        /**
+         * @brief Returns the number of samples.
+         */
+        size_t getNumSamples() const;
+
+        /**
+         * @brief Returns the number of columns.
+         */
+        size_t getNumColumns() const;
+
+        /**
+         * @brief Returns the number of binary features.
+         */
+        size_t getNumFeatures() const;
+
+        /**
+         * @brief Returns the column and threshold of each binary feature.
+         */
+        const std::vector<FeatureThreshold>& getThresholds() const;
+
+        /**
+         * @brief Returns the first binary feature of a column.
+         * @param column The column to get the first feature of.
+         * @returns The index of the column's first feature. The column's
+         * features end at the first feature of the next column.
+         */
+        size_t getFirstFeature(size_t column) const;
+
+        /**
+         * @brief Returns the bin of each sample's value in each column.
+         */
+        const std::vector<std::vector<unsigned>>& getBins() const;
+
+        /**
+         * @brief Returns a name of the form "x<column>><threshold>" for each
+         * binary feature.
+         * @see DecisionTree::toString
+         */
+        std::vector<std::string> getFeatureNames() const;
+    private:
+        size_t numColumns_;
+        std::vector<FeatureThreshold> thresholds_;
+        std::vector<size_t> firstFeatures_;
+        std::vector<std::vector<unsigned>> bins_;
+
+        void buildThresholds(const std::vector<std::vector<double>>& values, size_t numQuantiles);
+        void buildBins(const std::vector<std::vector<double>>& values);
+};
+
+#endif
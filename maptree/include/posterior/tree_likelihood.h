@@ -4,6 +4,10 @@
  * 
  * This file contains the functions used to compute the likelihood of a given
  * tree based on the BCART statistical model for use in MAP tree search.
+ * Labels may take any number K >= 2 of classes, in which case the leaves hold
+ * categorical distributions with a Dirichlet prior, and the leaf likelihood is
+ * the Dirichlet-multinomial marginal likelihood. For K = 2, this is the Beta-
+ * Bernoulli likelihood of BCART.
  * 
  * @see https://www.jstor.org/stable/2669832
  */
@@ -16,6 +20,8 @@
 #include <array>
 #include <cmath>
 
+#include "constants.h"
+
 /**
  * @class TreeLikelihood
  * @brief Contains the likelihood function for the leaves of a BCART tree as
@@ -23,11 +29,33 @@
  */
 class TreeLikelihood {
     public:
+        /**
+         * @param rho The parameters of the Dirichlet prior for the categorical
+         * distribution in each leaf node, one per class.
+         */
         TreeLikelihood(
-            const std::array<double, 2> rho
-        )
-        : rho_(rho)
-        {};
+            const std::vector<double>& rho
+        );
+
+        /**
+         * @brief Returns the number of classes.
+         */
+        size_t getNumClasses() const;
+
+        /**
+         * @brief Computes the natural log of the absolute value of the Gamma
+         * function.
+         * @param x The argument of the Gamma function.
+         * @returns The natural log of the absolute value of the Gamma
+         * function.
+         * 
+         * Unlike std::lgamma, this does not write the sign of the Gamma
+         * function to the global signgam, so a likelihood can be shared
+         * between threads, e.g. those searching cross-validation folds.
+         */
+        static double logGamma(
+            double x
+        );
 
         /**
          * @brief Computes the natural log of the Beta function.
@@ -39,35 +67,43 @@ class TreeLikelihood {
             double alpha,
             double beta
         ) {
-            return std::lgamma(alpha) + std::lgamma(beta) - std::lgamma(alpha + beta);
+            return logGamma(alpha) + logGamma(beta) - logGamma(alpha + beta);
         }
 
         /**
-         * @brief Computes the natural log likelihood of the provided binary label
+         * @brief Computes the natural log likelihood of the provided label
          * counts in a particular leaf node.
-         * @param labelCounts The number of points in the leaf node with each binary
+         * @param labelCounts The number of points in the leaf node with each
          * label.
-         * @returns The natural log likelihood of the provided binary label counts
+         * @returns The natural log likelihood of the provided label counts
          */
         double logLikelihood(
-            const std::array<int, 2>& labelCounts
+            const LabelCounts& labelCounts
         ) const;
 
         /**
          * @brief Computes the natural log likelihood of a perfect split of the
-         * provided binary label counts.
-         * @param labelCounts The count of points with each binary label.
-         * @param rho The index of the Beta distribution prior for the Bernoulli
-         * distribution in the node.
-         * @returns The natural log likelihood of a perfect split of the.
+         * provided label counts.
+         * @param labelCounts The count of points with each label.
+         * @returns The natural log likelihood of the points of each label
+         * being in a leaf of their own.
+         * 
+         * This is the largest log likelihood any partition of the points into
+         * leaves can reach, since the leaf likelihood of a set of points never
+         * exceeds the product of the leaf likelihoods of its points of each
+         * label.
          */
         double logLikelihoodPerfectSplit(
-            const std::array<int, 2>& labelCounts
+            const LabelCounts& labelCounts
         ) const;
 
 
     private:
-        std::array<double, 2> rho_;
+        std::vector<double> rho_;
+        double rhoSum_;
+        std::vector<double> logGammaRho_;
+        double logGammaRhoSum_;
+        double logMultiBetaRho_;
 };
 
 #endif
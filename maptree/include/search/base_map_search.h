@@ -52,7 +52,7 @@ class BaseMAPSearch {
          * @returns The lower bound.
          */
         double getLowerBound(
-            const std::array<int, 2>& labelCounts,
+            const LabelCounts& labelCounts,
             size_t depth,
             size_t numValidSplits = UNKNOWN_VALID_SPLITS
         ) const;
@@ -66,7 +66,7 @@ class BaseMAPSearch {
          * @returns The lower bound.
          */
         double getUpperBound(
-                const std::array<int, 2>& labelCounts,
+                const LabelCounts& labelCounts,
                 size_t depth,
                 size_t numValidSplits = UNKNOWN_VALID_SPLITS
         ) const;
@@ -10,19 +10,35 @@
 #ifndef BEFS_MAP_SEARCH_H
 #define BEFS_MAP_SEARCH_H
 
-#include <forward_list>
+#include <functional>
+#include <memory>
+#include <string>
 #include <vector>
 #include <array>
 
 #include "constants.h"
 #include "subproblem.h"
 #include "cache/approx_bitset_cache.h"
+#include "cache/structure_store.h"
 #include "search/base_map_search.h"
+#include "search/cancellation_token.h"
+#include "search/node_arena.h"
 #include "solution/decision_tree.h"
+#include "solution/search_stats.h"
+#include "solution/search_progress.h"
 
 //! Forward declaration of AndNode for use in OrNode.
 struct AndNode;
 
+/**
+ * @struct ParentLink
+ * @brief Entry of the list of parents of an OR node.
+ */
+struct ParentLink {
+    AndNode *parent;
+    ParentLink *next;
+};
+
 /**
  * @struct OrNode
  * @brief Represents an OR node in the explicit AND/OR search graph or a 
@@ -31,23 +47,30 @@ struct AndNode;
  * This struct represents an OR node in the explicit AND/OR search graph or a
  * subproblem in the optimal decision tree search problem. The OR node contains
  * the lower and upper bounds on the unnormalized log posterior for the
- * subproblem, as well as the children of the OR node. The children of the OR
+ * subproblem, the hash values of the subproblem's bitset, as well as the
+ * children of the OR node. The children of the OR
  * node are AND nodes which represents valid splits of the subproblem. The OR
- * node also contains a pointer to the AND nodes with the best upper/lower
+ * node also contains the number of valid splits of the subproblem, which may
+ * exceed the number of children since each child can stand for several
+ * equivalent features, and pointers to the AND nodes with the best upper/lower
  * bounds. These are used to efficiently identify the next tree to expand and
  * the best tree found so far. The OR node also contains a list of pointers to
  * its parents, which is used to efficiently backpropagate upper/lower bounds
- * through the explicit search graph.
+ * through the explicit search graph. The children and parents are stored in
+ * the arenas of the search, like the nodes themselves.
 */
 struct OrNode {
     size_t depth;
+    size_t numValidSplits;
+    BitsetHash hashedBitset;
     double lowerBound;
     double upperBound;
     bool expanded;
     AndNode *childWithBestLB;
     AndNode *childWithBestUB;
-    std::vector<AndNode *> children;
-    std::forward_list<AndNode *> parents;
+    AndNode **children;
+    size_t numChildren;
+    ParentLink *parents;
     bool isSolved() {
         return lowerBound == upperBound;
     };
@@ -62,12 +85,15 @@ struct OrNode {
  * split of its parent subproblem in the optimal decision tree search problem.
  * The AND node contains the feature it splits on, as well as the two resulting
  * OR Nodes representing child subproblems (left is feature = 0, right is
- * feature = 1). The AND node also contains a pointer to its parent OR node,
- * which is used to efficiently backpropagate upper/lower bounds through the
- * explicit search graph.
+ * feature = 1). Features which induce the same partition of the parent
+ * subproblem share a single AND node, and the AND node's multiplicity is the
+ * number of valid splits it represents. The AND node also contains a pointer to
+ * its parent OR node, which is used to efficiently backpropagate upper/lower
+ * bounds through the explicit search graph.
  */
 struct AndNode {
     size_t feature;
+    size_t multiplicity;
     OrNode *leftChild;
     OrNode *rightChild;
     OrNode *parent;
@@ -87,55 +113,198 @@ struct AndNode {
  * 
  * 1. Initialize the explicit graph with the full subproblem as the root OR
  *    Node.
- * 2. While the root OR Node is not solved and the expansion limit and time
- *    limit have not been reached:
+ * 2. While the root OR Node is not solved, the expansion limit and time
+ *    limit have not been reached and the search has not been cancelled:
  *      2a. Find an unexpanded leaf of the tree in the explicity graph with the
  *          lowest lower bound.
- *      2b. Expand this leaf, adding its children to the explicit graph.
+ *      2b. Expand this leaf, adding its children to the explicit graph. The
+ *          leaf's valid splits and the label counts and bitset hashes of its
+ *          children are looked up in a depth-independent structure cache
+ *          and only computed from the bitset if the same set of points has
+ *          not been expanded before.
  *      2c. Update the bounds of this leaf and its descendants.
  * 3. Return the best tree found so far.
+ * 
+ * Every time the bounds of the root improve, they are recorded in the
+ * solution's trajectory. If a progress callback is set, it is also called
+ * whenever the bounds improve or every given number of expansions, but at most
+ * once per given time interval.
+ * 
+ * The time limit is in (possibly fractional) seconds. A running search can be
+ * cancelled from another thread through a CancellationToken, and an interrupt
+ * check can be set that is called periodically and may throw to abort the
+ * search, e.g. when a signal is pending.
+ * 
+ * The explicit graph, its bounds and cache keys, the statistics and the
+ * trajectory can be saved to a checkpoint file, periodically during the search
+ * or on demand, and restored into a new search over the same data, prior and
+ * likelihood. Expansion and time limits count the expansions and time spent
+ * before the checkpoint, so a restored search continued up to the same limits
+ * returns the same solution as an uninterrupted one. The structure cache is
+ * not saved and is refilled as nodes are expanded.
+ * 
+ * The structure cache and, in exact cache mode, the canonical bitset store
+ * form a StructureStore, which can be passed in to share it with other
+ * searches over the same data, e.g. to sweep over prior hyperparameters.
+ * 
+ * The nodes of the explicit graph and their lists of children and parents are
+ * allocated from chunked arenas, so that the graph is freed in a few steps and
+ * a search object destroyed right after reaching its time limit or being
+ * cancelled does not keep the caller waiting.
+ * 
+ * The search can be restricted to a subset of the rows of the data with a row
+ * mask, e.g. to the training rows of a cross-validation fold, without building
+ * a separate DataManager.
+ * 
+ * Subproblems are identified by the hash values of their bitsets, which may
+ * collide with negligible probability. In exact cache mode, hash hits are
+ * verified against the canonical form of the bitset and subproblems are
+ * identified by collision-free ids from a CanonicalBitsetStore instead.
  */
 class BestFirstSearchMAPSearch : BaseMAPSearch {
     public:
-        static constexpr int INF_EXPANSIONS = -1;
-        static constexpr int INF_TIME_LIMIT = -1;
+        static constexpr long long INF_EXPANSIONS = -1;
+        static constexpr double INF_TIME_LIMIT = -1.0;
 
         BestFirstSearchMAPSearch(
             const DataManager& dm,
             const TreeLikelihood& likelihood,
             const TreePrior& prior,
-            int numExpansions = INF_EXPANSIONS,
-            int timeLimit = INF_TIME_LIMIT
+            long long numExpansions = INF_EXPANSIONS,
+            double timeLimit = INF_TIME_LIMIT,
+            bool exactCache = false,
+            std::shared_ptr<StructureStore> store = nullptr,
+            const FixedBitset *rowMask = nullptr
         )
         : BaseMAPSearch(dm, likelihood, prior)
-        , cache_(NUM_BLOCKS(dm_.getNumSamples()))
+        , cache_(NUM_BLOCKS(dm_.getNumRows()))
+        , store_(store ? std::move(store) : std::make_shared<StructureStore>())
+        , exactCache_(exactCache)
         , expansionLimit_(numExpansions)
         , timeLimit_(timeLimit)
-        , subproblem_(dm_)
-        , rootNode_(buildNode(subproblem_.getLabelCounts(), 0))
+        , subproblem_(dm_, rowMask)
+        , rootNode_(buildNode(subproblem_.getLabelCounts(), 0, hashSubproblem()))
         {};
         ~BestFirstSearchMAPSearch() override { 
-            for (OrNode *orNode : orNodes_) delete orNode;
-            for (AndNode *andNode : andNodes_) delete andNode;
+            clearGraph();
         };
         Solution search() override;
 
+        /**
+         * @brief Builds the best tree found so far.
+         * @returns The best tree found so far, owned by the caller.
+         */
+        DecisionTree *getBestTree();
+
+        /**
+         * @brief Sets a callback to report the progress of the search to.
+         * @param callback The callback to call with the search's progress.
+         * @param expansionInterval If positive, the callback is also called
+         * every expansionInterval expansions, not only when the bounds
+         * improve.
+         * @param minTimeInterval The minimum time in seconds between two
+         * calls, except for the final call at the end of the search.
+         * @returns void
+         */
+        void setProgressCallback(
+            ProgressCallback callback,
+            size_t expansionInterval = 0,
+            double minTimeInterval = 0.0
+        );
+
+        /**
+         * @brief Sets a token through which the search can be cancelled.
+         * @param token The token to poll once per expansion, or nullptr. It
+         * must outlive the search.
+         * @returns void
+         */
+        void setCancellationToken(const CancellationToken *token);
+
+        /**
+         * @brief Sets a check to call periodically during the search.
+         * @param check The check to call. It may throw to abort the search.
+         * @param interval The time in seconds between two calls.
+         * @returns void
+         */
+        void setInterruptCheck(std::function<void()> check, double interval);
+
+        /**
+         * @brief Sets a file to periodically save checkpoints of the search to.
+         * @param path The path of the checkpoint file. It is replaced
+         * atomically, so it always holds a complete checkpoint.
+         * @param interval The time in seconds between two checkpoints. A
+         * checkpoint is also saved at the end of the search.
+         * @returns void
+         */
+        void setCheckpoint(const std::string& path, double interval);
+
+        /**
+         * @brief Saves a checkpoint of the search.
+         * @param path The path of the checkpoint file.
+         * @returns void
+         * @throws std::runtime_error If the file cannot be written.
+         * @see search_checkpoint.h
+         */
+        void saveCheckpoint(const std::string& path) const;
+
+        /**
+         * @brief Replaces the state of the search with a saved checkpoint.
+         * @param path The path of the checkpoint file.
+         * @returns void
+         * @throws std::runtime_error If the file cannot be read or was saved
+         * by a search over different data, with a different prior or
+         * likelihood or with a different cache mode.
+         * 
+         * In exact cache mode, this replaces the contents of the search's
+         * StructureStore, which must then not be shared with other searches.
+         */
+        void restoreCheckpoint(const std::string& path);
+
     private:
+        //! Relative difference up to which two bounds are equal up to the
+        //! rounding errors of summing the bounds of a node's children.
+        static constexpr double BOUND_TOLERANCE = 1e-12;
+
         ApproxBitsetCache cache_;
-        std::forward_list<OrNode *> orNodes_ = std::forward_list<OrNode *>();
-        std::forward_list<AndNode *> andNodes_ = std::forward_list<AndNode *>();
-        int expansionLimit_;
-        int timeLimit_;
+        std::shared_ptr<StructureStore> store_;
+        bool exactCache_;
+        std::vector<unsigned int> canonicalIndices_;
+        std::vector<BLOCK> canonicalValues_;
+        SearchStats stats_;
+        SearchTrajectory trajectory_;
+        ProgressCallback progressCallback_;
+        size_t progressExpansionInterval_ = 0;
+        double progressMinTimeInterval_ = 0.0;
+        const CancellationToken *cancellationToken_ = nullptr;
+        std::function<void()> interruptCheck_;
+        double interruptCheckInterval_ = 0.0;
+        std::string checkpointPath_;
+        double checkpointInterval_ = 0.0;
+        double elapsedTime_ = 0.0;
+        NodeArena<OrNode> orNodes_;
+        NodeArena<AndNode> andNodes_;
+        NodeArena<AndNode *> childLists_;
+        NodeArena<ParentLink> parentLinks_;
+        long long expansionLimit_;
+        double timeLimit_;
         Subproblem subproblem_;
         OrNode *rootNode_;
 
-        OrNode *buildNode(const std::array<int, 2>& labelCounts, size_t depth);
+        OrNode *buildNode(const LabelCounts& labelCounts, size_t depth, const BitsetHash& hashedBitset);
+        OrNode *getNode(const LabelCounts& labelCounts, size_t depth, const BitsetHash& hashedBitset);
+        const SubproblemStructure& getStructure(OrNode *node);
+        BitsetHash hashSubproblem();
         OrNode *findExpandableLeaf();
         void expand(OrNode *node);
         bool updateLowerBound(OrNode *node);
         void backpropagateLowerBound(OrNode *source);
         void backpropagateUpperBound(OrNode *source);
         DecisionTree *buildDecisionTree(OrNode *node);
+        std::string getTreeRepresentation();
+        void recordProgress(double elapsedTime);
+        void reportProgress(double elapsedTime);
+        void clearGraph();
+        unsigned long long checkpointFingerprint() const;
 };
 
 #endif
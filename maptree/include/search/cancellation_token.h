@@ -0,0 +1,40 @@
+/**
+ * @file cancellation_token.h
+ * @brief Defines a token to cooperatively cancel a running search.
+ * 
+ * This file contains the definition of the CancellationToken class, which
+ * can be shared between a running search and other threads to request that
+ * the search stops after its current expansion.
+*/
+
+#ifndef CANCELLATION_TOKEN_H
+#define CANCELLATION_TOKEN_H
+
+#include <atomic>
+
+/**
+ * @class CancellationToken
+ * @brief Thread-safe flag requesting that a search stops.
+ * 
+ * A search polls the token once per expansion. Once cancelled, the search
+ * stops and returns the best tree found so far, just as if it had reached its
+ * expansion or time limit. A token stays cancelled until it is reset.
+ */
+class CancellationToken {
+    public:
+        CancellationToken() : cancelled_(false) {};
+
+        //! Requests that any search polling this token stops.
+        void cancel() { cancelled_.store(true, std::memory_order_relaxed); };
+
+        //! Clears a previous cancellation request.
+        void reset() { cancelled_.store(false, std::memory_order_relaxed); };
+
+        //! Returns whether or not cancellation has been requested.
+        bool isCancelled() const { return cancelled_.load(std::memory_order_relaxed); };
+
+    private:
+        std::atomic<bool> cancelled_;
+};
+
+#endif
@@ -0,0 +1,59 @@
+/**
+ * @file cross_validation.h
+ * @brief Best-first searches over the folds of a cross-validation.
+ * 
+ * This file contains a function which runs a best-first search on the training
+ * rows of each cross-validation fold of a DataManager whose sample groups are
+ * the folds. Each search is restricted to its training rows with a group mask,
+ * and the held-out performance of its tree is computed by applying the tree's
+ * splits to the bitset of the held-out rows, so no per-fold copy of the data
+ * is ever built.
+ */
+
+#ifndef CROSS_VALIDATION_H
+#define CROSS_VALIDATION_H
+
+#include <functional>
+#include <vector>
+
+#include "data/data_manager.h"
+#include "posterior/tree_likelihood.h"
+#include "posterior/tree_prior.h"
+#include "search/befs_map_search.h"
+#include "search/cancellation_token.h"
+#include "solution/fold_result.h"
+
+/**
+ * @brief Runs a best-first search on each cross-validation fold.
+ * @param dm The data to search over, with one sample group per fold. The
+ * samples of group k are held out by the k-th search.
+ * @param likelihood The likelihood used by all searches.
+ * @param prior The prior used by all searches.
+ * @param numExpansions The maximum number of expansions of each search.
+ * @param timeLimit The time limit of each search in seconds.
+ * @param exactCache Whether or not the searches use the exact cache mode.
+ * @param numThreads The number of folds to search in parallel. If 0, the
+ * number of hardware threads.
+ * @param cancellationToken If not nullptr, a token through which the folds can
+ * be cancelled. Cancelled searches return their best trees so far.
+ * @param interruptCheck If set, a check called periodically from the calling
+ * thread while the folds are searched. If it throws, all searches are
+ * cancelled and the exception is rethrown.
+ * @param interruptCheckInterval The time in seconds between two calls.
+ * @returns The result of each fold, in the order of the groups.
+ * @see BestFirstSearchMAPSearch
+ */
+std::vector<FoldResult> crossValidateBeFS(
+    const DataManager& dm,
+    const TreeLikelihood& likelihood,
+    const TreePrior& prior,
+    long long numExpansions = BestFirstSearchMAPSearch::INF_EXPANSIONS,
+    double timeLimit = BestFirstSearchMAPSearch::INF_TIME_LIMIT,
+    bool exactCache = false,
+    size_t numThreads = 0,
+    const CancellationToken *cancellationToken = nullptr,
+    std::function<void()> interruptCheck = nullptr,
+    double interruptCheckInterval = 0.05
+);
+
+#endif
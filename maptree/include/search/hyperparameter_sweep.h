@@ -0,0 +1,57 @@
+/**
+ * @file hyperparameter_sweep.h
+ * @brief Best-first searches over several priors sharing their structure.
+ * 
+ * This file contains a function which runs a best-first search for each of
+ * several tree priors over the same data. The searches share a StructureStore,
+ * so a subproblem's valid splits, label counts and children are only computed
+ * from its bitset by the first search expanding it, and every later search
+ * only recomputes the prior-dependent bounds.
+ */
+
+#ifndef HYPERPARAMETER_SWEEP_H
+#define HYPERPARAMETER_SWEEP_H
+
+#include <functional>
+#include <vector>
+
+#include "data/data_manager.h"
+#include "posterior/tree_likelihood.h"
+#include "posterior/tree_prior.h"
+#include "search/befs_map_search.h"
+#include "search/cancellation_token.h"
+#include "solution/solution.h"
+
+/**
+ * @brief Runs a best-first search for each of the provided priors.
+ * @param dm The data to search over.
+ * @param likelihood The likelihood shared by all searches.
+ * @param priors The priors to search with, in order.
+ * @param numExpansions The maximum number of expansions of each search.
+ * @param timeLimit The time limit of each search in seconds.
+ * @param exactCache Whether or not the searches use the exact cache mode.
+ * @param cancellationToken If not nullptr, a token through which the sweep can
+ * be cancelled. Searches still to run when it is cancelled return their
+ * initial bounds.
+ * @param interruptCheck If set, a check each search calls periodically, which
+ * may throw to abort the sweep.
+ * @param interruptCheckInterval The time in seconds between two calls.
+ * @returns The solution of each search, in the order of the priors.
+ * @see BestFirstSearchMAPSearch
+ * 
+ * The searches run one after the other, since the shared store is not
+ * thread-safe.
+ */
+std::vector<Solution> sweepBeFS(
+    const DataManager& dm,
+    const TreeLikelihood& likelihood,
+    const std::vector<const TreePrior *>& priors,
+    long long numExpansions = BestFirstSearchMAPSearch::INF_EXPANSIONS,
+    double timeLimit = BestFirstSearchMAPSearch::INF_TIME_LIMIT,
+    bool exactCache = false,
+    const CancellationToken *cancellationToken = nullptr,
+    std::function<void()> interruptCheck = nullptr,
+    double interruptCheckInterval = 0.0
+);
+
+#endif
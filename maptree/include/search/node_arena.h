@@ -0,0 +1,77 @@
+/**
+ * @file node_arena.h
+ * @brief Chunked storage for the nodes of the explicit search graph.
+ *
+ * This file contains the NodeArena class template, which allocates the nodes
+ * of the explicit AND/OR search graph and their adjacency lists in large
+ * chunks, so that a graph of millions of nodes is freed in a few steps.
+*/
+
+#ifndef NODE_ARENA_H
+#define NODE_ARENA_H
+
+#include <algorithm>
+#include <memory>
+#include <type_traits>
+#include <vector>
+
+/**
+ * @class NodeArena
+ * @brief Allocates objects in chunks which are only freed all at once.
+ * @tparam T The type of the objects. Their destructors are never run, so it
+ * must be trivially destructible.
+ *
+ * Allocated objects are value-initialized and keep their addresses until the
+ * arena is cleared or destroyed. Objects allocated together are contiguous.
+ */
+template <typename T>
+class NodeArena {
+    static_assert(std::is_trivially_destructible<T>::value, "arena objects are never destroyed");
+
+    public:
+        /**
+         * @brief Allocates contiguous objects.
+         * @param count The number of objects to allocate.
+         * @returns A pointer to the first of the objects.
+         */
+        T *allocate(size_t count = 1) {
+            if (chunks_.empty() || chunks_.back().size + count > chunks_.back().capacity) {
+                size_t capacity = std::max(CHUNK_SIZE, count);
+                chunks_.push_back({std::unique_ptr<T[]>(new T[capacity]()), capacity, 0});
+            }
+            Chunk& chunk = chunks_.back();
+            T *objects = chunk.objects.get() + chunk.size;
+            chunk.size += count;
+            return objects;
+        }
+
+        /**
+         * @brief Calls a function on each allocated object, in order of
+         * allocation.
+         * @param function The function to call with a reference to each object.
+         * @returns void
+         */
+        template <typename Function>
+        void forEach(Function function) const {
+            for (const Chunk& chunk : chunks_) {
+                for (size_t i = 0; i < chunk.size; i++) function(chunk.objects[i]);
+            }
+        }
+
+        //! Frees all allocated objects.
+        void clear() { chunks_.clear(); }
+
+    private:
+        //! Number of objects per chunk, unless more are allocated at once.
+        static constexpr size_t CHUNK_SIZE = 1 << 12;
+
+        struct Chunk {
+            std::unique_ptr<T[]> objects;
+            size_t capacity;
+            size_t size;
+        };
+
+        std::vector<Chunk> chunks_;
+};
+
+#endif
@@ -0,0 +1,109 @@
+/**
+ * @file search_checkpoint.h
+ * @brief Defines the binary layout of best-first search checkpoints.
+ *
+ * This file contains the definitions of the fixed-size records a checkpoint of
+ * BestFirstSearchMAPSearch consists of. A checkpoint file is a
+ * CheckpointHeader followed by these sections, each a contiguous array whose
+ * length is given in the header:
+ *
+ * 1. OrNodeRecord[numOrNodes]
+ * 2. AndNodeRecord[numAndNodes]
+ * 3. unsigned long long parentLinks[numParentLinks]
+ * 4. double elapsedTimes[numTrajectoryPoints]
+ * 5. unsigned long long numExpansions[numTrajectoryPoints]
+ * 6. double lowerBounds[numTrajectoryPoints]
+ * 7. double upperBounds[numTrajectoryPoints]
+ * 8. unsigned long long canonicalOffsets[numCanonicalForms + 1]
+ * 9. BLOCK canonicalValues[numCanonicalBlocks]
+ * 10. unsigned int canonicalIndices[numCanonicalBlocks]
+ *
+ * Nodes refer to each other by their positions in these arrays, and all
+ * sections except the last start at a multiple of 8 bytes, so the file can be
+ * read with one bulk read per section or memory-mapped as is. The canonical
+ * sections are empty unless the search uses its exact cache. Checkpoints use
+ * the native byte order and are only meant to be restored on the same
+ * platform.
+*/
+
+#ifndef SEARCH_CHECKPOINT_H
+#define SEARCH_CHECKPOINT_H
+
+#include <array>
+
+#include "solution/search_stats.h"
+
+//! Magic bytes at the start of every checkpoint file.
+constexpr std::array<char, 8> CHECKPOINT_MAGIC = {'M', 'A', 'P', 'T', 'C', 'K', 'P', 'T'};
+
+//! Version of the checkpoint layout, bumped whenever a record changes.
+constexpr unsigned long long CHECKPOINT_VERSION = 3;
+
+//! Node index standing for a null pointer.
+constexpr long long CHECKPOINT_NO_NODE = -1;
+
+/**
+ * @struct CheckpointHeader
+ * @brief Describes the search a checkpoint was taken from and its sections.
+ *
+ * The number of rows, features and classes, the cache mode and the fingerprint
+ * must match those of the search the checkpoint is restored into. The
+ * fingerprint hashes the collapsed rows with their label weights, the rows the
+ * search is restricted to and values of the prior and likelihood, so that a
+ * checkpoint is not restored into a search with other data or parameters.
+ */
+struct CheckpointHeader {
+    std::array<char, 8> magic;
+    unsigned long long version;
+    unsigned long long numRows;
+    unsigned long long numFeatures;
+    unsigned long long numClasses;
+    unsigned long long exactCache;
+    unsigned long long fingerprint;
+    unsigned long long rootNode;
+    unsigned long long numOrNodes;
+    unsigned long long numAndNodes;
+    unsigned long long numParentLinks;
+    unsigned long long numTrajectoryPoints;
+    unsigned long long numCanonicalForms;
+    unsigned long long numCanonicalBlocks;
+    double elapsedTime;
+    SearchStats stats;
+};
+
+/**
+ * @struct OrNodeRecord
+ * @brief Stores an OrNode.
+ *
+ * The children of an OR node are stored contiguously in the AND node section
+ * and the indices of the AND nodes in its parents list contiguously in the
+ * parent link section.
+ */
+struct OrNodeRecord {
+    unsigned long long depth;
+    unsigned long long numValidSplits;
+    std::array<unsigned long long, 2> hashedBitset;
+    double lowerBound;
+    double upperBound;
+    unsigned long long expanded;
+    long long childWithBestLB;
+    long long childWithBestUB;
+    unsigned long long firstChild;
+    unsigned long long numChildren;
+    unsigned long long firstParentLink;
+    unsigned long long numParentLinks;
+};
+
+/**
+ * @struct AndNodeRecord
+ * @brief Stores an AndNode.
+ */
+struct AndNodeRecord {
+    unsigned long long feature;
+    unsigned long long multiplicity;
+    unsigned long long leftChild;
+    unsigned long long rightChild;
+    unsigned long long parent;
+};
+
+#endif
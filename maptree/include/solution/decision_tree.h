@@ -76,6 +76,16 @@ class DecisionTree {
          */
         std::string toString() const;
 
+        /**
+         * @brief Returns a string representation of the tree with named
+         * features.
+         * @param featureNames The name of each feature, which replaces the
+         * feature's index in the representation.
+         * @returns A string representation of the tree.
+         * @see DecisionTree::toString
+         */
+        std::string toString(const std::vector<std::string>& featureNames) const;
+
         /**
          * @brief Returns a string representation of the tree.
          * @see DecisionTree::toString
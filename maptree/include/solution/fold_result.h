@@ -0,0 +1,36 @@
+/**
+ * @file fold_result.h
+ * @brief Defines the result of a search on a cross-validation fold.
+ * 
+ * This file contains the definition of the FoldResult struct, which holds the
+ * solution of a search on the training rows of a cross-validation fold and
+ * the performance of its tree on the training and held-out samples.
+*/
+
+#ifndef FOLD_RESULT_H
+#define FOLD_RESULT_H
+
+#include <cstddef>
+
+#include "solution/solution.h"
+
+/**
+ * @struct FoldResult
+ * @brief Contains the result of a search on a cross-validation fold.
+ * 
+ * Each leaf of the tree predicts the majority label of the training samples
+ * it contains, with ties going to label 0. The log likelihoods are the sums
+ * over the leaves of the leaf likelihood of the training or held-out samples
+ * in each leaf.
+ */
+struct FoldResult {
+    Solution solution;
+    size_t numTrainSamples;
+    size_t numTestSamples;
+    size_t numTrainCorrect;
+    size_t numTestCorrect;
+    double trainLogLikelihood;
+    double testLogLikelihood;
+};
+
+#endif
@@ -0,0 +1,53 @@
+/**
+ * @file search_progress.h
+ * @brief Defines the anytime progress of a search.
+ * 
+ * This file contains the definitions of the SearchProgress struct, which
+ * describes the state of a search at a point in time and is passed to progress
+ * callbacks, and the SearchTrajectory struct, which records the bounds of a
+ * search every time they improve so that a single search yields its whole
+ * anytime profile.
+*/
+
+#ifndef SEARCH_PROGRESS_H
+#define SEARCH_PROGRESS_H
+
+#include <cstddef>
+#include <functional>
+#include <string>
+#include <vector>
+
+/**
+ * @struct SearchProgress
+ * @brief Contains the state of a search at a point in time.
+ * 
+ * The elapsed time is in seconds since the start of the search, and the tree
+ * representation is that of the best tree found so far.
+ */
+struct SearchProgress {
+    double elapsedTime;
+    size_t numExpansions;
+    double lowerBound;
+    double upperBound;
+    std::string treeRepresentation;
+};
+
+//! Callback receiving the progress of a search.
+typedef std::function<void(const SearchProgress&)> ProgressCallback;
+
+/**
+ * @struct SearchTrajectory
+ * @brief Contains the bounds of a search every time they improved.
+ * 
+ * The i-th entries of the vectors describe the i-th recorded point. The first
+ * point is the state before the first expansion and the last point is the
+ * state at the end of the search.
+ */
+struct SearchTrajectory {
+    std::vector<double> elapsedTimes;
+    std::vector<size_t> numExpansions;
+    std::vector<double> lowerBounds;
+    std::vector<double> upperBounds;
+};
+
+#endif
@@ -0,0 +1,77 @@
+/**
+ * @file search_stats.h
+ * @brief Defines the SearchStats struct and the phase timing macro.
+ * 
+ * This file contains the definition of the SearchStats struct, which is used to
+ * report how a search spent its time and how large its explicit search graph
+ * grew. Counters are always collected. Per-phase wall-clock timers are only
+ * collected if the library is compiled with MAPTREE_ENABLE_TIMERS defined, and
+ * otherwise compile to nothing and are reported as 0.
+*/
+
+#ifndef SEARCH_STATS_H
+#define SEARCH_STATS_H
+
+#include <cstddef>
+#include <chrono>
+
+/**
+ * @struct SearchStats
+ * @brief Contains statistics about a search.
+ * 
+ * Times are in seconds. The explicit search graph never shrinks during a
+ * search, so its final memory footprint is also its peak.
+ */
+struct SearchStats {
+    size_t numExpansions = 0;
+    size_t numOrNodes = 0;
+    size_t numAndNodes = 0;
+    size_t numCacheHits = 0;
+    size_t numCacheMisses = 0;
+    size_t numStructureCacheHits = 0;
+    size_t numStructureCacheMisses = 0;
+    size_t peakGraphMemory = 0;
+    double findExpandableLeafTime = 0.0;
+    double expandTime = 0.0;
+    double backpropagateLowerBoundTime = 0.0;
+    double backpropagateUpperBoundTime = 0.0;
+
+#ifdef MAPTREE_ENABLE_TIMERS
+    static constexpr bool TIMERS_ENABLED = true;
+#else
+    static constexpr bool TIMERS_ENABLED = false;
+#endif
+};
+
+/**
+ * @class PhaseTimer
+ * @brief Adds the wall-clock time between its construction and destruction
+ * to the provided total.
+ */
+class PhaseTimer {
+    public:
+        PhaseTimer(
+            double& total
+        )
+        : total_(total)
+        , start_(std::chrono::steady_clock::now())
+        {};
+
+        ~PhaseTimer() {
+            total_ += std::chrono::duration<double>(std::chrono::steady_clock::now() - start_).count();
+        };
+
+    private:
+        double& total_;
+        std::chrono::time_point<std::chrono::steady_clock> start_;
+};
+
+//! Executes the statement, adding its wall-clock time to total if timers are
+//! enabled.
+#ifdef MAPTREE_ENABLE_TIMERS
+#define TIME_PHASE(total, statement) do { PhaseTimer phaseTimer(total); statement; } while (0)
+#else
+#define TIME_PHASE(total, statement) do { statement; } while (0)
+#endif
+
+#endif
@@ -4,8 +4,8 @@
  * 
  * This file contains the definition of the Solution struct, which is used to
  * return the results of a search. The Solution struct contains the unnormalized
- * log posterior upper and lower bounds and a string representation of the
- * output tree.
+ * log posterior upper and lower bounds, a string representation of the output
+ * tree, statistics about the search and the trajectory of its bounds.
 */
 
 #ifndef SOLUTION_H
@@ -13,6 +13,9 @@
 
 #include <string>
 
+#include "solution/search_stats.h"
+#include "solution/search_progress.h"
+
 /**
  * @struct Solution
  * @brief Contains the results of a search.
@@ -21,6 +24,8 @@ struct Solution {
     double lowerBound;
     double upperBound;
     std::string treeRepresentation;
+    SearchStats stats;
+    SearchTrajectory trajectory;
 };
 
 #endif
\ No newline at end of file
@@ -23,13 +23,21 @@
  */
 class Subproblem {
     public:
+        /**
+         * @param dm The data to build subproblems of.
+         * @param rowMask If not nullptr, the rows the root subproblem is
+         * restricted to.
+         */
         Subproblem(
-            const DataManager& dm
+            const DataManager& dm,
+            const FixedBitset *rowMask = nullptr
         )
         : dm_(dm)
         , path_()
-        , bitset_(dm.getNumSamples(), dm.getNumFeatures())
-        {};
+        , bitset_(dm.getNumRows(), dm.getNumFeatures())
+        {
+            if (rowMask != nullptr) bitset_.restrictBase(*rowMask);
+        };
 
         /**
          * @brief Returns the list of splits that this subproblem has taken.
@@ -45,16 +53,25 @@ class Subproblem {
 
         /**
          * @brief Returns the features on which this subproblem can be split.
-         * @returns A list of the features on which this subproblem can be
-         * split.
+         * @returns A list of the search features on which this subproblem can
+         * be split.
+         * @see DataManager::getSearchFeatures
          */
         const std::vector<size_t>& getValidSplits();
 
+        /**
+         * @brief Returns the number of features on which this subproblem can
+         * be split, counting every feature represented by the valid splits.
+         * @returns The number of valid splits of the subproblem.
+         */
+        size_t getNumValidSplits();
+
         /**
          * @brief Returns the label counts of the subproblem.
-         * @returns The label counts for the subproblem.
+         * @returns The label counts for the subproblem, summed over the
+         * samples of each of its rows.
          */
-        const std::array<int, 2>& getLabelCounts();
+        const LabelCounts& getLabelCounts();
 
         /**
          * @brief Returns the depth of the subproblem.
@@ -90,8 +107,9 @@ class Subproblem {
         const DataManager& dm_;
         std::vector<Split> path_;
         Bitset bitset_;
-        std::array<int, 2> labelCounts_;
+        LabelCounts labelCounts_;
         std::vector<size_t> validSplits;
+        size_t numValidSplits_ = 0;
 
         bool hasLabelCounts_ = false;
         bool hasValidSplits_ = false;
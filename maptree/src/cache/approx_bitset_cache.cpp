@@ -4,40 +4,60 @@
 constexpr std::array<BLOCK, APPROX_BITSET_CACHE_NUM_ULL_HASH_VALUES> ApproxBitsetCache::BLOCK_MULT_BASE;
 constexpr BLOCK ApproxBitsetCache::DEPTH_MULT;
 
+size_t BitsetHashHash::operator()(const BitsetHash &hashedBitset) const {
+    size_t hash = 0;
+    for (size_t i = 0; i < APPROX_BITSET_CACHE_NUM_ULL_HASH_VALUES; i++) {
+        hash ^= hashedBitset[i];
+    }
+    return hash;
+}
+
 bool operator==(const ApproxBitsetCacheKey &lhs, const ApproxBitsetCacheKey &rhs) {
     return lhs.hashedBitset == rhs.hashedBitset && lhs.depth == rhs.depth;
 }
 
 size_t ApproxBitsetCacheKeyHash::operator()(const ApproxBitsetCacheKey &key) const {
-    size_t hash = key.depth * ApproxBitsetCache::DEPTH_MULT;
-    for (size_t i = 0; i < APPROX_BITSET_CACHE_NUM_ULL_HASH_VALUES; i++) {
-        hash ^= key.hashedBitset[i];
-    }
-    return hash;
+    return key.depth * ApproxBitsetCache::DEPTH_MULT ^ BitsetHashHash()(key.hashedBitset);
 }
 
 void ApproxBitsetCache::put(Subproblem& subproblem, void *value) {
-    ApproxBitsetCacheKey key = constructKey(subproblem);
-    cache_.insert({key, value});
+    put(constructKey(subproblem), value);
 }
 
 void *ApproxBitsetCache::get(Subproblem& subproblem) {
-    ApproxBitsetCacheKey key = constructKey(subproblem);
+    return get(constructKey(subproblem));
+}
+
+void ApproxBitsetCache::put(const ApproxBitsetCacheKey& key, void *value) {
+    cache_.insert({key, value});
+}
+
+void *ApproxBitsetCache::get(const ApproxBitsetCacheKey& key) const {
     auto entry = cache_.find(key);
     if (entry == cache_.end()) return nullptr;
     return entry->second;
 }
 
+void ApproxBitsetCache::clear() {
+    cache_.clear();
+}
+
 size_t ApproxBitsetCache::size() const {
     return cache_.size();
 }
 
+BitsetHash ApproxBitsetCache::hashBitset(const Bitset& bitset) const {
+    BitsetHash hashedBitset;
+    for (size_t i = 0; i < APPROX_BITSET_CACHE_NUM_ULL_HASH_VALUES; i++) {
+        hashedBitset[i] = bitset.sumOfBlocks(blockMults_[i]);
+    }
+    return hashedBitset;
+}
+
 ApproxBitsetCacheKey ApproxBitsetCache::constructKey(Subproblem& subproblem) const {
     ApproxBitsetCacheKey key;
     key.depth = subproblem.getDepth();
-    for (size_t i = 0; i < APPROX_BITSET_CACHE_NUM_ULL_HASH_VALUES; i++) {
-        key.hashedBitset[i] = subproblem.getBitset().sumOfBlocks(blockMults_[i]);
-    }
+    key.hashedBitset = hashBitset(subproblem.getBitset());
     return key;
 }
 
@@ -0,0 +1,93 @@
+#include <algorithm>
+
+#include "cache/canonical_bitset_store.h"
+
+BitsetHash CanonicalBitsetStore::identify(const Bitset& bitset) {
+    bitset.canonicalForm(canonicalIndices_, canonicalValues_);
+    return identifyCanonicalForm();
+}
+
+BitsetHash CanonicalBitsetStore::identifyIntersection(
+    const std::vector<unsigned int>& indices,
+    const std::vector<BLOCK>& values,
+    const FixedBitset& mask,
+    bool value
+) {
+    canonicalIndices_.clear();
+    canonicalValues_.clear();
+    BLOCK flip = value ? 0ULL : ~0ULL;
+    BLOCK block;
+    for (size_t i = 0; i < indices.size(); i++) {
+        block = values[i] & (mask.getBlock(indices[i]) ^ flip);
+        if (block == 0) continue;
+        canonicalIndices_.push_back(indices[i]);
+        canonicalValues_.push_back(block);
+    }
+    return identifyCanonicalForm();
+}
+
+size_t CanonicalBitsetStore::size() const {
+    return offsets_.size() - 1;
+}
+
+size_t CanonicalBitsetStore::numStoredBlocks() const {
+    return values_.size();
+}
+
+void CanonicalBitsetStore::assign(
+    std::vector<size_t> offsets,
+    std::vector<unsigned int> indices,
+    std::vector<BLOCK> values
+) {
+    offsets_ = std::move(offsets);
+    indices_ = std::move(indices);
+    values_ = std::move(values);
+    ids_.clear();
+    ids_.reserve(size());
+    for (size_t id = 0; id < size(); id++) {
+        size_t offset = offsets_[id];
+        ids_.emplace(hashCanonicalForm(
+            indices_.data() + offset, values_.data() + offset, offsets_[id + 1] - offset), id);
+    }
+}
+
+size_t CanonicalBitsetStore::hashCanonicalForm(const unsigned int *indices, const BLOCK *values, size_t length) {
+    size_t hash = length;
+    for (size_t i = 0; i < length; i++) {
+        hash = (hash ^ values[i] ^ (static_cast<size_t>(indices[i]) << 32)) * 0x9E3779B97F4A7C15ULL;
+        hash ^= hash >> 29;
+    }
+    return hash;
+}
+
+BitsetHash CanonicalBitsetStore::identifyCanonicalForm() {
+    size_t hash = hashCanonicalForm(canonicalIndices_.data(), canonicalValues_.data(), canonicalValues_.size());
+
+    size_t id = size();
+    auto range = ids_.equal_range(hash);
+    for (auto it = range.first; it != range.second; it++) {
+        if (matches(it->second)) {
+            id = it->second;
+            break;
+        }
+    }
+
+    if (id == size()) {
+        ids_.emplace(hash, id);
+        indices_.insert(indices_.end(), canonicalIndices_.begin(), canonicalIndices_.end());
+        values_.insert(values_.end(), canonicalValues_.begin(), canonicalValues_.end());
+        offsets_.push_back(values_.size());
+    }
+
+    BitsetHash identifier = {};
+    identifier[0] = id;
+    return identifier;
+}
+
+bool CanonicalBitsetStore::matches(size_t id) const {
+    size_t offset = offsets_[id];
+    size_t length = offsets_[id + 1] - offset;
+    return length == canonicalValues_.size()
+        && std::equal(canonicalValues_.begin(), canonicalValues_.end(), values_.begin() + offset)
+        && std::equal(canonicalIndices_.begin(), canonicalIndices_.end(), indices_.begin() + offset);
+}
@@ -0,0 +1,18 @@
+#include "cache/subproblem_structure_cache.h"
+
+const SubproblemStructure& SubproblemStructureCache::put(
+    const BitsetHash& hashedBitset,
+    SubproblemStructure&& structure
+) {
+    return cache_.emplace(hashedBitset, std::move(structure)).first->second;
+}
+
+const SubproblemStructure *SubproblemStructureCache::get(const BitsetHash& hashedBitset) const {
+    auto entry = cache_.find(hashedBitset);
+    if (entry == cache_.end()) return nullptr;
+    return &entry->second;
+}
+
+size_t SubproblemStructureCache::size() const {
+    return cache_.size();
+}
@@ -26,23 +26,44 @@ int Bitset::countIntersection(const FixedBitset& other) const {
     return count;
 }
 
-bool Bitset::isSubset(const FixedBitset& other) const {
+void Bitset::countWeightedIntersections(
+    const std::vector<std::vector<FixedBitset>>& weightMasks,
+    std::vector<long long>& counts
+) const {
+    counts.assign(weightMasks.size(), 0);
     size_t idx;
     for (size_t i = 0; i < limit_.get(); i++) {
         idx = indices_[i];
-        if (!blocks_[idx].isSubset(other.getBlock(idx))) return false;
+        for (size_t w = 0; w < weightMasks.size(); w++) {
+            for (size_t bit = 0; bit < weightMasks[w].size(); bit++) {
+                counts[w] += static_cast<long long>(
+                    blocks_[idx].countBitsAtIntersection(weightMasks[w][bit].getBlock(idx))) << bit;
+            }
+        }
+    }
+}
+
+bool Bitset::isSubset(const FixedBitset& other, bool value) const {
+    // the complement's bits past the last sample are never set in this bitset
+    BLOCK flip = value ? 0ULL : ~0ULL;
+    size_t idx;
+    for (size_t i = 0; i < limit_.get(); i++) {
+        idx = indices_[i];
+        if (!blocks_[idx].isSubset(other.getBlock(idx) ^ flip)) return false;
     }
     return true;
 }
 
-void Bitset::intersect(const FixedBitset& other) {
-    assert(level_ + 1 < maxLevel_);
+void Bitset::intersect(const FixedBitset& other, bool value) {
+    assert(level_ < maxLevel_);
+    BLOCK flip = value ? 0ULL : ~0ULL;
     size_t limit = limit_.get();
     size_t idx;
-    if (limit == 0) return;
+    // an empty bitset still records the level, so that reverse() undoes
+    // every intersect()
     for (size_t i = limit; i--;) {
         idx = indices_[i];
-        blocks_[idx].intersect(other.getBlock(idx));
+        blocks_[idx].intersect(other.getBlock(idx) ^ flip);
         if (blocks_[idx].empty()) {
             assert(limit > 0);
             limit--;
@@ -54,6 +75,22 @@ void Bitset::intersect(const FixedBitset& other) {
     level_++;
 }
 
+void Bitset::restrictBase(const FixedBitset& other) {
+    assert(level_ == 0);
+    size_t limit = limit_.get();
+    size_t idx;
+    for (size_t i = limit; i--;) {
+        idx = indices_[i];
+        blocks_[idx].set(blocks_[idx].get() & other.getBlock(idx));
+        if (blocks_[idx].empty()) {
+            limit--;
+            indices_[i] = indices_[limit];
+            indices_[limit] = idx;
+        }
+    }
+    limit_.set(limit);
+}
+
 void Bitset::reverse() {
     size_t idx;
     limit_.reverse();
@@ -82,6 +119,15 @@ BLOCK Bitset::sumOfBlocks(const std::vector<BLOCK>& blockMults) const {
     return sum;
 }
 
+void Bitset::canonicalForm(std::vector<unsigned int>& indices, std::vector<BLOCK>& values) const {
+    indices.assign(indices_.begin(), indices_.begin() + limit_.get());
+    std::sort(indices.begin(), indices.end());
+    values.resize(indices.size());
+    for (size_t i = 0; i < indices.size(); i++) {
+        values[i] = blocks_[indices[i]].get();
+    }
+}
+
 std::ostream& operator<<(std::ostream& os, const Bitset& bitset) {
     os << "[ ";
     for (size_t i = 0; i < bitset.limit_.get(); i++) {
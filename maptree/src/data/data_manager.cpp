@@ -1,7 +1,69 @@
+#include <algorithm>
 #include <cassert>
+#include <stdexcept>
+#include <unordered_map>
 
 #include "data/data_manager.h"
 
+namespace {
+
+struct UnsignedVectorHash {
+    size_t operator()(const std::vector<unsigned>& values) const {
+        size_t hash = values.size();
+        for (unsigned value : values) hash = hash * 1000003 ^ value;
+        return hash;
+    }
+};
+
+}
+
+DataManager::DataManager(
+    const ThresholdBinarizer& binarizer,
+    const std::vector<int>& labels,
+    const std::vector<size_t>& groups,
+    size_t numClasses,
+    const std::vector<int>& weights
+)
+: numFeatures_(binarizer.getNumFeatures())
+, numClasses_(numClasses)
+{
+    buildRows<std::vector<unsigned>, UnsignedVectorHash>(binarizer.getBins(), labels, groups, weights);
+    buildFeatureMasks(binarizer);
+    buildFeatureClasses();
+    buildLabelMasks();
+    buildGroupMasks();
+}
+
+DataManager::DataManager(
+    size_t numFeatures,
+    const std::vector<size_t>& indptr,
+    const std::vector<size_t>& indices,
+    const std::vector<int>& labels,
+    const std::vector<size_t>& groups,
+    size_t numClasses,
+    const std::vector<int>& weights
+)
+: numFeatures_(numFeatures)
+, numClasses_(numClasses)
+{
+    // samples are keyed by their sorted, distinct 1 features
+    assert(!indptr.empty() && indptr.back() == indices.size());
+    std::vector<std::vector<unsigned>> rowFeatures(indptr.size() - 1);
+    for (size_t i = 0; i < rowFeatures.size(); i++) {
+        std::vector<unsigned>& features = rowFeatures[i];
+        features.assign(indices.begin() + indptr[i], indices.begin() + indptr[i + 1]);
+        std::sort(features.begin(), features.end());
+        features.erase(std::unique(features.begin(), features.end()), features.end());
+        assert(features.empty() || features.back() < numFeatures_);
+    }
+
+    buildRows<std::vector<unsigned>, UnsignedVectorHash>(rowFeatures, labels, groups, weights);
+    buildSparseFeatureMasks(rowFeatures);
+    buildFeatureClasses();
+    buildLabelMasks();
+    buildGroupMasks();
+}
+
 size_t DataManager::getNumFeatures() const {
     return numFeatures_;
 }
@@ -10,29 +72,183 @@ size_t DataManager::getNumSamples() const {
     return numSamples_;
 }
 
-const FixedBitset& DataManager::getFeatureMask(size_t feature, bool value) const {
-    return featureMasks_[feature * 2 + value];
+size_t DataManager::getNumClasses() const {
+    return numClasses_;
+}
+
+size_t DataManager::getNumRows() const {
+    return numRows_;
+}
+
+const std::vector<size_t>& DataManager::getSearchFeatures() const {
+    return searchFeatures_;
 }
 
-const FixedBitset& DataManager::getLabelMask(bool value) const {
-    return labelMasks_[value];
+size_t DataManager::getFeatureMultiplicity(size_t feature) const {
+    return featureMultiplicities_[feature];
+}
+
+const FixedBitset& DataManager::getFeatureMask(size_t feature) const {
+    return featureMasks_[feature];
+}
+
+const std::vector<FixedBitset>& DataManager::getLabelWeightMasks(size_t label) const {
+    return labelWeightMasks_[label];
+}
+
+const std::vector<std::vector<FixedBitset>>& DataManager::getAllLabelWeightMasks() const {
+    return labelWeightMasks_;
+}
+
+size_t DataManager::getNumGroups() const {
+    return numGroups_;
+}
+
+const FixedBitset& DataManager::getGroupMask(size_t group, bool value) const {
+    return groupMasks_[group * 2 + value];
+}
+
+template <typename Row, typename RowHash>
+void DataManager::buildRows(
+    const std::vector<Row>& rows,
+    const std::vector<int>& labels,
+    const std::vector<size_t>& groups,
+    const std::vector<int>& weights
+) {
+    size_t numInputSamples = rows.size();
+    assert(labels.size() == numInputSamples);
+    assert(weights.empty() || weights.size() == numInputSamples);
+    if (numClasses_ == 0) {
+        int maxLabel = labels.empty() ? 0 : *std::max_element(labels.begin(), labels.end());
+        numClasses_ = std::max(static_cast<size_t>(maxLabel) + 1, static_cast<size_t>(2));
+    }
+    assert(groups.empty() || groups.size() == numInputSamples);
+    if (!groups.empty()) numGroups_ = *std::max_element(groups.begin(), groups.end()) + 1;
+
+    // samples are only collapsed with samples of the same group
+    std::vector<std::unordered_map<Row, size_t, RowHash>> rowIndices(numGroups_);
+    for (auto& groupRowIndices : rowIndices) groupRowIndices.reserve(numInputSamples / numGroups_ + 1);
+    for (size_t i = 0; i < numInputSamples; i++) {
+        int weight = weights.empty() ? 1 : weights[i];
+        assert(weight >= 0);
+        // a sample of weight 0 must not make a split valid
+        if (weight == 0) continue;
+        numSamples_ += weight;
+
+        size_t group = groups.empty() ? 0 : groups[i];
+        auto entry = rowIndices[group].emplace(rows[i], rowSamples_.size());
+        if (entry.second) {
+            rowSamples_.push_back(i);
+            rowLabelCounts_.resize(rowLabelCounts_.size() + numClasses_, 0);
+            rowGroups_.push_back(group);
+        }
+        assert(labels[i] >= 0 && static_cast<size_t>(labels[i]) < numClasses_);
+        rowLabelCounts_[entry.first->second * numClasses_ + labels[i]] += weight;
+    }
+    numRows_ = rowSamples_.size();
+    if (numRows_ == 0) {
+        throw std::invalid_argument("DataManager requires a sample of positive weight");
+    }
 }
 
 void DataManager::buildFeatureMasks(const std::vector<std::vector<bool>>& features) {
-    std::vector<bool> featureValues(numSamples_);
+    featureMasks_.assign(numFeatures_, FixedBitset(numRows_));
+    std::vector<bool> featureValues(numRows_);
     for (size_t f = 0; f < numFeatures_; f++) {
-        for (size_t i = 0; i < numSamples_; i++) {
-            featureValues[i] = features[i][f];
+        for (size_t r = 0; r < numRows_; r++) {
+            featureValues[r] = features[rowSamples_[r]][f];
         }
-        featureMasks_[f * 2 + 1].setBits(featureValues);
-        featureValues.flip();
-        featureMasks_[f * 2].setBits(featureValues);
+        featureMasks_[f].setBits(featureValues);
     }
 }
 
-void DataManager::buildLabelMasks(const std::vector<bool>& labels) {
-    std::vector<bool> labelValues(labels);
-    labelMasks_[1].setBits(labelValues);
-    labelValues.flip();
-    labelMasks_[0].setBits(labelValues);
-}
\ No newline at end of file
+template void DataManager::buildRows<std::vector<bool>>(
+    const std::vector<std::vector<bool>>& rows,
+    const std::vector<int>& labels,
+    const std::vector<size_t>& groups,
+    const std::vector<int>& weights
+);
+
+void DataManager::buildFeatureMasks(const ThresholdBinarizer& binarizer) {
+    featureMasks_.assign(numFeatures_, FixedBitset(numRows_));
+    const std::vector<std::vector<unsigned>>& bins = binarizer.getBins();
+    std::vector<bool> featureValues(numRows_);
+    for (size_t c = 0; c < binarizer.getNumColumns(); c++) {
+        size_t firstFeature = binarizer.getFirstFeature(c);
+        for (size_t f = firstFeature; f < binarizer.getFirstFeature(c + 1); f++) {
+            for (size_t r = 0; r < numRows_; r++) {
+                featureValues[r] = bins[rowSamples_[r]][c] > f - firstFeature;
+            }
+            featureMasks_[f].setBits(featureValues);
+        }
+    }
+}
+
+void DataManager::buildSparseFeatureMasks(const std::vector<std::vector<unsigned>>& rowFeatures) {
+    featureMasks_.assign(numFeatures_, FixedBitset(numRows_));
+    for (size_t r = 0; r < numRows_; r++) {
+        for (unsigned f : rowFeatures[rowSamples_[r]]) {
+            featureMasks_[f].setBit(r);
+        }
+    }
+}
+
+void DataManager::buildFeatureClasses() {
+    featureMultiplicities_.assign(numFeatures_, 0);
+    std::unordered_multimap<size_t, size_t> representatives;
+    for (size_t f = 0; f < numFeatures_; f++) {
+        const FixedBitset& mask = featureMasks_[f];
+        if (mask.empty() || mask.full()) continue;
+
+        // a feature's class is keyed by its mask or its complement, whichever
+        // excludes the first row, so complementary features share a key
+        FixedBitset key = mask;
+        if (key.getBlock(0) & 1ULL) key.flip();
+        size_t representative = f;
+        auto range = representatives.equal_range(key.hash());
+        for (auto it = range.first; it != range.second; it++) {
+            const FixedBitset& other = featureMasks_[it->second];
+            if (other == mask || other.isComplement(mask)) {
+                representative = it->second;
+                break;
+            }
+        }
+
+        if (representative == f) {
+            representatives.emplace(key.hash(), f);
+            searchFeatures_.push_back(f);
+        }
+        featureMultiplicities_[representative]++;
+    }
+}
+
+void DataManager::buildLabelMasks() {
+    std::vector<bool> weightBits(numRows_);
+    labelWeightMasks_.resize(numClasses_);
+    for (size_t label = 0; label < numClasses_; label++) {
+        long long maxCount = 0;
+        for (size_t r = 0; r < numRows_; r++) {
+            maxCount = std::max(maxCount, rowLabelCounts_[r * numClasses_ + label]);
+        }
+        for (size_t bit = 0; (maxCount >> bit) > 0; bit++) {
+            for (size_t r = 0; r < numRows_; r++) {
+                weightBits[r] = (rowLabelCounts_[r * numClasses_ + label] >> bit) & 1;
+            }
+            labelWeightMasks_[label].emplace_back(numRows_);
+            labelWeightMasks_[label].back().setBits(weightBits);
+        }
+    }
+}
+
+void DataManager::buildGroupMasks() {
+    groupMasks_.assign(numGroups_ * 2, FixedBitset(numRows_));
+    std::vector<bool> inGroup(numRows_);
+    for (size_t g = 0; g < numGroups_; g++) {
+        for (size_t r = 0; r < numRows_; r++) {
+            inGroup[r] = rowGroups_[r] == g;
+        }
+        groupMasks_[g * 2 + 1].setBits(inGroup);
+        inGroup.flip();
+        groupMasks_[g * 2].setBits(inGroup);
+    }
+}
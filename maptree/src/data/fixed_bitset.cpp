@@ -15,6 +15,58 @@ void FixedBitset::setBits(const std::vector<bool>& bits) {
     }
 }
 
+void FixedBitset::setBit(size_t idx) {
+    assert(idx < numSamples_);
+    blocks_[idx / BLOCK_BITS] |= 1ULL << (idx % BLOCK_BITS);
+}
+
+void FixedBitset::flip() {
+    for (BLOCK& block : blocks_) block = ~block;
+    // bits past the last sample stay unset
+    if (numSamples_ % BLOCK_BITS != 0) {
+        blocks_.back() &= (1ULL << (numSamples_ % BLOCK_BITS)) - 1;
+    }
+}
+
 BLOCK FixedBitset::getBlock(size_t idx) const {
     return blocks_[idx];
+}
+
+bool FixedBitset::empty() const {
+    for (BLOCK block : blocks_) {
+        if (block != 0) return false;
+    }
+    return true;
+}
+
+bool FixedBitset::full() const {
+    for (size_t i = 0; i < blocks_.size(); i++) {
+        if (blocks_[i] != fullBlock(i)) return false;
+    }
+    return true;
+}
+
+bool FixedBitset::isComplement(const FixedBitset& other) const {
+    assert(other.numSamples_ == numSamples_);
+    for (size_t i = 0; i < blocks_.size(); i++) {
+        if ((blocks_[i] ^ other.blocks_[i]) != fullBlock(i)) return false;
+    }
+    return true;
+}
+
+BLOCK FixedBitset::fullBlock(size_t idx) const {
+    if (idx + 1 < blocks_.size() || numSamples_ % BLOCK_BITS == 0) return ~0ULL;
+    return (1ULL << (numSamples_ % BLOCK_BITS)) - 1;
+}
+
+size_t FixedBitset::hash() const {
+    size_t hash = 0;
+    for (BLOCK block : blocks_) {
+        hash = hash * 1000003ULL ^ block;
+    }
+    return hash;
+}
+
+bool operator==(const FixedBitset& lhs, const FixedBitset& rhs) {
+    return lhs.blocks_ == rhs.blocks_;
 }
\ No newline at end of file
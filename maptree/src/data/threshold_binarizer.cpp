@@ -0,0 +1,102 @@
+#include <algorithm>
+#include <cassert>
+#include <cmath>
+#include <limits>
+#include <sstream>
+
+#include "data/threshold_binarizer.h"
+
+size_t ThresholdBinarizer::getNumSamples() const {
+    return bins_.size();
+}
+
+size_t ThresholdBinarizer::getNumColumns() const {
+    return numColumns_;
+}
+
+size_t ThresholdBinarizer::getNumFeatures() const {
+    return thresholds_.size();
+}
+
+const std::vector<FeatureThreshold>& ThresholdBinarizer::getThresholds() const {
+    return thresholds_;
+}
+
+size_t ThresholdBinarizer::getFirstFeature(size_t column) const {
+    return firstFeatures_[column];
+}
+
+const std::vector<std::vector<unsigned>>& ThresholdBinarizer::getBins() const {
+    return bins_;
+}
+
+std::vector<std::string> ThresholdBinarizer::getFeatureNames() const {
+    std::vector<std::string> names;
+    names.reserve(thresholds_.size());
+    for (const FeatureThreshold& threshold : thresholds_) {
+        std::ostringstream name;
+        name.precision(std::numeric_limits<double>::max_digits10);
+        name << "x" << threshold.column << ">" << threshold.threshold;
+        names.push_back(name.str());
+    }
+    return names;
+}
+
+void ThresholdBinarizer::buildThresholds(
+    const std::vector<std::vector<double>>& values,
+    size_t numQuantiles
+) {
+    size_t numSamples = values.size();
+    std::vector<double> sortedValues(numSamples);
+    std::vector<double> uniqueValues;
+    firstFeatures_.reserve(numColumns_ + 1);
+    for (size_t c = 0; c < numColumns_; c++) {
+        firstFeatures_.push_back(thresholds_.size());
+        for (size_t i = 0; i < numSamples; i++) {
+            assert(values[i].size() == numColumns_ && std::isfinite(values[i][c]));
+            sortedValues[i] = values[i][c];
+        }
+        std::sort(sortedValues.begin(), sortedValues.end());
+        uniqueValues.assign(sortedValues.begin(), sortedValues.end());
+        uniqueValues.erase(std::unique(uniqueValues.begin(), uniqueValues.end()), uniqueValues.end());
+
+        // indices of the unique values whose midpoint with their predecessor
+        // is a threshold, in increasing order
+        std::vector<size_t> upperIndices;
+        if (numQuantiles == 0 || uniqueValues.size() <= numQuantiles) {
+            for (size_t k = 1; k < uniqueValues.size(); k++) upperIndices.push_back(k);
+        } else {
+            for (size_t q = 1; q < numQuantiles; q++) {
+                double quantile = sortedValues[q * numSamples / numQuantiles];
+                size_t k = std::lower_bound(uniqueValues.begin(), uniqueValues.end(), quantile)
+                    - uniqueValues.begin();
+                if (k > 0 && (upperIndices.empty() || upperIndices.back() != k)) upperIndices.push_back(k);
+            }
+        }
+
+        for (size_t k : upperIndices) {
+            double lower = uniqueValues[k - 1];
+            double upper = uniqueValues[k];
+            double midpoint = lower + (upper - lower) / 2.0;
+            // the midpoint of adjacent doubles may round up to the upper value,
+            // which would no longer be above the threshold
+            if (!(midpoint < upper)) midpoint = lower;
+            thresholds_.push_back({c, midpoint});
+        }
+    }
+    firstFeatures_.push_back(thresholds_.size());
+}
+
+void ThresholdBinarizer::buildBins(const std::vector<std::vector<double>>& values) {
+    bins_.assign(values.size(), std::vector<unsigned>(numColumns_));
+    for (size_t c = 0; c < numColumns_; c++) {
+        auto first = thresholds_.begin() + firstFeatures_[c];
+        auto last = thresholds_.begin() + firstFeatures_[c + 1];
+        for (size_t i = 0; i < values.size(); i++) {
+            bins_[i][c] = std::lower_bound(first, last, values[i][c],
+                [](const FeatureThreshold& threshold, double value) {
+                    return threshold.threshold < value;
+                }) - first;
+        }
+    }
+}
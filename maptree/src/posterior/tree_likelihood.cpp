@@ -1,18 +1,61 @@
 #include <algorithm>
+#include <cassert>
 #include <cmath>
-#include <array>
+#include <vector>
 
 #include "posterior/tree_likelihood.h"
 
- double TreeLikelihood::logLikelihood(const std::array<int, 2>& labelCounts) const {
-     return logBeta(
-         static_cast<double>(labelCounts[0]) + rho_[0],
-         static_cast<double>(labelCounts[1]) + rho_[1]
-     ) - logBeta(rho_[0], rho_[1]);
+TreeLikelihood::TreeLikelihood(const std::vector<double>& rho)
+: rho_(rho)
+, rhoSum_(0.0)
+, logGammaRho_(rho.size())
+, logMultiBetaRho_(0.0)
+{
+    assert(rho_.size() >= 2);
+    for (size_t label = 0; label < rho_.size(); label++) {
+        rhoSum_ += rho_[label];
+        logGammaRho_[label] = logGamma(rho_[label]);
+        logMultiBetaRho_ += logGammaRho_[label];
+    }
+    logGammaRhoSum_ = logGamma(rhoSum_);
+    logMultiBetaRho_ -= logGammaRhoSum_;
 }
 
-double TreeLikelihood::logLikelihoodPerfectSplit(const std::array<int, 2>& labelCounts) const {
-    return logBeta(static_cast<double>(labelCounts[0]) + rho_[0], rho_[1]) \
-        + logBeta(rho_[0], static_cast<double>(labelCounts[1]) + rho_[1]) \
-        - 2 * logBeta(rho_[0], rho_[1]);
-}
\ No newline at end of file
+double TreeLikelihood::logGamma(double x) {
+#ifdef _WIN32
+    // the Windows C runtime has no signgam
+    return std::lgamma(x);
+#else
+    int sign;
+    return lgamma_r(x, &sign);
+#endif
+}
+
+size_t TreeLikelihood::getNumClasses() const {
+    return rho_.size();
+}
+
+double TreeLikelihood::logLikelihood(const LabelCounts& labelCounts) const {
+    assert(labelCounts.size() == rho_.size());
+    double logMultiBeta = 0.0;
+    double sum = 0.0;
+    for (size_t label = 0; label < rho_.size(); label++) {
+        double param = static_cast<double>(labelCounts[label]) + rho_[label];
+        logMultiBeta += logGamma(param);
+        sum += param;
+    }
+    return logMultiBeta - logGamma(sum) - logMultiBetaRho_;
+}
+
+double TreeLikelihood::logLikelihoodPerfectSplit(const LabelCounts& labelCounts) const {
+    assert(labelCounts.size() == rho_.size());
+    double logLikelihood = 0.0;
+    for (size_t label = 0; label < rho_.size(); label++) {
+        // a leaf without points has likelihood 1
+        if (labelCounts[label] == 0) continue;
+        double count = static_cast<double>(labelCounts[label]);
+        logLikelihood += logGamma(count + rho_[label]) - logGammaRho_[label]
+            - logGamma(count + rhoSum_) + logGammaRhoSum_;
+    }
+    return logLikelihood;
+}
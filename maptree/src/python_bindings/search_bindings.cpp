@@ -8,64 +8,597 @@
 
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <pybind11/functional.h>
+#include <pybind11/numpy.h>
 
+#include <algorithm>
+#include <memory>
 #include <vector>
 #include <array>
 #include <chrono>
+#include <cmath>
+#include <fstream>
+#include <limits>
+#include <stdexcept>
+#include <string>
 
 #include "search/befs_map_search.h"
+#include "search/cancellation_token.h"
+#include "search/hyperparameter_sweep.h"
+#include "search/cross_validation.h"
+#include "solution/fold_result.h"
 #include "solution/solution.h"
 #include "data/data_manager.h"
+#include "data/threshold_binarizer.h"
 #include "posterior/tree_prior.h"
 #include "posterior/tree_likelihood.h"
 
 namespace py = pybind11;
 
+//! Time in seconds between two checks for pending signals during a search.
+constexpr double INTERRUPT_CHECK_INTERVAL = 0.05;
+
+/**
+ * @brief Runs pending Python signal handlers from a search with the GIL
+ * released.
+ * @returns void
+ * @throws py::error_already_set If a handler raised, e.g. KeyboardInterrupt.
+ */
+void checkSignals() {
+    py::gil_scoped_acquire acquire;
+    if (PyErr_CheckSignals() != 0) throw py::error_already_set();
+}
+
+/**
+ * @brief Checks that binary features are consistent with the samples.
+ * @param features The features of each sample.
+ * @param numSamples The number of samples.
+ * @returns void
+ * @throws std::invalid_argument If there are no samples, there is not one
+ * row of features per sample or the rows differ in length.
+ */
+void checkFeatures(const std::vector<std::vector<bool>>& features, size_t numSamples) {
+    if (features.empty() || features.size() != numSamples) {
+        throw std::invalid_argument("features must have one row per sample");
+    }
+    for (const std::vector<bool>& row : features) {
+        if (row.size() != features[0].size()) {
+            throw std::invalid_argument("features must have the same number of columns in each row");
+        }
+    }
+}
+
+/**
+ * @brief Checks that labels and Dirichlet prior parameters are consistent and
+ * converts the labels to class indices.
+ * @param labels The label of each sample. Labels may be given as booleans,
+ * integers or floats holding whole numbers.
+ * @param rho The parameters of the Dirichlet prior, one per class.
+ * @returns The class index of each sample.
+ * @throws std::invalid_argument If there are fewer than two classes, a
+ * parameter is not positive or a label is not a class.
+ */
+std::vector<int> parseLabels(const std::vector<double>& labels, const std::vector<double>& rho) {
+    if (rho.size() < 2) {
+        throw std::invalid_argument("rho must have an entry for each of at least two classes");
+    }
+    for (double param : rho) {
+        if (!(param > 0)) throw std::invalid_argument("rho must be positive");
+    }
+    std::vector<int> classes;
+    classes.reserve(labels.size());
+    for (double label : labels) {
+        if (!(label >= 0 && label < static_cast<double>(rho.size())) || label != std::floor(label)) {
+            throw std::invalid_argument("labels must be whole numbers in [0, len(rho))");
+        }
+        classes.push_back(static_cast<int>(label));
+    }
+    return classes;
+}
+
+/**
+ * @brief Checks that sample weights are consistent with the samples.
+ * @param weights The weight of each sample, or an empty vector.
+ * @param numSamples The number of samples.
+ * @returns void
+ * @throws std::invalid_argument If there is not one weight per sample, a
+ * weight is negative or all weights are 0.
+ */
+void checkWeights(const std::vector<int>& weights, size_t numSamples) {
+    if (weights.empty()) return;
+    if (weights.size() != numSamples) {
+        throw std::invalid_argument("weights must have one entry per sample");
+    }
+    long long totalWeight = 0;
+    for (int weight : weights) {
+        if (weight < 0) throw std::invalid_argument("weights must be non-negative");
+        totalWeight += weight;
+    }
+    if (totalWeight == 0) throw std::invalid_argument("weights must not all be 0");
+}
+
+/**
+ * @brief Checks that cross-validation folds are consistent with the samples.
+ * @param folds The fold of each sample, numbered from 0.
+ * @param weights The weight of each sample, or an empty vector.
+ * @returns void
+ * @throws std::invalid_argument If there is not one fold per sample, there
+ * are fewer than two folds or a fold has no samples of positive weight.
+ */
+void checkFolds(const std::vector<size_t>& folds, const std::vector<int>& weights) {
+    if (folds.empty()) throw std::invalid_argument("folds must have one entry per sample");
+    std::vector<long long> foldWeights(*std::max_element(folds.begin(), folds.end()) + 1, 0);
+    for (size_t i = 0; i < folds.size(); i++) {
+        foldWeights[folds[i]] += weights.empty() ? 1 : weights[i];
+    }
+    if (foldWeights.size() < 2) throw std::invalid_argument("folds must number at least two");
+    for (long long foldWeight : foldWeights) {
+        if (foldWeight == 0) {
+            throw std::invalid_argument("folds must be numbered from 0 without gaps and each have samples");
+        }
+    }
+}
+
 /**
  * @brief MAP Tree search function
  * @param features (num samples) x (num features) 2D boolean vector of features.
- * @param labels (num samples) 1D boolean vector of labels.
+ * @param labels (num samples) 1D vector of labels, the classes numbered from
+ * 0 to len(rho) - 1.
  * @param alpha The alpha parameter of the constructive BCART prior.
  * @param beta The beta parameter of the constructive BCART prior.
- * @param rho A 2-item array indexing BCART's Beta distribution prior for the
- * Bernoulli distributions in each of the leaf nodes.
+ * @param rho The parameters of the Dirichlet prior for the categorical
+ * distributions in each of the leaf nodes, one per class.
  * @param numExpansions The maximum number of expansions to perform.
- * @param timeLimit The time limit in seconds. If -1, no time limit.
+ * @param timeLimit The time limit in (possibly fractional) seconds. If -1, no
+ * time limit.
  * @param degen Whether or not the BCART prior should support degenerate trees.
  * Note that it is still guaranteed that a degenerate tree will not be returned.
+ * @param exactCache Whether or not subproblem cache hits should be verified
+ * against the subproblem's points, ruling out hash collisions.
+ * @param callback If not None, called with the elapsed time in seconds, the
+ * number of expansions, the lower and upper bounds and the best tree so far
+ * whenever the bounds improve, and once at the end of the search.
+ * @param callbackExpansions If positive, the callback is also called every
+ * callbackExpansions expansions.
+ * @param callbackInterval The minimum time in seconds between two callback
+ * calls, except for the final call.
+ * @param cancellationToken If not None, a token through which another thread
+ * can stop the search, which then returns the best tree found so far.
+ * @param checkpointPath If not empty, the file to save checkpoints of the
+ * search to, periodically and at the end of the search.
+ * @param checkpointInterval The time in seconds between two checkpoints.
+ * @param resume Whether or not to resume from the checkpoint file if it exists.
+ * Limits count the expansions and time spent before the checkpoint.
+ * @param weights (num samples) 1D vector of non-negative integer sample
+ * weights, or empty for unit weights. A sample of weight w counts as w copies.
  * @returns A Solution object containing the unnormalized log posterior upper/
  * lower bound and a string representation of the output tree.
  *
  * The search function uses the best-first search algorithm to find the MAP
- * tree.
+ * tree. The GIL is released during the search and only reacquired to call the
+ * callback and, every INTERRUPT_CHECK_INTERVAL seconds, to check for pending
+ * signals, so that Ctrl-C raises KeyboardInterrupt.
  *
  * @see BestFirstSearchMAPSearch
 */
 Solution searchBeFS(
     std::vector<std::vector<bool>> features,
-    std::vector<bool> labels,
+    std::vector<double> labels,
+    double alpha,
+    double beta,
+    std::vector<double> rho,
+    long long numExpansions,
+    double timeLimit,
+    bool degen,
+    bool exactCache,
+    std::function<void(double, size_t, double, double, std::string)> callback,
+    size_t callbackExpansions,
+    double callbackInterval,
+    const CancellationToken *cancellationToken,
+    std::string checkpointPath,
+    double checkpointInterval,
+    bool resume,
+    std::vector<int> weights
+)
+{
+    checkFeatures(features, labels.size());
+    std::vector<int> classes = parseLabels(labels, rho);
+    checkWeights(weights, labels.size());
+    DataManager dm(features, classes, std::vector<size_t>(), rho.size(), weights);
+
+    TreeLikelihood likelihood(rho);
+    std::unique_ptr<TreePrior> prior(degen
+        ? static_cast<TreePrior *>(new BCARTDegenTreePrior(alpha, beta))
+        : static_cast<TreePrior *>(new BCARTTreePrior(alpha, beta)));
+
+    BestFirstSearchMAPSearch searchObj(dm, likelihood, *prior, numExpansions, timeLimit, exactCache);
+
+    if (callback) {
+        searchObj.setProgressCallback(
+            [&callback](const SearchProgress& progress) {
+                py::gil_scoped_acquire acquire;
+                callback(
+                    progress.elapsedTime,
+                    progress.numExpansions,
+                    progress.lowerBound,
+                    progress.upperBound,
+                    progress.treeRepresentation
+                );
+            },
+            callbackExpansions,
+            callbackInterval
+        );
+    }
+
+    if (!checkpointPath.empty()) {
+        if (resume && std::ifstream(checkpointPath).good()) {
+            searchObj.restoreCheckpoint(checkpointPath);
+        }
+        searchObj.setCheckpoint(checkpointPath, checkpointInterval);
+    }
+
+    searchObj.setCancellationToken(cancellationToken);
+    searchObj.setInterruptCheck(checkSignals, INTERRUPT_CHECK_INTERVAL);
+
+    py::gil_scoped_release release;
+    return searchObj.search();
+}
+
+/**
+ * @brief MAP Tree search function on sparse binary features
+ * @param matrix (num samples) x (num features) SciPy sparse matrix of binary
+ * features. CSR matrices are read as is, any other format is converted with
+ * tocsr(). Stored entries equal to 0 are ignored.
+ * @param labels (num samples) 1D vector of labels, the classes numbered from
+ * 0 to len(rho) - 1.
+ * @param alpha The alpha parameter of the constructive BCART prior.
+ * @param beta The beta parameter of the constructive BCART prior.
+ * @param rho The parameters of the Dirichlet prior for the categorical
+ * distributions in each of the leaf nodes, one per class.
+ * @param numExpansions The maximum number of expansions to perform.
+ * @param timeLimit The time limit in (possibly fractional) seconds. If -1, no
+ * time limit.
+ * @param degen Whether or not the BCART prior should support degenerate trees.
+ * @param exactCache Whether or not subproblem cache hits should be verified
+ * against the subproblem's points, ruling out hash collisions.
+ * @param cancellationToken If not None, a token through which another thread
+ * can stop the search.
+ * @param weights (num samples) 1D vector of non-negative integer sample
+ * weights, or empty for unit weights.
+ * @returns A Solution object containing the unnormalized log posterior upper/
+ * lower bound and a string representation of the output tree.
+ *
+ * Only the nonzero entries are copied from the matrix, so the preprocessing
+ * scales with their number rather than with the size of the dense matrix.
+ *
+ * @see DataManager
+*/
+Solution searchSparseBeFS(
+    py::object matrix,
+    std::vector<double> labels,
     double alpha,
     double beta,
-    std::array<double, 2> rho,
-    int numExpansions,
-    int timeLimit,
-    bool degen
+    std::vector<double> rho,
+    long long numExpansions,
+    double timeLimit,
+    bool degen,
+    bool exactCache,
+    const CancellationToken *cancellationToken,
+    std::vector<int> weights
 )
 {
-    DataManager dm(features, labels);
+    if (!py::hasattr(matrix, "format") || matrix.attr("format").cast<std::string>() != "csr") {
+        matrix = matrix.attr("tocsr")();
+    }
+    auto shape = matrix.attr("shape").cast<std::array<size_t, 2>>();
+    auto indptr = py::array_t<size_t, py::array::c_style | py::array::forcecast>(matrix.attr("indptr"));
+    auto indices = py::array_t<size_t, py::array::c_style | py::array::forcecast>(matrix.attr("indices"));
+    auto data = py::array_t<double, py::array::c_style | py::array::forcecast>(matrix.attr("data"));
+    if (shape[0] == 0 || shape[0] != labels.size()) {
+        throw std::invalid_argument("matrix must have one row per sample");
+    }
+    if (static_cast<size_t>(indptr.size()) != shape[0] + 1 || indptr.at(0) != 0 || indices.size() != data.size()
+            || indptr.at(shape[0]) != static_cast<size_t>(indices.size())) {
+        throw std::invalid_argument("matrix has an invalid structure");
+    }
 
-    TreePrior *prior;
-    prior = degen
+    std::vector<size_t> nonzeroIndptr(shape[0] + 1, 0);
+    std::vector<size_t> nonzeroIndices;
+    nonzeroIndices.reserve(indices.size());
+    for (size_t i = 0; i < shape[0]; i++) {
+        if (indptr.at(i) > indptr.at(i + 1)) throw std::invalid_argument("matrix has an invalid structure");
+        for (size_t k = indptr.at(i); k < indptr.at(i + 1); k++) {
+            if (indices.at(k) >= shape[1]) throw std::invalid_argument("matrix has an invalid column index");
+            if (data.at(k) != 0) nonzeroIndices.push_back(indices.at(k));
+        }
+        nonzeroIndptr[i + 1] = nonzeroIndices.size();
+    }
+    std::vector<int> classes = parseLabels(labels, rho);
+    checkWeights(weights, labels.size());
+
+    DataManager dm(shape[1], nonzeroIndptr, nonzeroIndices, classes, std::vector<size_t>(), rho.size(), weights);
+    TreeLikelihood likelihood(rho);
+    std::unique_ptr<TreePrior> prior(degen
         ? static_cast<TreePrior *>(new BCARTDegenTreePrior(alpha, beta))
-        : static_cast<TreePrior *>(new BCARTTreePrior(alpha, beta));
+        : static_cast<TreePrior *>(new BCARTTreePrior(alpha, beta)));
+
+    BestFirstSearchMAPSearch searchObj(dm, likelihood, *prior, numExpansions, timeLimit, exactCache);
+    searchObj.setCancellationToken(cancellationToken);
+    searchObj.setInterruptCheck(checkSignals, INTERRUPT_CHECK_INTERVAL);
+
+    py::gil_scoped_release release;
+    return searchObj.search();
+}
+
+/**
+ * @brief MAP Tree search function on thresholded continuous features
+ * @param values (num samples) x (num columns) 2D vector of finite continuous
+ * or ordinal column values.
+ * @param labels (num samples) 1D vector of labels, the classes numbered from
+ * 0 to len(rho) - 1.
+ * @param alpha The alpha parameter of the constructive BCART prior.
+ * @param beta The beta parameter of the constructive BCART prior.
+ * @param rho The parameters of the Dirichlet prior for the categorical
+ * distributions in each of the leaf nodes, one per class.
+ * @param numQuantiles If 0, every midpoint between consecutive unique values
+ * of a column is a candidate threshold. Otherwise, only the midpoints below the
+ * column's numQuantiles-quantiles are.
+ * @param numExpansions The maximum number of expansions to perform.
+ * @param timeLimit The time limit in (possibly fractional) seconds. If -1, no
+ * time limit.
+ * @param degen Whether or not the BCART prior should support degenerate trees.
+ * @param exactCache Whether or not subproblem cache hits should be verified
+ * against the subproblem's points, ruling out hash collisions.
+ * @param cancellationToken If not None, a token through which another thread
+ * can stop the search.
+ * @param weights (num samples) 1D vector of non-negative integer sample
+ * weights, or empty for unit weights.
+ * @returns A tuple of the Solution object, whose tree splits on binary
+ * threshold features, a list with the (column, threshold) pair of each binary
+ * feature, and a representation of the tree in which each feature is written
+ * as "x<column>><threshold>".
+ *
+ * The threshold features are derived natively and their masks built without
+ * materializing the binary feature matrix.
+ *
+ * @see ThresholdBinarizer
+*/
+py::tuple searchThresholdsBeFS(
+    std::vector<std::vector<double>> values,
+    std::vector<double> labels,
+    double alpha,
+    double beta,
+    std::vector<double> rho,
+    size_t numQuantiles,
+    long long numExpansions,
+    double timeLimit,
+    bool degen,
+    bool exactCache,
+    const CancellationToken *cancellationToken,
+    std::vector<int> weights
+)
+{
+    if (values.empty() || values.size() != labels.size()) {
+        throw std::invalid_argument("values must have one row per sample");
+    }
+    for (const std::vector<double>& row : values) {
+        if (row.size() != values[0].size()) {
+            throw std::invalid_argument("values must have the same number of columns in each row");
+        }
+        for (double value : row) {
+            if (!std::isfinite(value)) throw std::invalid_argument("values must be finite");
+        }
+    }
+    std::vector<int> classes = parseLabels(labels, rho);
+    checkWeights(weights, labels.size());
+
+    ThresholdBinarizer binarizer(values, numQuantiles);
+    DataManager dm(binarizer, classes, std::vector<size_t>(), rho.size(), weights);
+    TreeLikelihood likelihood(rho);
+    std::unique_ptr<TreePrior> prior(degen
+        ? static_cast<TreePrior *>(new BCARTDegenTreePrior(alpha, beta))
+        : static_cast<TreePrior *>(new BCARTTreePrior(alpha, beta)));
+
+    BestFirstSearchMAPSearch searchObj(dm, likelihood, *prior, numExpansions, timeLimit, exactCache);
+    searchObj.setCancellationToken(cancellationToken);
+    searchObj.setInterruptCheck(checkSignals, INTERRUPT_CHECK_INTERVAL);
+
+    Solution result;
+    std::unique_ptr<DecisionTree> tree;
+    {
+        py::gil_scoped_release release;
+        result = searchObj.search();
+        tree.reset(searchObj.getBestTree());
+    }
+
+    py::list thresholds;
+    for (const FeatureThreshold& threshold : binarizer.getThresholds()) {
+        thresholds.append(py::make_tuple(threshold.column, threshold.threshold));
+    }
+    return py::make_tuple(result, thresholds, tree->toString(binarizer.getFeatureNames()));
+}
+
+/**
+ * @brief MAP Tree search function for several priors
+ * @param features (num samples) x (num features) 2D boolean vector of features.
+ * @param labels (num samples) 1D vector of labels, the classes numbered from
+ * 0 to len(rho) - 1.
+ * @param priors (alpha, beta) parameters of the constructive BCART prior of
+ * each search.
+ * @param rho The parameters of the Dirichlet prior for the categorical
+ * distributions in each of the leaf nodes, one per class.
+ * @param numExpansions The maximum number of expansions of each search.
+ * @param timeLimit The time limit of each search in (possibly fractional)
+ * seconds. If -1, no time limit.
+ * @param degen Whether or not the BCART priors should support degenerate trees.
+ * @param exactCache Whether or not subproblem cache hits should be verified
+ * against the subproblem's points, ruling out hash collisions.
+ * @param cancellationToken If not None, a token through which another thread
+ * can stop the sweep.
+ * @param weights (num samples) 1D vector of non-negative integer sample
+ * weights, or empty for unit weights.
+ * @returns A list with a Solution object for each prior.
+ *
+ * The data is preprocessed once and the searches share the structure of the
+ * subproblems they expand, so a sweep costs much less than a search per prior.
+ *
+ * @see sweepBeFS
+*/
+std::vector<Solution> searchSweepBeFS(
+    std::vector<std::vector<bool>> features,
+    std::vector<double> labels,
+    std::vector<std::array<double, 2>> priors,
+    std::vector<double> rho,
+    long long numExpansions,
+    double timeLimit,
+    bool degen,
+    bool exactCache,
+    const CancellationToken *cancellationToken,
+    std::vector<int> weights
+)
+{
+    checkFeatures(features, labels.size());
+    std::vector<int> classes = parseLabels(labels, rho);
+    checkWeights(weights, labels.size());
+    DataManager dm(features, classes, std::vector<size_t>(), rho.size(), weights);
+    TreeLikelihood likelihood(rho);
+
+    std::vector<std::unique_ptr<TreePrior>> ownedPriors;
+    std::vector<const TreePrior *> treePriors;
+    for (const std::array<double, 2>& params : priors) {
+        ownedPriors.emplace_back(degen
+            ? static_cast<TreePrior *>(new BCARTDegenTreePrior(params[0], params[1]))
+            : static_cast<TreePrior *>(new BCARTTreePrior(params[0], params[1])));
+        treePriors.push_back(ownedPriors.back().get());
+    }
 
+    py::gil_scoped_release release;
+    return sweepBeFS(dm, likelihood, treePriors, numExpansions, timeLimit, exactCache, cancellationToken,
+        checkSignals, INTERRUPT_CHECK_INTERVAL);
+}
+
+/**
+ * @brief MAP Tree search function for each cross-validation fold
+ * @param features (num samples) x (num features) 2D boolean vector of features.
+ * @param labels (num samples) 1D vector of labels, the classes numbered from
+ * 0 to len(rho) - 1.
+ * @param folds (num samples) 1D vector of the fold of each sample, numbered
+ * from 0. The k-th search holds out the samples of fold k.
+ * @param alpha The alpha parameter of the constructive BCART prior.
+ * @param beta The beta parameter of the constructive BCART prior.
+ * @param rho The parameters of the Dirichlet prior for the categorical
+ * distributions in each of the leaf nodes, one per class.
+ * @param numExpansions The maximum number of expansions of each search.
+ * @param timeLimit The time limit of each search in (possibly fractional)
+ * seconds. If -1, no time limit.
+ * @param degen Whether or not the BCART prior should support degenerate trees.
+ * @param exactCache Whether or not subproblem cache hits should be verified
+ * against the subproblem's points, ruling out hash collisions.
+ * @param numThreads The number of folds to search in parallel. If 0, the
+ * number of hardware threads.
+ * @param cancellationToken If not None, a token through which another thread
+ * can stop the searches.
+ * @param weights (num samples) 1D vector of non-negative integer sample
+ * weights, or empty for unit weights.
+ * @returns A list with a FoldResult object for each fold.
+ *
+ * The data is preprocessed once for all folds, and each search is restricted
+ * to its training samples with a mask instead of a copy of the data.
+ *
+ * @see crossValidateBeFS
+*/
+std::vector<FoldResult> crossValidateSearchBeFS(
+    std::vector<std::vector<bool>> features,
+    std::vector<double> labels,
+    std::vector<size_t> folds,
+    double alpha,
+    double beta,
+    std::vector<double> rho,
+    long long numExpansions,
+    double timeLimit,
+    bool degen,
+    bool exactCache,
+    size_t numThreads,
+    const CancellationToken *cancellationToken,
+    std::vector<int> weights
+)
+{
+    if (folds.size() != labels.size()) {
+        throw std::invalid_argument("folds must have one entry per sample");
+    }
+    checkFeatures(features, labels.size());
+    std::vector<int> classes = parseLabels(labels, rho);
+    checkWeights(weights, labels.size());
+    checkFolds(folds, weights);
+    DataManager dm(features, classes, folds, rho.size(), weights);
     TreeLikelihood likelihood(rho);
-    BestFirstSearchMAPSearch searchObj(dm, likelihood, *prior, numExpansions, timeLimit);
+    std::unique_ptr<TreePrior> prior(degen
+        ? static_cast<TreePrior *>(new BCARTDegenTreePrior(alpha, beta))
+        : static_cast<TreePrior *>(new BCARTTreePrior(alpha, beta)));
+
+    py::gil_scoped_release release;
+    return crossValidateBeFS(dm, likelihood, *prior, numExpansions, timeLimit, exactCache, numThreads,
+        cancellationToken, checkSignals, INTERRUPT_CHECK_INTERVAL);
+}
+
+/**
+ * @brief Converts the statistics of a search to a Python dictionary.
+ * @param solution The Solution object containing the statistics.
+ * @returns A dictionary of the search statistics. Phase times are in seconds
+ * and are only collected if the module is compiled with MAPTREE_ENABLE_TIMERS.
+ *
+ * @see SearchStats
+ */
+py::dict statsToDict(const Solution& solution) {
+    const SearchStats& stats = solution.stats;
+    py::dict dict;
+    dict["num_expansions"] = stats.numExpansions;
+    dict["num_or_nodes"] = stats.numOrNodes;
+    dict["num_and_nodes"] = stats.numAndNodes;
+    dict["num_cache_hits"] = stats.numCacheHits;
+    dict["num_cache_misses"] = stats.numCacheMisses;
+    dict["num_structure_cache_hits"] = stats.numStructureCacheHits;
+    dict["num_structure_cache_misses"] = stats.numStructureCacheMisses;
+    dict["peak_graph_memory"] = stats.peakGraphMemory;
+    dict["timers_enabled"] = SearchStats::TIMERS_ENABLED;
+    dict["find_expandable_leaf_time"] = stats.findExpandableLeafTime;
+    dict["expand_time"] = stats.expandTime;
+    dict["backpropagate_lower_bound_time"] = stats.backpropagateLowerBoundTime;
+    dict["backpropagate_upper_bound_time"] = stats.backpropagateUpperBoundTime;
+    return dict;
+}
 
-    Solution result = searchObj.search();
-    delete prior;
+/**
+ * @brief Converts the trajectory of a search to a dictionary of NumPy arrays.
+ * @param solution The Solution object containing the trajectory.
+ * @returns A dictionary with the arrays "time", "expansions", "lb" and "ub",
+ * holding one entry per improvement of the bounds.
+ *
+ * @see SearchTrajectory
+ */
+py::dict trajectoryToDict(const Solution& solution) {
+    const SearchTrajectory& trajectory = solution.trajectory;
+    py::dict dict;
+    dict["time"] = py::array_t<double>(
+        trajectory.elapsedTimes.size(), trajectory.elapsedTimes.data());
+    dict["expansions"] = py::array_t<size_t>(
+        trajectory.numExpansions.size(), trajectory.numExpansions.data());
+    dict["lb"] = py::array_t<double>(
+        trajectory.lowerBounds.size(), trajectory.lowerBounds.data());
+    dict["ub"] = py::array_t<double>(
+        trajectory.upperBounds.size(), trajectory.upperBounds.data());
+    return dict;
+}
 
-    return result;
+/**
+ * @brief Averages a total over samples.
+ * @param total The total over all samples.
+ * @param numSamples The number of samples.
+ * @returns The total per sample, or NaN if there are no samples.
+ */
+double perSample(double total, size_t numSamples) {
+    if (numSamples == 0) return std::numeric_limits<double>::quiet_NaN();
+    return total / numSamples;
 }
 
 //! Here, we define the maptree Python module, binding the search function.
@@ -83,11 +616,115 @@ PYBIND11_MODULE(maptree, m) {
         py::arg("rho"),
         py::arg("numExpansions")=BestFirstSearchMAPSearch::INF_EXPANSIONS,
         py::arg("timeLimit")=BestFirstSearchMAPSearch::INF_TIME_LIMIT,
-        py::arg("degen")=false
+        py::arg("degen")=false,
+        py::arg("exactCache")=false,
+        py::arg("callback")=nullptr,
+        py::arg("callbackExpansions")=0,
+        py::arg("callbackInterval")=0.1,
+        py::arg("cancellationToken")=nullptr,
+        py::arg("checkpointPath")="",
+        py::arg("checkpointInterval")=60.0,
+        py::arg("resume")=false,
+        py::arg("weights")=std::vector<int>()
+    );
+
+    m.def(
+        "search_sparse",
+        &searchSparseBeFS,
+        "Best first search on a SciPy sparse matrix of binary features",
+        py::arg("matrix"),
+        py::arg("labels"),
+        py::arg("alpha"),
+        py::arg("beta"),
+        py::arg("rho"),
+        py::arg("numExpansions")=BestFirstSearchMAPSearch::INF_EXPANSIONS,
+        py::arg("timeLimit")=BestFirstSearchMAPSearch::INF_TIME_LIMIT,
+        py::arg("degen")=false,
+        py::arg("exactCache")=false,
+        py::arg("cancellationToken")=nullptr,
+        py::arg("weights")=std::vector<int>()
+    );
+
+    m.def(
+        "search_thresholds",
+        &searchThresholdsBeFS,
+        "Best first search on threshold features of continuous columns",
+        py::arg("values"),
+        py::arg("labels"),
+        py::arg("alpha"),
+        py::arg("beta"),
+        py::arg("rho"),
+        py::arg("numQuantiles")=0,
+        py::arg("numExpansions")=BestFirstSearchMAPSearch::INF_EXPANSIONS,
+        py::arg("timeLimit")=BestFirstSearchMAPSearch::INF_TIME_LIMIT,
+        py::arg("degen")=false,
+        py::arg("exactCache")=false,
+        py::arg("cancellationToken")=nullptr,
+        py::arg("weights")=std::vector<int>()
+    );
+
+    m.def(
+        "search_sweep",
+        &searchSweepBeFS,
+        "Best first search for several priors sharing subproblem structure",
+        py::arg("features"),
+        py::arg("labels"),
+        py::arg("priors"),
+        py::arg("rho"),
+        py::arg("numExpansions")=BestFirstSearchMAPSearch::INF_EXPANSIONS,
+        py::arg("timeLimit")=BestFirstSearchMAPSearch::INF_TIME_LIMIT,
+        py::arg("degen")=false,
+        py::arg("exactCache")=false,
+        py::arg("cancellationToken")=nullptr,
+        py::arg("weights")=std::vector<int>()
+    );
+
+    m.def(
+        "cross_validate",
+        &crossValidateSearchBeFS,
+        "Best first search on each cross-validation fold",
+        py::arg("features"),
+        py::arg("labels"),
+        py::arg("folds"),
+        py::arg("alpha"),
+        py::arg("beta"),
+        py::arg("rho"),
+        py::arg("numExpansions")=BestFirstSearchMAPSearch::INF_EXPANSIONS,
+        py::arg("timeLimit")=BestFirstSearchMAPSearch::INF_TIME_LIMIT,
+        py::arg("degen")=false,
+        py::arg("exactCache")=false,
+        py::arg("numThreads")=0,
+        py::arg("cancellationToken")=nullptr,
+        py::arg("weights")=std::vector<int>()
     );
 
+    py::class_<CancellationToken>(m, "CancellationToken") \
+            .def(py::init<>()) \
+            .def("cancel", &CancellationToken::cancel) \
+            .def("reset", &CancellationToken::reset) \
+            .def_property_readonly("cancelled", &CancellationToken::isCancelled);
+
     py::class_<Solution>(m, "Solution") \
             .def_readwrite("lb", &Solution::lowerBound) \
             .def_readwrite("ub", &Solution::upperBound) \
-            .def_readwrite("tree", &Solution::treeRepresentation);
+            .def_readwrite("tree", &Solution::treeRepresentation) \
+            .def_property_readonly("stats", &statsToDict) \
+            .def_property_readonly("trajectory", &trajectoryToDict);
+
+    py::class_<FoldResult>(m, "FoldResult") \
+            .def_readonly("solution", &FoldResult::solution) \
+            .def_readonly("num_train_samples", &FoldResult::numTrainSamples) \
+            .def_readonly("num_test_samples", &FoldResult::numTestSamples) \
+            .def_property_readonly("train_acc", [](const FoldResult& result) {
+                return perSample(static_cast<double>(result.numTrainCorrect), result.numTrainSamples);
+            }) \
+            .def_property_readonly("test_acc", [](const FoldResult& result) {
+                return perSample(static_cast<double>(result.numTestCorrect), result.numTestSamples);
+            }) \
+            .def_property_readonly("train_sll", [](const FoldResult& result) {
+                return perSample(result.trainLogLikelihood, result.numTrainSamples);
+            }) \
+            .def_property_readonly("test_sll", [](const FoldResult& result) {
+                return perSample(result.testLogLikelihood, result.numTestSamples);
+            });
 }
\ No newline at end of file
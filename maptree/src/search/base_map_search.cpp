@@ -3,7 +3,7 @@
 constexpr size_t BaseMAPSearch::UNKNOWN_VALID_SPLITS;
 
 double BaseMAPSearch::getLowerBound(
-    const std::array<int, 2>& labelCounts,
+    const LabelCounts& labelCounts,
     size_t depth,
     size_t numValidSplits
 ) const {
@@ -30,7 +30,7 @@ double BaseMAPSearch::getLowerBound(
 }
 
 double BaseMAPSearch::getUpperBound(
-    const std::array<int, 2>& labelCounts,
+    const LabelCounts& labelCounts,
     size_t depth,
     size_t numValidSplits
 ) const {
@@ -1,55 +1,162 @@
+#include <algorithm>
 #include <cassert>
 #include <chrono>
-#include <forward_list>
+#include <cmath>
+#include <map>
 #include <queue>
 #include <set>
 
 #include "search/befs_map_search.h"
 
-constexpr int BestFirstSearchMAPSearch::INF_EXPANSIONS;
-constexpr int BestFirstSearchMAPSearch::INF_TIME_LIMIT;
+constexpr long long BestFirstSearchMAPSearch::INF_EXPANSIONS;
+constexpr double BestFirstSearchMAPSearch::INF_TIME_LIMIT;
+constexpr double BestFirstSearchMAPSearch::BOUND_TOLERANCE;
 
 Solution BestFirstSearchMAPSearch::search() {
     bool hasExpansionLimit = expansionLimit_ != BestFirstSearchMAPSearch::INF_EXPANSIONS;
     bool hasTimeLimit = timeLimit_ != BestFirstSearchMAPSearch::INF_TIME_LIMIT;
+    bool hasCheckpoint = !checkpointPath_.empty();
 
-    size_t expansionsRemaining = static_cast<size_t>(expansionLimit_);
-    long long timeLimit = static_cast<long long>(timeLimit_);
-    std::chrono::time_point<std::chrono::steady_clock> startTime = std::chrono::steady_clock::now();
-    long long secondsElapsed;
+    // time spent before a restored checkpoint counts towards the time limit
+    std::chrono::time_point<std::chrono::steady_clock> startTime = std::chrono::steady_clock::now()
+        - std::chrono::duration_cast<std::chrono::steady_clock::duration>(
+            std::chrono::duration<double>(elapsedTime_));
+    double lastReportTime = elapsedTime_;
+    double lastInterruptCheckTime = elapsedTime_;
+    double lastCheckpointTime = elapsedTime_;
 
+    if (trajectory_.lowerBounds.empty()) recordProgress(elapsedTime_);
+
+    OrNode *leaf;
     while (!rootNode_->isSolved()) {
+        if (cancellationToken_ && cancellationToken_->isCancelled()) break;
+        if (hasExpansionLimit && stats_.numExpansions >= static_cast<size_t>(expansionLimit_)) break;
+
         subproblem_.reset();
-        OrNode *leaf = findExpandableLeaf();
-        expand(leaf);
-        backpropagateLowerBound(leaf);
-        backpropagateUpperBound(leaf);
+        TIME_PHASE(stats_.findExpandableLeafTime, leaf = findExpandableLeaf());
+        TIME_PHASE(stats_.expandTime, expand(leaf));
+        TIME_PHASE(stats_.backpropagateLowerBoundTime, backpropagateLowerBound(leaf));
+        TIME_PHASE(stats_.backpropagateUpperBoundTime, backpropagateUpperBound(leaf));
 
-        expansionsRemaining--;
-        secondsElapsed = std::chrono::duration_cast<std::chrono::seconds>(
+        stats_.numExpansions++;
+        elapsedTime_ = std::chrono::duration<double>(
             std::chrono::steady_clock::now() - startTime).count();
-        if (hasExpansionLimit && expansionsRemaining == 0) break;
-        if (hasTimeLimit && secondsElapsed >= timeLimit) break;
+
+        bool improved = rootNode_->lowerBound != trajectory_.lowerBounds.back()
+            || rootNode_->upperBound != trajectory_.upperBounds.back();
+        if (improved) recordProgress(elapsedTime_);
+
+        bool due = progressExpansionInterval_ > 0
+            && stats_.numExpansions % progressExpansionInterval_ == 0;
+        if (progressCallback_ && (improved || due)
+            && elapsedTime_ - lastReportTime >= progressMinTimeInterval_) {
+            reportProgress(elapsedTime_);
+            lastReportTime = elapsedTime_;
+        }
+
+        if (interruptCheck_ && elapsedTime_ - lastInterruptCheckTime >= interruptCheckInterval_) {
+            interruptCheck_();
+            lastInterruptCheckTime = elapsedTime_;
+        }
+
+        if (hasCheckpoint && elapsedTime_ - lastCheckpointTime >= checkpointInterval_) {
+            saveCheckpoint(checkpointPath_);
+            lastCheckpointTime = elapsedTime_;
+        }
+
+        if (hasTimeLimit && elapsedTime_ >= timeLimit_) break;
     }
 
-    DecisionTree *dt = buildDecisionTree(rootNode_);
-    std::string treeRepresentation = dt->toString();
-    delete dt;
+    if (trajectory_.numExpansions.back() != stats_.numExpansions) {
+        recordProgress(elapsedTime_);
+    }
+    if (progressCallback_) reportProgress(elapsedTime_);
+    if (hasCheckpoint) saveCheckpoint(checkpointPath_);
 
     return {
         rootNode_->lowerBound,
         rootNode_->upperBound,
-        treeRepresentation
+        getTreeRepresentation(),
+        stats_,
+        trajectory_
     };
 }
 
-OrNode *BestFirstSearchMAPSearch::buildNode(const std::array<int, 2>& labelCounts, size_t depth) {
-    OrNode *node = new OrNode();
-    orNodes_.push_front(node);
+void BestFirstSearchMAPSearch::setProgressCallback(
+    ProgressCallback callback,
+    size_t expansionInterval,
+    double minTimeInterval
+) {
+    progressCallback_ = std::move(callback);
+    progressExpansionInterval_ = expansionInterval;
+    progressMinTimeInterval_ = minTimeInterval;
+}
+
+void BestFirstSearchMAPSearch::setCancellationToken(const CancellationToken *token) {
+    cancellationToken_ = token;
+}
+
+void BestFirstSearchMAPSearch::setInterruptCheck(std::function<void()> check, double interval) {
+    interruptCheck_ = std::move(check);
+    interruptCheckInterval_ = interval;
+}
+
+void BestFirstSearchMAPSearch::setCheckpoint(const std::string& path, double interval) {
+    checkpointPath_ = path;
+    checkpointInterval_ = interval;
+}
+
+void BestFirstSearchMAPSearch::clearGraph() {
+    orNodes_.clear();
+    andNodes_.clear();
+    childLists_.clear();
+    parentLinks_.clear();
+    rootNode_ = nullptr;
+}
+
+DecisionTree *BestFirstSearchMAPSearch::getBestTree() {
+    return buildDecisionTree(rootNode_);
+}
+
+std::string BestFirstSearchMAPSearch::getTreeRepresentation() {
+    DecisionTree *dt = getBestTree();
+    std::string treeRepresentation = dt->toString();
+    delete dt;
+    return treeRepresentation;
+}
+
+void BestFirstSearchMAPSearch::recordProgress(double elapsedTime) {
+    trajectory_.elapsedTimes.push_back(elapsedTime);
+    trajectory_.numExpansions.push_back(stats_.numExpansions);
+    trajectory_.lowerBounds.push_back(rootNode_->lowerBound);
+    trajectory_.upperBounds.push_back(rootNode_->upperBound);
+}
+
+void BestFirstSearchMAPSearch::reportProgress(double elapsedTime) {
+    progressCallback_({
+        elapsedTime,
+        stats_.numExpansions,
+        rootNode_->lowerBound,
+        rootNode_->upperBound,
+        getTreeRepresentation()
+    });
+}
+
+OrNode *BestFirstSearchMAPSearch::buildNode(
+    const LabelCounts& labelCounts,
+    size_t depth,
+    const BitsetHash& hashedBitset
+) {
+    OrNode *node = orNodes_.allocate();
+    stats_.numOrNodes++;
+    stats_.peakGraphMemory += sizeof(OrNode);
 
     node->depth = depth;
-    node->children = std::vector<AndNode *>(0);
-    node->parents = std::forward_list<AndNode *>(0);
+    node->numValidSplits = 0;
+    node->hashedBitset = hashedBitset;
+    node->children = nullptr;
+    node->numChildren = 0;
+    node->parents = nullptr;
     node->childWithBestLB = node->childWithBestUB = nullptr;
     node->upperBound = getUpperBound(labelCounts, depth);
     node->lowerBound = getLowerBound(labelCounts, depth);
@@ -82,56 +189,124 @@ OrNode *BestFirstSearchMAPSearch::findExpandableLeaf() {
     return node;
 }
 
+OrNode *BestFirstSearchMAPSearch::getNode(
+    const LabelCounts& labelCounts,
+    size_t depth,
+    const BitsetHash& hashedBitset
+) {
+    ApproxBitsetCacheKey key = {hashedBitset, depth};
+    OrNode *node = static_cast<OrNode *>(cache_.get(key));
+    if (node == nullptr) {
+        stats_.numCacheMisses++;
+        node = buildNode(labelCounts, depth, hashedBitset);
+        cache_.put(key, node);
+    } else {
+        stats_.numCacheHits++;
+    }
+    return node;
+}
+
+const SubproblemStructure& BestFirstSearchMAPSearch::getStructure(OrNode *node) {
+    const SubproblemStructure *cachedStructure = store_->structureCache.get(node->hashedBitset);
+    if (cachedStructure != nullptr) {
+        stats_.numStructureCacheHits++;
+        return *cachedStructure;
+    }
+    stats_.numStructureCacheMisses++;
+
+    SubproblemStructure structure;
+    structure.labelCounts = subproblem_.getLabelCounts();
+    structure.validSplits = subproblem_.getValidSplits();
+    structure.numValidSplits = subproblem_.getNumValidSplits();
+    structure.splitLabelCounts.reserve(structure.validSplits.size() * dm_.getNumClasses());
+    structure.splitHashes.reserve(structure.validSplits.size());
+    std::array<BitsetHash, 2> childHashes;
+    if (exactCache_) subproblem_.getBitset().canonicalForm(canonicalIndices_, canonicalValues_);
+    for (size_t feature : structure.validSplits) {
+        subproblem_.applySplit(feature, true);
+        const LabelCounts& rightLabelCounts = subproblem_.getLabelCounts();
+        structure.splitLabelCounts.insert(structure.splitLabelCounts.end(),
+            rightLabelCounts.begin(), rightLabelCounts.end());
+        if (!exactCache_) childHashes[true] = cache_.hashBitset(subproblem_.getBitset());
+        subproblem_.revertSplit();
+
+        if (exactCache_) {
+            for (bool value : {true, false}) {
+                childHashes[value] = store_->canonicalStore.identifyIntersection(
+                    canonicalIndices_, canonicalValues_, dm_.getFeatureMask(feature), value);
+            }
+        } else {
+            // hash values are linear in the blocks, so the left child's
+            // follow from the right child's
+            for (size_t p = 0; p < APPROX_BITSET_CACHE_NUM_ULL_HASH_VALUES; p++) {
+                childHashes[false][p] = node->hashedBitset[p] - childHashes[true][p];
+            }
+        }
+        structure.splitHashes.push_back(childHashes);
+    }
+
+    return store_->structureCache.put(node->hashedBitset, std::move(structure));
+}
+
+BitsetHash BestFirstSearchMAPSearch::hashSubproblem() {
+    if (exactCache_) return store_->canonicalStore.identify(subproblem_.getBitset());
+    return cache_.hashBitset(subproblem_.getBitset());
+}
+
 void BestFirstSearchMAPSearch::expand(OrNode *node) {
     assert(!node->expanded);
 
     node->expanded = true;
 
-    const std::vector<size_t>& validSplits = subproblem_.getValidSplits();
-    if (validSplits.empty()) {
-        node->upperBound = node->lowerBound = getUpperBound(subproblem_.getLabelCounts(), node->depth, 0);
+    const SubproblemStructure& structure = getStructure(node);
+    node->numValidSplits = structure.numValidSplits;
+    if (structure.validSplits.empty()) {
+        // the lower bound is raised to the upper bound by updateLowerBound,
+        // so that the change is propagated to the node's parents
+        node->upperBound = getUpperBound(structure.labelCounts, node->depth, 0);
         return;
     } else {
-        node->children.resize(validSplits.size());
+        node->children = childLists_.allocate(structure.validSplits.size());
     }
 
-    double splitPenalty = -prior_.logSplitProb(node->depth, validSplits.size(), dm_.getNumFeatures());
-    std::array<int, 2> outerLabelCounts = subproblem_.getLabelCounts();
+    double splitPenalty = -prior_.logSplitProb(node->depth, node->numValidSplits, dm_.getNumFeatures());
 
     double splitValue;
     AndNode *child;
-    OrNode *subChild;
-    std::array<int, 2> subChildLabelCounts;
-    size_t childIdx = 0;
-    for (size_t feature : validSplits) {
-        child = new AndNode();
-        andNodes_.push_front(child);
+    std::array<OrNode *, 2> subChildren;
+    size_t numClasses = structure.labelCounts.size();
+    LabelCounts leftLabelCounts(numClasses);
+    LabelCounts rightLabelCounts(numClasses);
+    std::map<std::pair<OrNode *, OrNode *>, AndNode *> childrenBySubChildren;
+    for (size_t i = 0; i < structure.validSplits.size(); i++) {
+        for (size_t label = 0; label < numClasses; label++) {
+            rightLabelCounts[label] = structure.splitLabelCounts[i * numClasses + label];
+            leftLabelCounts[label] = structure.labelCounts[label] - rightLabelCounts[label];
+        }
+        subChildren[true] = getNode(rightLabelCounts, node->depth + 1, structure.splitHashes[i][true]);
+        subChildren[false] = getNode(leftLabelCounts, node->depth + 1, structure.splitHashes[i][false]);
+
+        // features inducing the same partition (possibly with the sides
+        // swapped) lead to the same pair of subproblems and share an AND node
+        size_t feature = structure.validSplits[i];
+        auto entry = childrenBySubChildren.emplace(std::minmax(subChildren[0], subChildren[1]), nullptr);
+        if (!entry.second) {
+            entry.first->second->multiplicity += dm_.getFeatureMultiplicity(feature);
+            continue;
+        }
+
+        child = andNodes_.allocate();
+        stats_.numAndNodes++;
+        entry.first->second = child;
         child->feature = feature;
+        child->multiplicity = dm_.getFeatureMultiplicity(feature);
         child->parent = node;
-        for (bool value : {true, false}) {
-            subproblem_.applySplit(feature, value);
-
-            if (value) {
-                subChildLabelCounts = subproblem_.getLabelCounts();
-            } else {
-                subChildLabelCounts[0] = outerLabelCounts[0] - subChildLabelCounts[0];
-                subChildLabelCounts[1] = outerLabelCounts[1] - subChildLabelCounts[1];
-            }
-
-            subChild = static_cast<OrNode *>(cache_.get(subproblem_));
-            if (subChild == nullptr) {
-                subChild = buildNode(subChildLabelCounts, node->depth + 1);
-                cache_.put(subproblem_, subChild);
-            }
-
-            subChild->parents.push_front(child);
-            if (value) {
-                child->rightChild = subChild;
-            } else {
-                child->leftChild = subChild;
-            }
-
-            subproblem_.revertSplit();
+        child->leftChild = subChildren[false];
+        child->rightChild = subChildren[true];
+        for (OrNode *subChild : {child->leftChild, child->rightChild}) {
+            ParentLink *link = parentLinks_.allocate();
+            *link = {child, subChild->parents};
+            subChild->parents = link;
         }
 
         splitValue = child->leftChild->upperBound + child->rightChild->upperBound + splitPenalty;
@@ -140,8 +315,13 @@ void BestFirstSearchMAPSearch::expand(OrNode *node) {
             node->childWithBestUB = child;
         }
 
-        node->children[childIdx++] = child;
+        node->children[node->numChildren++] = child;
     }
+
+    // each AND node is also referenced from the children of its parent and
+    // from the parents lists of its two subchildren
+    stats_.peakGraphMemory += structure.validSplits.size() * sizeof(AndNode *)
+        + node->numChildren * (sizeof(AndNode) + 2 * sizeof(ParentLink));
 }
 
 bool BestFirstSearchMAPSearch::updateLowerBound(OrNode *node) {
@@ -149,10 +329,11 @@ bool BestFirstSearchMAPSearch::updateLowerBound(OrNode *node) {
 
     double bestLowerBound = node->upperBound;
     node->childWithBestLB = nullptr;
-    double splitPenalty = -prior_.logSplitProb(node->depth, node->children.size(), dm_.getNumFeatures());
+    double splitPenalty = -prior_.logSplitProb(node->depth, node->numValidSplits, dm_.getNumFeatures());
 
     double splitValueLowerBound;
-    for (AndNode *child : node->children) {
+    for (size_t i = 0; i < node->numChildren; i++) {
+        AndNode *child = node->children[i];
         splitValueLowerBound = child->leftChild->lowerBound + child->rightChild->lowerBound + splitPenalty;
         if (splitValueLowerBound < bestLowerBound) {
             bestLowerBound = splitValueLowerBound;
@@ -160,8 +341,16 @@ bool BestFirstSearchMAPSearch::updateLowerBound(OrNode *node) {
         }
     }
 
-    //! check perfect split heuristic addmissibility
-    assert(bestLowerBound >= node->lowerBound);
+    //! check perfect split heuristic addmissibility, up to rounding errors in
+    //! the sums of the children's bounds
+    assert(bestLowerBound >= node->lowerBound - BOUND_TOLERANCE * std::abs(node->lowerBound));
+
+    // such rounding errors must neither lower the bound nor keep a node whose
+    // bounds meet from counting as solved
+    bestLowerBound = std::max(bestLowerBound, node->lowerBound);
+    if (node->upperBound - bestLowerBound <= BOUND_TOLERANCE * std::abs(node->upperBound)) {
+        bestLowerBound = node->upperBound;
+    }
 
     bool improvedLowerBound = bestLowerBound > node->lowerBound;
     node->lowerBound = bestLowerBound;
@@ -179,7 +368,8 @@ void BestFirstSearchMAPSearch::backpropagateLowerBound(OrNode *source) {
         front = toVisit.front();
         toVisit.pop();
         if (!updateLowerBound(front)) continue;
-        for (AndNode *parent : front->parents) {
+        for (ParentLink *link = front->parents; link != nullptr; link = link->next) {
+            AndNode *parent = link->parent;
             if (visited.find(parent->parent) == visited.end()
                 && !parent->parent->isSolved()
                 && parent->parent->childWithBestLB == parent
@@ -196,18 +386,24 @@ void BestFirstSearchMAPSearch::backpropagateUpperBound(OrNode *source) {
     std::queue<OrNode *> toVisit;
     toVisit.push(source);
     visited.insert(source);
+    std::vector<OrNode *> met;
     OrNode *front;
     double splitPenalty;
     double splitValue;
     while (!toVisit.empty()) {
         front = toVisit.front();
         toVisit.pop();
-        for (AndNode *parent : front->parents) {
-            splitPenalty = -prior_.logSplitProb(parent->parent->depth, parent->parent->children.size(), dm_.getNumFeatures());
+        for (ParentLink *link = front->parents; link != nullptr; link = link->next) {
+            AndNode *parent = link->parent;
+            splitPenalty = -prior_.logSplitProb(parent->parent->depth, parent->parent->numValidSplits, dm_.getNumFeatures());
             splitValue = parent->leftChild->upperBound + parent->rightChild->upperBound + splitPenalty;
             if (splitValue < parent->parent->upperBound) {
                 parent->parent->upperBound = splitValue;
                 parent->parent->childWithBestUB = parent;
+                if (!parent->parent->isSolved() && splitValue - parent->parent->lowerBound
+                        <= BOUND_TOLERANCE * std::abs(splitValue)) {
+                    met.push_back(parent->parent);
+                }
                 if (visited.find(parent->parent) == visited.end()) {
                     toVisit.push(parent->parent);
                     visited.insert(parent->parent);
@@ -215,11 +411,15 @@ void BestFirstSearchMAPSearch::backpropagateUpperBound(OrNode *source) {
             }
         }
     }
+
+    // nodes whose upper bound fell to their lower bound up to rounding are
+    // solved, which their parents' lower bounds must reflect
+    for (OrNode *node : met) backpropagateLowerBound(node);
 }
 
 DecisionTree *BestFirstSearchMAPSearch::buildDecisionTree(OrNode *node) {
     // no possible splits — return leaf
-    if (node->children.empty() || !node->expanded || node->childWithBestUB == nullptr) {
+    if (node->numChildren == 0 || !node->expanded || node->childWithBestUB == nullptr) {
         return new DecisionTree();
     }
 
@@ -0,0 +1,157 @@
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <exception>
+#include <mutex>
+#include <numeric>
+#include <thread>
+
+#include "search/cross_validation.h"
+#include "subproblem.h"
+
+namespace {
+
+long long countSamples(Subproblem& subproblem) {
+    const LabelCounts& labelCounts = subproblem.getLabelCounts();
+    return std::accumulate(labelCounts.begin(), labelCounts.end(), 0LL);
+}
+
+void evaluateTree(
+    const DecisionTree *tree,
+    Subproblem& train,
+    Subproblem& test,
+    const TreeLikelihood& likelihood,
+    FoldResult& result
+) {
+    if (tree->isLeaf()) {
+        const LabelCounts& trainLabelCounts = train.getLabelCounts();
+        const LabelCounts& testLabelCounts = test.getLabelCounts();
+        // ties go to the lowest label
+        size_t prediction = std::max_element(trainLabelCounts.begin(), trainLabelCounts.end())
+            - trainLabelCounts.begin();
+        result.numTrainCorrect += trainLabelCounts[prediction];
+        result.numTestCorrect += testLabelCounts[prediction];
+        result.trainLogLikelihood += likelihood.logLikelihood(trainLabelCounts);
+        result.testLogLikelihood += likelihood.logLikelihood(testLabelCounts);
+        return;
+    }
+
+    // the leaves below a node without training or held-out samples add
+    // nothing to the result
+    if (countSamples(train) == 0 && countSamples(test) == 0) return;
+
+    for (bool value : {false, true}) {
+        train.applySplit(tree->feature, value);
+        test.applySplit(tree->feature, value);
+        evaluateTree(value ? tree->right : tree->left, train, test, likelihood, result);
+        train.revertSplit();
+        test.revertSplit();
+    }
+}
+
+FoldResult searchFold(
+    const DataManager& dm,
+    const TreeLikelihood& likelihood,
+    const TreePrior& prior,
+    size_t fold,
+    long long numExpansions,
+    double timeLimit,
+    bool exactCache,
+    const CancellationToken *cancellationToken
+) {
+    const FixedBitset& trainMask = dm.getGroupMask(fold, false);
+    const FixedBitset& testMask = dm.getGroupMask(fold, true);
+    BestFirstSearchMAPSearch search(dm, likelihood, prior, numExpansions, timeLimit, exactCache,
+        nullptr, &trainMask);
+    search.setCancellationToken(cancellationToken);
+
+    FoldResult result = {};
+    result.solution = search.search();
+
+    Subproblem train(dm, &trainMask);
+    Subproblem test(dm, &testMask);
+    result.numTrainSamples = countSamples(train);
+    result.numTestSamples = countSamples(test);
+
+    DecisionTree *tree = search.getBestTree();
+    evaluateTree(tree, train, test, likelihood, result);
+    delete tree;
+
+    return result;
+}
+
+}
+
+std::vector<FoldResult> crossValidateBeFS(
+    const DataManager& dm,
+    const TreeLikelihood& likelihood,
+    const TreePrior& prior,
+    long long numExpansions,
+    double timeLimit,
+    bool exactCache,
+    size_t numThreads,
+    const CancellationToken *cancellationToken,
+    std::function<void()> interruptCheck,
+    double interruptCheckInterval
+) {
+    size_t numFolds = dm.getNumGroups();
+    if (numThreads == 0) numThreads = std::max(std::thread::hardware_concurrency(), 1U);
+    numThreads = std::min(numThreads, numFolds);
+
+    // the searches poll a token of their own, which is cancelled if the
+    // caller's token is, or if any fold fails or the interrupt check throws
+    CancellationToken foldToken;
+    std::vector<FoldResult> results(numFolds);
+    std::vector<std::exception_ptr> errors(numFolds);
+    std::atomic<size_t> nextFold(0);
+    std::mutex mutex;
+    std::condition_variable finished;
+    size_t numFinishedThreads = 0;
+
+    std::vector<std::thread> threads;
+    threads.reserve(numThreads);
+    for (size_t t = 0; t < numThreads; t++) {
+        threads.emplace_back([&]() {
+            for (size_t fold = nextFold++; fold < numFolds; fold = nextFold++) {
+                try {
+                    results[fold] = searchFold(dm, likelihood, prior, fold, numExpansions, timeLimit,
+                        exactCache, &foldToken);
+                } catch (...) {
+                    errors[fold] = std::current_exception();
+                    foldToken.cancel();
+                }
+            }
+            std::lock_guard<std::mutex> lock(mutex);
+            numFinishedThreads++;
+            finished.notify_all();
+        });
+    }
+
+    std::exception_ptr interruption;
+    std::chrono::duration<double> pollInterval(std::max(interruptCheckInterval, 1e-3));
+    {
+        std::unique_lock<std::mutex> lock(mutex);
+        while (numFinishedThreads < threads.size()) {
+            finished.wait_for(lock, pollInterval);
+            if (cancellationToken && cancellationToken->isCancelled()) foldToken.cancel();
+            if (interruptCheck && !interruption) {
+                lock.unlock();
+                try {
+                    interruptCheck();
+                } catch (...) {
+                    interruption = std::current_exception();
+                    foldToken.cancel();
+                }
+                lock.lock();
+            }
+        }
+    }
+    for (std::thread& thread : threads) thread.join();
+
+    if (interruption) std::rethrow_exception(interruption);
+    for (const std::exception_ptr& error : errors) {
+        if (error) std::rethrow_exception(error);
+    }
+    return results;
+}
@@ -0,0 +1,26 @@
+#include <memory>
+
+#include "search/hyperparameter_sweep.h"
+
+std::vector<Solution> sweepBeFS(
+    const DataManager& dm,
+    const TreeLikelihood& likelihood,
+    const std::vector<const TreePrior *>& priors,
+    long long numExpansions,
+    double timeLimit,
+    bool exactCache,
+    const CancellationToken *cancellationToken,
+    std::function<void()> interruptCheck,
+    double interruptCheckInterval
+) {
+    std::shared_ptr<StructureStore> store = std::make_shared<StructureStore>();
+    std::vector<Solution> solutions;
+    solutions.reserve(priors.size());
+    for (const TreePrior *prior : priors) {
+        BestFirstSearchMAPSearch search(dm, likelihood, *prior, numExpansions, timeLimit, exactCache, store);
+        search.setCancellationToken(cancellationToken);
+        if (interruptCheck) search.setInterruptCheck(interruptCheck, interruptCheckInterval);
+        solutions.push_back(search.search());
+    }
+    return solutions;
+}
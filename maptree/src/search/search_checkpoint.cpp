@@ -0,0 +1,293 @@
+#include <algorithm>
+#include <cstdio>
+#include <cstring>
+#include <fstream>
+#include <stdexcept>
+#include <unordered_map>
+
+#include "search/befs_map_search.h"
+#include "search/search_checkpoint.h"
+
+namespace {
+
+template <typename T>
+void writeSection(std::ofstream& file, const std::vector<T>& section) {
+    file.write(reinterpret_cast<const char *>(section.data()), section.size() * sizeof(T));
+}
+
+template <typename T>
+std::vector<T> readSection(std::ifstream& file, size_t length) {
+    std::vector<T> section(length);
+    file.read(reinterpret_cast<char *>(section.data()), length * sizeof(T));
+    return section;
+}
+
+void combineHash(unsigned long long& hash, unsigned long long value) {
+    hash = hash * 1000003ULL ^ value;
+}
+
+void combineHash(unsigned long long& hash, double value) {
+    unsigned long long bits;
+    std::memcpy(&bits, &value, sizeof(bits));
+    combineHash(hash, bits);
+}
+
+}
+
+unsigned long long BestFirstSearchMAPSearch::checkpointFingerprint() const {
+    unsigned long long hash = dm_.getNumSamples();
+    // the collapsed rows, through the feature masks and the label weights
+    // of each row, and the rows of the root subproblem
+    for (size_t f = 0; f < dm_.getNumFeatures(); f++) {
+        combineHash(hash, static_cast<unsigned long long>(dm_.getFeatureMask(f).hash()));
+    }
+    for (const std::vector<FixedBitset>& labelWeightMasks : dm_.getAllLabelWeightMasks()) {
+        for (const FixedBitset& mask : labelWeightMasks) {
+            combineHash(hash, static_cast<unsigned long long>(mask.hash()));
+        }
+    }
+    for (unsigned long long value : rootNode_->hashedBitset) combineHash(hash, value);
+
+    // the prior and likelihood are only known through their values, so they
+    // are probed at enough points to tell their parameters apart
+    for (size_t depth = 0; depth < 2; depth++) {
+        combineHash(hash, prior_.logSplitProb(depth, 1, 2));
+        combineHash(hash, prior_.logSplitProb(depth, 2, 1));
+        combineHash(hash, prior_.logStopProb(depth, 0, 1));
+        combineHash(hash, prior_.logStopProb(depth, 1, 1));
+    }
+    for (size_t label = 0; label < dm_.getNumClasses(); label++) {
+        for (int count = 1; count <= 2; count++) {
+            LabelCounts labelCounts(dm_.getNumClasses(), 0);
+            labelCounts[label] = count;
+            combineHash(hash, likelihood_.logLikelihood(labelCounts));
+        }
+    }
+    return hash;
+}
+
+void BestFirstSearchMAPSearch::saveCheckpoint(const std::string& path) const {
+    // number the nodes in order of creation, and the AND nodes such that the
+    // children of each OR node are contiguous
+    std::vector<const OrNode *> orNodes;
+    orNodes_.forEach([&orNodes](const OrNode& orNode) { orNodes.push_back(&orNode); });
+    std::unordered_map<const OrNode *, unsigned long long> orNodeIds;
+    std::unordered_map<const AndNode *, long long> andNodeIds;
+    orNodeIds.reserve(orNodes.size());
+    andNodeIds.reserve(stats_.numAndNodes);
+    andNodeIds[nullptr] = CHECKPOINT_NO_NODE;
+    for (const OrNode *orNode : orNodes) {
+        orNodeIds.emplace(orNode, orNodeIds.size());
+        for (size_t i = 0; i < orNode->numChildren; i++) {
+            andNodeIds.emplace(orNode->children[i], andNodeIds.size() - 1);
+        }
+    }
+
+    std::vector<OrNodeRecord> orNodeRecords;
+    std::vector<AndNodeRecord> andNodeRecords;
+    std::vector<unsigned long long> parentLinks;
+    orNodeRecords.reserve(orNodes.size());
+    andNodeRecords.reserve(andNodeIds.size() - 1);
+    for (const OrNode *orNode : orNodes) {
+        OrNodeRecord record;
+        record.depth = orNode->depth;
+        record.numValidSplits = orNode->numValidSplits;
+        record.hashedBitset = orNode->hashedBitset;
+        record.lowerBound = orNode->lowerBound;
+        record.upperBound = orNode->upperBound;
+        record.expanded = orNode->expanded;
+        record.childWithBestLB = andNodeIds.at(orNode->childWithBestLB);
+        record.childWithBestUB = andNodeIds.at(orNode->childWithBestUB);
+        record.firstChild = andNodeRecords.size();
+        record.numChildren = orNode->numChildren;
+        record.firstParentLink = parentLinks.size();
+        for (const ParentLink *link = orNode->parents; link != nullptr; link = link->next) {
+            parentLinks.push_back(andNodeIds.at(link->parent));
+        }
+        record.numParentLinks = parentLinks.size() - record.firstParentLink;
+        orNodeRecords.push_back(record);
+
+        for (size_t i = 0; i < orNode->numChildren; i++) {
+            const AndNode *child = orNode->children[i];
+            andNodeRecords.push_back({
+                child->feature,
+                child->multiplicity,
+                orNodeIds.at(child->leftChild),
+                orNodeIds.at(child->rightChild),
+                orNodeIds.at(child->parent)
+            });
+        }
+    }
+
+    std::vector<unsigned long long> trajectoryExpansions(
+        trajectory_.numExpansions.begin(), trajectory_.numExpansions.end());
+    std::vector<unsigned long long> canonicalOffsets;
+    if (exactCache_) {
+        canonicalOffsets.assign(store_->canonicalStore.getOffsets().begin(), store_->canonicalStore.getOffsets().end());
+    }
+
+    CheckpointHeader header;
+    header.magic = CHECKPOINT_MAGIC;
+    header.version = CHECKPOINT_VERSION;
+    header.numRows = dm_.getNumRows();
+    header.numFeatures = dm_.getNumFeatures();
+    header.numClasses = dm_.getNumClasses();
+    header.exactCache = exactCache_;
+    header.fingerprint = checkpointFingerprint();
+    header.rootNode = orNodeIds.at(rootNode_);
+    header.numOrNodes = orNodeRecords.size();
+    header.numAndNodes = andNodeRecords.size();
+    header.numParentLinks = parentLinks.size();
+    header.numTrajectoryPoints = trajectoryExpansions.size();
+    header.numCanonicalForms = exactCache_ ? store_->canonicalStore.size() : 0;
+    header.numCanonicalBlocks = exactCache_ ? store_->canonicalStore.numStoredBlocks() : 0;
+    header.elapsedTime = elapsedTime_;
+    header.stats = stats_;
+
+    // write to a temporary file first, so that an interrupted write never
+    // replaces the previous checkpoint
+    std::string tmpPath = path + ".tmp";
+    std::ofstream file(tmpPath, std::ios::binary | std::ios::trunc);
+    if (!file.is_open()) {
+        throw std::runtime_error("Could not open checkpoint file " + tmpPath);
+    }
+    file.write(reinterpret_cast<const char *>(&header), sizeof(header));
+    writeSection(file, orNodeRecords);
+    writeSection(file, andNodeRecords);
+    writeSection(file, parentLinks);
+    writeSection(file, trajectory_.elapsedTimes);
+    writeSection(file, trajectoryExpansions);
+    writeSection(file, trajectory_.lowerBounds);
+    writeSection(file, trajectory_.upperBounds);
+    writeSection(file, canonicalOffsets);
+    if (exactCache_) {
+        writeSection(file, store_->canonicalStore.getValues());
+        writeSection(file, store_->canonicalStore.getIndices());
+    }
+    file.close();
+    if (!file || std::rename(tmpPath.c_str(), path.c_str()) != 0) {
+        throw std::runtime_error("Could not write checkpoint file " + path);
+    }
+}
+
+void BestFirstSearchMAPSearch::restoreCheckpoint(const std::string& path) {
+    std::ifstream file(path, std::ios::binary);
+    if (!file.is_open()) {
+        throw std::runtime_error("Could not open checkpoint file " + path);
+    }
+
+    CheckpointHeader header;
+    file.read(reinterpret_cast<char *>(&header), sizeof(header));
+    if (!file || header.magic != CHECKPOINT_MAGIC || header.version != CHECKPOINT_VERSION) {
+        throw std::runtime_error("Invalid checkpoint file " + path);
+    }
+    if (header.numRows != dm_.getNumRows() || header.numFeatures != dm_.getNumFeatures()
+        || header.numClasses != dm_.getNumClasses() || static_cast<bool>(header.exactCache) != exactCache_
+        || header.fingerprint != checkpointFingerprint()) {
+        throw std::runtime_error("Checkpoint file " + path + " was saved by a different search");
+    }
+
+    std::vector<OrNodeRecord> orNodeRecords = readSection<OrNodeRecord>(file, header.numOrNodes);
+    std::vector<AndNodeRecord> andNodeRecords = readSection<AndNodeRecord>(file, header.numAndNodes);
+    std::vector<unsigned long long> parentLinks = readSection<unsigned long long>(file, header.numParentLinks);
+    std::vector<double> elapsedTimes = readSection<double>(file, header.numTrajectoryPoints);
+    std::vector<unsigned long long> trajectoryExpansions = readSection<unsigned long long>(file, header.numTrajectoryPoints);
+    std::vector<double> lowerBounds = readSection<double>(file, header.numTrajectoryPoints);
+    std::vector<double> upperBounds = readSection<double>(file, header.numTrajectoryPoints);
+    std::vector<unsigned long long> canonicalOffsets;
+    std::vector<BLOCK> canonicalValues;
+    std::vector<unsigned int> canonicalIndices;
+    if (exactCache_) {
+        canonicalOffsets = readSection<unsigned long long>(file, header.numCanonicalForms + 1);
+        canonicalValues = readSection<BLOCK>(file, header.numCanonicalBlocks);
+        canonicalIndices = readSection<unsigned int>(file, header.numCanonicalBlocks);
+    }
+    if (!file) {
+        throw std::runtime_error("Truncated checkpoint file " + path);
+    }
+
+    // check all node references before replacing the current graph
+    auto isAndNode = [&header](long long id) {
+        return id == CHECKPOINT_NO_NODE || (id >= 0 && static_cast<unsigned long long>(id) < header.numAndNodes);
+    };
+    bool valid = header.rootNode < header.numOrNodes;
+    for (const OrNodeRecord& record : orNodeRecords) {
+        valid = valid && isAndNode(record.childWithBestLB) && isAndNode(record.childWithBestUB)
+            && record.firstChild + record.numChildren <= header.numAndNodes
+            && record.firstParentLink + record.numParentLinks <= header.numParentLinks;
+    }
+    for (const AndNodeRecord& record : andNodeRecords) {
+        valid = valid && record.leftChild < header.numOrNodes && record.rightChild < header.numOrNodes
+            && record.parent < header.numOrNodes;
+    }
+    for (unsigned long long link : parentLinks) valid = valid && link < header.numAndNodes;
+    if (!valid) {
+        throw std::runtime_error("Corrupt checkpoint file " + path);
+    }
+
+    clearGraph();
+    cache_.clear();
+    // structure keyed by canonical identifiers is invalidated by replacing
+    // the canonical store below
+    if (exactCache_) store_->structureCache = SubproblemStructureCache();
+
+    std::vector<OrNode *> orNodes(orNodeRecords.size());
+    std::vector<AndNode *> andNodes(andNodeRecords.size());
+    for (OrNode *&orNode : orNodes) orNode = orNodes_.allocate();
+    for (AndNode *&andNode : andNodes) andNode = andNodes_.allocate();
+
+    for (size_t i = 0; i < andNodeRecords.size(); i++) {
+        const AndNodeRecord& record = andNodeRecords[i];
+        AndNode *andNode = andNodes[i];
+        andNode->feature = record.feature;
+        andNode->multiplicity = record.multiplicity;
+        andNode->leftChild = orNodes[record.leftChild];
+        andNode->rightChild = orNodes[record.rightChild];
+        andNode->parent = orNodes[record.parent];
+    }
+
+    for (size_t i = 0; i < orNodeRecords.size(); i++) {
+        const OrNodeRecord& record = orNodeRecords[i];
+        OrNode *orNode = orNodes[i];
+        orNode->depth = record.depth;
+        orNode->numValidSplits = record.numValidSplits;
+        orNode->hashedBitset = record.hashedBitset;
+        orNode->lowerBound = record.lowerBound;
+        orNode->upperBound = record.upperBound;
+        orNode->expanded = record.expanded;
+        orNode->childWithBestLB = record.childWithBestLB == CHECKPOINT_NO_NODE
+            ? nullptr : andNodes[record.childWithBestLB];
+        orNode->childWithBestUB = record.childWithBestUB == CHECKPOINT_NO_NODE
+            ? nullptr : andNodes[record.childWithBestUB];
+        orNode->numChildren = record.numChildren;
+        orNode->children = childLists_.allocate(record.numChildren);
+        std::copy(andNodes.begin() + record.firstChild,
+            andNodes.begin() + record.firstChild + record.numChildren, orNode->children);
+        // parent links are stored front to back, so they are pushed back to
+        // front to restore their order
+        orNode->parents = nullptr;
+        for (size_t j = record.numParentLinks; j > 0; j--) {
+            ParentLink *link = parentLinks_.allocate();
+            *link = {andNodes[parentLinks[record.firstParentLink + j - 1]], orNode->parents};
+            orNode->parents = link;
+        }
+
+        // every node but the root was created through the cache
+        if (i != header.rootNode) cache_.put({orNode->hashedBitset, orNode->depth}, orNode);
+    }
+    rootNode_ = orNodes[header.rootNode];
+
+    if (exactCache_) {
+        store_->canonicalStore.assign(
+            std::vector<size_t>(canonicalOffsets.begin(), canonicalOffsets.end()),
+            std::move(canonicalIndices),
+            std::move(canonicalValues));
+    }
+
+    stats_ = header.stats;
+    elapsedTime_ = header.elapsedTime;
+    trajectory_.elapsedTimes = std::move(elapsedTimes);
+    trajectory_.numExpansions.assign(trajectoryExpansions.begin(), trajectoryExpansions.end());
+    trajectory_.lowerBounds = std::move(lowerBounds);
+    trajectory_.upperBounds = std::move(upperBounds);
+}
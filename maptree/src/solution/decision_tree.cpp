@@ -10,6 +10,11 @@ std::string DecisionTree::toString() const {
     return isLeaf() ? "" : ("(" + left->toString() + std::to_string(feature) + right->toString() + ")");
 }
 
+std::string DecisionTree::toString(const std::vector<std::string>& featureNames) const {
+    return isLeaf() ? "" : ("(" + left->toString(featureNames) + featureNames[feature]
+        + right->toString(featureNames) + ")");
+}
+
 
 
 
@@ -11,21 +11,26 @@ const Bitset& Subproblem::getBitset() const {
 const std::vector<size_t>& Subproblem::getValidSplits() {
     if (hasValidSplits_) return validSplits;
     validSplits.clear();
-    for (size_t f = 0; f < dm_.getNumFeatures(); f++) {
-        if (!bitset_.isSubset(dm_.getFeatureMask(f, false))
-         && !bitset_.isSubset(dm_.getFeatureMask(f, true))) {
+    numValidSplits_ = 0;
+    for (size_t f : dm_.getSearchFeatures()) {
+        const FixedBitset& mask = dm_.getFeatureMask(f);
+        if (!bitset_.isSubset(mask, false) && !bitset_.isSubset(mask, true)) {
             validSplits.push_back(f);
+            numValidSplits_ += dm_.getFeatureMultiplicity(f);
         }
     }
     hasValidSplits_ = true;
     return validSplits;
 }
 
-const std::array<int, 2>& Subproblem::getLabelCounts() {
+size_t Subproblem::getNumValidSplits() {
+    getValidSplits();
+    return numValidSplits_;
+}
+
+const LabelCounts& Subproblem::getLabelCounts() {
     if (hasLabelCounts_) return labelCounts_;
-    int count = bitset_.count();
-    labelCounts_[1] = bitset_.countIntersection(dm_.getLabelMask(true));
-    labelCounts_[0] = count - labelCounts_[1];
+    bitset_.countWeightedIntersections(dm_.getAllLabelWeightMasks(), labelCounts_);
     hasLabelCounts_ = true;
     return labelCounts_;
 }
@@ -36,7 +41,7 @@ size_t Subproblem::getDepth() const {
 
 void Subproblem::applySplit(size_t feature, bool value) {
     path_.push_back({feature, value});
-    bitset_.intersect(dm_.getFeatureMask(feature, value));
+    bitset_.intersect(dm_.getFeatureMask(feature), value);
     hasValidSplits_ = false;
     hasLabelCounts_ = false;
 }
@@ -1,4 +1,5 @@
 #include <array>
+#include <vector>
 #include "doctest/doctest.h"
 
 #include "posterior/tree_likelihood.h"
@@ -6,8 +7,8 @@
 
 TEST_CASE("prior/likelihood test")
 {
-    std::array<int, 2> labelCounts = {3, 5};
-    std::array<double, 2> rho = {1.0, 1.0};
+    LabelCounts labelCounts = {3, 5};
+    std::vector<double> rho = {1.0, 1.0};
 
     BCARTTreePrior prior = BCARTTreePrior(.95, .5);
     TreeLikelihood likelihood = TreeLikelihood(rho);
@@ -18,3 +19,20 @@ TEST_CASE("prior/likelihood test")
     CHECK(prior.logSplitProb(5, 1, 1) == doctest::Approx(-0.94717));
     CHECK(prior.logStopProb(5, 1, 1) == doctest::Approx(-0.490755));
 }
+
+TEST_CASE("multi-class likelihood test")
+{
+    // log [Gamma(3) Gamma(1) Gamma(2) / Gamma(6)] - log [Gamma(1)^3 / Gamma(3)]
+    LabelCounts labelCounts = {2, 0, 1};
+    TreeLikelihood likelihood({1.0, 1.0, 1.0});
+
+    CHECK(likelihood.getNumClasses() == 3);
+    CHECK(likelihood.logLikelihood(labelCounts) == doctest::Approx(-3.401197));
+    CHECK(likelihood.logLikelihoodPerfectSplit(labelCounts) == doctest::Approx(-2.890372));
+    CHECK(likelihood.logLikelihoodPerfectSplit(labelCounts) >= likelihood.logLikelihood(labelCounts));
+
+    // with two classes, the likelihood is the Beta-binomial one
+    TreeLikelihood binaryLikelihood({2.5, 2.5});
+    CHECK(binaryLikelihood.logLikelihood({3, 5})
+        == doctest::Approx(TreeLikelihood::logBeta(5.5, 7.5) - TreeLikelihood::logBeta(2.5, 2.5)));
+}
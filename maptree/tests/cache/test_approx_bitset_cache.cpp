@@ -0,0 +1,86 @@
+#include <vector>
+#include "doctest/doctest.h"
+
+#include "cache/approx_bitset_cache.h"
+#include "cache/canonical_bitset_store.h"
+#include "cache/subproblem_structure_cache.h"
+#include "data/binary_data_loader.h"
+#include "data/data_manager.h"
+#include "subproblem.h"
+
+using namespace std;
+
+TEST_CASE("bitset hashes of split sides add up")
+{
+    BinaryDataLoader bdl("data/test_data_medium.txt");
+    DataManager dm(bdl.getFeatures(), bdl.getLabels());
+    ApproxBitsetCache cache(NUM_BLOCKS(dm.getNumRows()));
+    Subproblem subproblem(dm);
+
+    subproblem.applySplit(2, true);
+    BitsetHash parent = cache.hashBitset(subproblem.getBitset());
+    for (size_t feature : subproblem.getValidSplits()) {
+        subproblem.applySplit(feature, false);
+        BitsetHash left = cache.hashBitset(subproblem.getBitset());
+        subproblem.revertSplit();
+        subproblem.applySplit(feature, true);
+        BitsetHash right = cache.hashBitset(subproblem.getBitset());
+        subproblem.revertSplit();
+        for (size_t p = 0; p < APPROX_BITSET_CACHE_NUM_ULL_HASH_VALUES; p++) {
+            CHECK(left[p] + right[p] == parent[p]);
+        }
+    }
+}
+
+TEST_CASE("subproblem structure cache lookup ignores depth")
+{
+    BinaryDataLoader bdl("data/test_data_medium.txt");
+    DataManager dm(bdl.getFeatures(), bdl.getLabels());
+    ApproxBitsetCache cache(NUM_BLOCKS(dm.getNumRows()));
+    SubproblemStructureCache structureCache;
+    Subproblem subproblem(dm);
+
+    // reach the same set of points with one and two splits
+    subproblem.applySplit(2, true);
+    BitsetHash shallow = cache.hashBitset(subproblem.getBitset());
+    SubproblemStructure structure;
+    structure.labelCounts = subproblem.getLabelCounts();
+    structure.validSplits = subproblem.getValidSplits();
+    structure.numValidSplits = subproblem.getNumValidSplits();
+    structureCache.put(shallow, std::move(structure));
+
+    subproblem.applySplit(2, true);
+    CHECK(subproblem.getDepth() == 2);
+    const SubproblemStructure *cached = structureCache.get(cache.hashBitset(subproblem.getBitset()));
+    REQUIRE(cached != nullptr);
+    CHECK(cached->labelCounts == subproblem.getLabelCounts());
+    CHECK(cached->validSplits == subproblem.getValidSplits());
+    CHECK(structureCache.size() == 1);
+}
+
+TEST_CASE("canonical bitset store identifies bitsets exactly")
+{
+    BinaryDataLoader bdl("data/test_data_medium.txt");
+    DataManager dm(bdl.getFeatures(), bdl.getLabels());
+    CanonicalBitsetStore store;
+    Subproblem subproblem(dm);
+
+    subproblem.applySplit(2, true);
+    subproblem.applySplit(11, false);
+    BitsetHash first = store.identify(subproblem.getBitset());
+    subproblem.reset();
+
+    // the same points reached in a different order
+    subproblem.applySplit(11, false);
+    subproblem.applySplit(2, true);
+    CHECK(store.identify(subproblem.getBitset()) == first);
+    subproblem.revertSplit();
+    BitsetHash second = store.identify(subproblem.getBitset());
+    CHECK(second != first);
+
+    vector<unsigned int> indices;
+    vector<BLOCK> values;
+    subproblem.getBitset().canonicalForm(indices, values);
+    CHECK(store.identifyIntersection(indices, values, dm.getFeatureMask(2)) == first);
+    CHECK(store.size() == 2);
+}
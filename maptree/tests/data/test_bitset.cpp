@@ -0,0 +1,73 @@
+#include <vector>
+#include "doctest/doctest.h"
+
+#include "data/bitset.h"
+#include "data/fixed_bitset.h"
+
+using namespace std;
+
+TEST_CASE("bitset covers every sample when the block is full")
+{
+    Bitset bitset(128, 1);
+    CHECK(bitset.count() == 128);
+
+    FixedBitset mask(128);
+    vector<bool> bits(128, false);
+    bits[63] = bits[127] = true;
+    mask.setBits(bits);
+    CHECK(bitset.countIntersection(mask) == 2);
+}
+
+TEST_CASE("bitset weighted count")
+{
+    Bitset bitset(3, 2);
+
+    // weights 5, 2, 3 encoded in binary across three masks, and weights
+    // 0, 1, 0 in a single mask
+    vector<vector<FixedBitset>> weightMasks(2);
+    weightMasks[0].assign(3, FixedBitset(3));
+    weightMasks[0][0].setBits({1, 0, 1});
+    weightMasks[0][1].setBits({0, 1, 1});
+    weightMasks[0][2].setBits({1, 0, 0});
+    weightMasks[1].assign(1, FixedBitset(3));
+    weightMasks[1][0].setBits({0, 1, 0});
+    vector<long long> counts;
+    bitset.countWeightedIntersections(weightMasks, counts);
+    CHECK(counts == vector<long long>({10, 1}));
+
+    FixedBitset mask(3);
+    mask.setBits({0, 1, 1});
+    bitset.intersect(mask);
+    bitset.countWeightedIntersections(weightMasks, counts);
+    CHECK(counts == vector<long long>({5, 1}));
+    bitset.reverse();
+    bitset.countWeightedIntersections(weightMasks, counts);
+    CHECK(counts == vector<long long>({10, 1}));
+}
+
+TEST_CASE("bitset intersects with the complement of a mask")
+{
+    Bitset bitset(70, 2);
+
+    FixedBitset mask(70);
+    vector<bool> bits(70, false);
+    bits[0] = bits[64] = true;
+    mask.setBits(bits);
+    CHECK(!mask.full());
+    CHECK(!bitset.isSubset(mask, false));
+
+    bitset.intersect(mask, false);
+    CHECK(bitset.count() == 68);
+    CHECK(bitset.countIntersection(mask) == 0);
+    CHECK(bitset.isSubset(mask, false));
+    bitset.reverse();
+    CHECK(bitset.count() == 70);
+
+    FixedBitset complement = mask;
+    complement.flip();
+    CHECK(mask.isComplement(complement));
+    CHECK(!mask.isComplement(mask));
+    FixedBitset full(70);
+    full.setBits(vector<bool>(70, true));
+    CHECK(full.full());
+}
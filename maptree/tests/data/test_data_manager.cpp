@@ -0,0 +1,253 @@
+#include <vector>
+#include <array>
+#include <limits>
+#include <stdexcept>
+#include "doctest/doctest.h"
+
+#include "data/data_manager.h"
+#include "data/binary_data_loader.h"
+#include "subproblem.h"
+
+using namespace std;
+
+TEST_CASE("data manager collapses duplicate rows")
+{
+    vector<vector<bool>> features = {
+        {0, 1},
+        {1, 1},
+        {0, 1},
+        {0, 1},
+        {1, 0},
+    };
+    vector<bool> labels = {1, 0, 0, 1, 1};
+
+    DataManager dm(features, labels);
+    CHECK(dm.getNumSamples() == 5);
+    CHECK(dm.getNumRows() == 3);
+    CHECK(dm.getNumFeatures() == 2);
+
+    Subproblem subproblem(dm);
+    CHECK(subproblem.getLabelCounts() == LabelCounts{2, 3});
+
+    subproblem.applySplit(0, false);
+    CHECK(subproblem.getLabelCounts() == LabelCounts{1, 2});
+    subproblem.applySplit(1, true);
+    CHECK(subproblem.getLabelCounts() == LabelCounts{1, 2});
+    subproblem.revertSplit();
+    subproblem.revertSplit();
+
+    subproblem.applySplit(1, false);
+    CHECK(subproblem.getLabelCounts() == LabelCounts{0, 1});
+    CHECK(subproblem.getValidSplits().empty());
+}
+
+TEST_CASE("data manager counts multi-class labels")
+{
+    vector<vector<bool>> features = {
+        {0, 1},
+        {1, 1},
+        {0, 1},
+        {0, 1},
+        {1, 0},
+        {0, 1},
+    };
+    vector<int> labels = {2, 0, 0, 2, 1, 2};
+
+    DataManager dm(features, labels);
+    CHECK(dm.getNumClasses() == 3);
+    CHECK(dm.getNumRows() == 3);
+
+    Subproblem subproblem(dm);
+    CHECK(subproblem.getLabelCounts() == LabelCounts{2, 1, 3});
+    subproblem.applySplit(0, false);
+    CHECK(subproblem.getLabelCounts() == LabelCounts{1, 0, 3});
+    subproblem.revertSplit();
+
+    DataManager paddedDm(features, labels, vector<size_t>(), 5);
+    CHECK(paddedDm.getNumClasses() == 5);
+    Subproblem paddedSubproblem(paddedDm);
+    CHECK(paddedSubproblem.getLabelCounts() == LabelCounts{2, 1, 3, 0, 0});
+}
+
+TEST_CASE("data manager label counts match uncompressed counts")
+{
+    BinaryDataLoader bdl("data/test_data_medium.txt");
+    DataManager dm(bdl.getFeatures(), bdl.getLabels());
+    CHECK(dm.getNumSamples() == bdl.getLabels().size());
+    CHECK(dm.getNumRows() < dm.getNumSamples());
+
+    const vector<vector<bool>>& features = bdl.getFeatures();
+    const vector<bool>& labels = bdl.getLabels();
+    Subproblem subproblem(dm);
+    for (size_t f = 0; f < dm.getNumFeatures(); f++) {
+        for (bool value : {false, true}) {
+            LabelCounts expected = {0, 0};
+            for (size_t i = 0; i < labels.size(); i++) {
+                if (features[i][f] == value) expected[labels[i]]++;
+            }
+            subproblem.applySplit(f, value);
+            CHECK(subproblem.getLabelCounts() == expected);
+            subproblem.revertSplit();
+        }
+    }
+}
+
+TEST_CASE("data manager folds constant, duplicate and complementary features")
+{
+    vector<vector<bool>> features = {
+        {0, 1, 0, 1, 1, 0},
+        {1, 1, 1, 0, 0, 0},
+        {0, 1, 0, 1, 0, 1},
+        {1, 1, 1, 0, 1, 1},
+    };
+    vector<bool> labels = {0, 1, 0, 1};
+
+    DataManager dm(features, labels);
+    CHECK(dm.getSearchFeatures() == vector<size_t>{0, 4, 5});
+    CHECK(dm.getFeatureMultiplicity(0) == 3);
+    CHECK(dm.getFeatureMultiplicity(1) == 0);
+    CHECK(dm.getFeatureMultiplicity(2) == 0);
+    CHECK(dm.getFeatureMultiplicity(3) == 0);
+    CHECK(dm.getFeatureMultiplicity(4) == 1);
+    CHECK(dm.getFeatureMultiplicity(5) == 1);
+
+    Subproblem subproblem(dm);
+    CHECK(subproblem.getNumValidSplits() == 5);
+    subproblem.applySplit(4, true);
+    CHECK(subproblem.getValidSplits() == vector<size_t>{0, 5});
+    CHECK(subproblem.getNumValidSplits() == 4);
+    subproblem.applySplit(5, false);
+    CHECK(subproblem.getNumValidSplits() == 0);
+}
+
+TEST_CASE("data manager only collapses rows within groups")
+{
+    vector<vector<bool>> features = {
+        {0, 1},
+        {1, 1},
+        {0, 1},
+        {0, 1},
+        {1, 0},
+    };
+    vector<bool> labels = {1, 0, 0, 1, 1};
+    vector<size_t> groups = {0, 0, 1, 0, 1};
+
+    DataManager dm(features, labels, groups);
+    CHECK(dm.getNumGroups() == 2);
+    CHECK(dm.getNumRows() == 4);
+
+    // a subproblem restricted to a group returns to its group on reset
+    Subproblem subproblem(dm, &dm.getGroupMask(1, true));
+    CHECK(subproblem.getLabelCounts() == LabelCounts{1, 1});
+    subproblem.applySplit(0, false);
+    CHECK(subproblem.getLabelCounts() == LabelCounts{1, 0});
+    subproblem.reset();
+    CHECK(subproblem.getLabelCounts() == LabelCounts{1, 1});
+
+    Subproblem complement(dm, &dm.getGroupMask(1, false));
+    CHECK(complement.getLabelCounts() == LabelCounts{1, 2});
+    complement.applySplit(0, false);
+    CHECK(complement.getLabelCounts() == LabelCounts{0, 2});
+}
+
+TEST_CASE("data manager weighs samples")
+{
+    vector<vector<bool>> features = {
+        {0, 1},
+        {1, 1},
+        {0, 1},
+        {1, 0},
+        {0, 0},
+    };
+    vector<int> labels = {1, 0, 0, 1, 1};
+    vector<int> weights = {3, 1, 700, 2, 0};
+
+    // the sample of weight 0 is dropped, so x_0 = 0 implies x_1 = 1
+    DataManager dm(features, labels, vector<size_t>(), 0, weights);
+    CHECK(dm.getNumSamples() == 706);
+    CHECK(dm.getNumRows() == 3);
+
+    Subproblem subproblem(dm);
+    CHECK(subproblem.getLabelCounts() == LabelCounts{701, 5});
+    subproblem.applySplit(0, false);
+    CHECK(subproblem.getLabelCounts() == LabelCounts{700, 3});
+    CHECK(subproblem.getValidSplits().empty());
+}
+
+TEST_CASE("data manager counts weights beyond the range of int")
+{
+    vector<vector<bool>> features = {
+        {0, 1},
+        {0, 1},
+        {1, 0},
+        {1, 1},
+    };
+    vector<int> labels = {1, 1, 0, 0};
+    const long long weight = numeric_limits<int>::max();
+    vector<int> weights = {static_cast<int>(weight), static_cast<int>(weight), 5, 3};
+
+    DataManager dm(features, labels, vector<size_t>(), 0, weights);
+    CHECK(dm.getNumSamples() == 2 * weight + 8);
+    Subproblem subproblem(dm);
+    CHECK(subproblem.getLabelCounts() == LabelCounts{8, 2 * weight});
+    subproblem.applySplit(0, false);
+    CHECK(subproblem.getLabelCounts() == LabelCounts{0, 2 * weight});
+}
+
+TEST_CASE("data manager rejects data without samples of positive weight")
+{
+    vector<vector<bool>> features = {
+        {0, 1},
+        {1, 0},
+    };
+    vector<int> labels = {1, 0};
+    vector<int> weights = {0, 0};
+
+    CHECK_THROWS_AS(DataManager(features, labels, vector<size_t>(), 0, weights), std::invalid_argument);
+    CHECK_THROWS_AS(DataManager(2, {0, 1, 2}, {1, 0}, labels, vector<size_t>(), 0, weights), std::invalid_argument);
+}
+
+TEST_CASE("data manager rejects data without samples")
+{
+    CHECK_THROWS_AS(DataManager(vector<vector<bool>>(), vector<int>()), std::invalid_argument);
+    CHECK_THROWS_AS(DataManager(5, {0}, {}, vector<int>()), std::invalid_argument);
+}
+
+TEST_CASE("data manager reads sparse features")
+{
+    BinaryDataLoader bdl("data/test_data_medium.txt");
+    const vector<vector<bool>>& features = bdl.getFeatures();
+    vector<int> labels(bdl.getLabels().begin(), bdl.getLabels().end());
+
+    // the 1 features of each sample, in reverse order and with duplicates
+    vector<size_t> indptr = {0};
+    vector<size_t> indices;
+    for (const vector<bool>& sample : features) {
+        for (size_t f = sample.size(); f-- > 0;) {
+            if (!sample[f]) continue;
+            indices.push_back(f);
+            if (f % 3 == 0) indices.push_back(f);
+        }
+        indptr.push_back(indices.size());
+    }
+
+    DataManager dm(features[0].size(), indptr, indices, labels);
+    DataManager denseDm(features, labels);
+    CHECK(dm.getNumRows() == denseDm.getNumRows());
+    CHECK(dm.getSearchFeatures() == denseDm.getSearchFeatures());
+    for (size_t f = 0; f < dm.getNumFeatures(); f++) {
+        CHECK(dm.getFeatureMultiplicity(f) == denseDm.getFeatureMultiplicity(f));
+    }
+
+    Subproblem subproblem(dm);
+    Subproblem denseSubproblem(denseDm);
+    for (size_t f = 0; f < dm.getNumFeatures(); f++) {
+        for (bool value : {false, true}) {
+            subproblem.applySplit(f, value);
+            denseSubproblem.applySplit(f, value);
+            CHECK(subproblem.getLabelCounts() == denseSubproblem.getLabelCounts());
+            subproblem.revertSplit();
+            denseSubproblem.revertSplit();
+        }
+    }
+}
@@ -0,0 +1,90 @@
+#include <vector>
+#include "doctest/doctest.h"
+
+#include "data/threshold_binarizer.h"
+#include "data/data_manager.h"
+#include "subproblem.h"
+
+using namespace std;
+
+TEST_CASE("threshold binarizer uses midpoints between unique values")
+{
+    vector<vector<double>> values = {
+        {1.0, 5.0},
+        {3.0, 5.0},
+        {2.0, 5.0},
+        {3.0, 5.0},
+        {-1.0, 5.0},
+    };
+
+    ThresholdBinarizer binarizer(values);
+    CHECK(binarizer.getNumSamples() == 5);
+    CHECK(binarizer.getNumColumns() == 2);
+    // the constant column has no thresholds
+    REQUIRE(binarizer.getNumFeatures() == 3);
+    CHECK(binarizer.getFirstFeature(1) == 3);
+    CHECK(binarizer.getThresholds()[0].column == 0);
+    CHECK(binarizer.getThresholds()[0].threshold == 0.0);
+    CHECK(binarizer.getThresholds()[1].threshold == 1.5);
+    CHECK(binarizer.getThresholds()[2].threshold == 2.5);
+    CHECK(binarizer.getBins()[0] == vector<unsigned>{1, 0});
+    CHECK(binarizer.getBins()[1] == vector<unsigned>{3, 0});
+    CHECK(binarizer.getBins()[4] == vector<unsigned>{0, 0});
+    CHECK(binarizer.getFeatureNames()[1] == "x0>1.5");
+}
+
+TEST_CASE("threshold binarizer uses midpoints below quantiles")
+{
+    vector<vector<double>> values;
+    for (int i = 0; i < 100; i++) values.push_back({static_cast<double>(i % 50)});
+
+    ThresholdBinarizer binarizer(values, 4);
+    REQUIRE(binarizer.getNumFeatures() == 3);
+    CHECK(binarizer.getThresholds()[0].threshold == 11.5);
+    CHECK(binarizer.getThresholds()[1].threshold == 24.5);
+    CHECK(binarizer.getThresholds()[2].threshold == 36.5);
+
+    // columns with few unique values keep all their midpoints
+    ThresholdBinarizer fewValues({{0.0}, {1.0}, {1.0}, {2.0}}, 4);
+    CHECK(fewValues.getNumFeatures() == 2);
+}
+
+TEST_CASE("data manager builds threshold feature masks")
+{
+    vector<vector<double>> values = {
+        {0.5, 1.0},
+        {0.5, 1.0},
+        {1.5, 2.0},
+        {2.5, 1.0},
+        {2.5, 3.0},
+        {1.5, 1.0},
+    };
+    vector<int> labels = {0, 0, 1, 1, 0, 1};
+    ThresholdBinarizer binarizer(values);
+
+    // rows and masks must equal those of the dense binary features
+    vector<vector<bool>> features(values.size());
+    for (size_t i = 0; i < values.size(); i++) {
+        for (const FeatureThreshold& threshold : binarizer.getThresholds()) {
+            features[i].push_back(values[i][threshold.column] > threshold.threshold);
+        }
+    }
+
+    DataManager dm(binarizer, labels);
+    DataManager denseDm(features, labels);
+    CHECK(dm.getNumFeatures() == 4);
+    CHECK(dm.getNumRows() == denseDm.getNumRows());
+    CHECK(dm.getSearchFeatures() == denseDm.getSearchFeatures());
+
+    Subproblem subproblem(dm);
+    Subproblem denseSubproblem(denseDm);
+    for (size_t f = 0; f < dm.getNumFeatures(); f++) {
+        for (bool value : {false, true}) {
+            subproblem.applySplit(f, value);
+            denseSubproblem.applySplit(f, value);
+            CHECK(subproblem.getLabelCounts() == denseSubproblem.getLabelCounts());
+            subproblem.revertSplit();
+            denseSubproblem.revertSplit();
+        }
+    }
+}
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import maptree
+
+ALPHA = 0.95
+BETA = 0.5
+RHO = [2.5, 2.5]
+
+
+def make_data():
+    rng = np.random.RandomState(0)
+    features = rng.randint(0, 2, size=(50, 5)).astype(bool)
+    labels = features[:, 0] & ~features[:, 1]
+    return features, labels
+
+
+@pytest.mark.parametrize("dtype", [bool, int, np.int32, float, np.float32])
+def test_search_accepts_labels_of_any_numeric_dtype(dtype):
+    features, labels = make_data()
+    expected = maptree.search(features, labels, ALPHA, BETA, RHO)
+    sol = maptree.search(features, labels.astype(dtype), ALPHA, BETA, RHO)
+    assert sol.tree == expected.tree
+    assert sol.ub == pytest.approx(expected.ub)
+
+
+def test_search_accepts_label_lists():
+    features, labels = make_data()
+    expected = maptree.search(features, labels, ALPHA, BETA, RHO)
+    for values in [labels.tolist(), labels.astype(int).tolist(), labels.astype(float).tolist()]:
+        assert maptree.search(features, values, ALPHA, BETA, RHO).tree == expected.tree
+
+
+def test_cross_validate_accepts_float_labels():
+    features, labels = make_data()
+    folds = np.arange(len(labels)) % 2
+    expected = maptree.cross_validate(features, labels, folds, ALPHA, BETA, RHO)
+    results = maptree.cross_validate(features, labels.astype(float), folds, ALPHA, BETA, RHO)
+    assert [r.solution.tree for r in results] == [r.solution.tree for r in expected]
+    assert [r.test_acc for r in results] == [r.test_acc for r in expected]
+
+
+@pytest.mark.parametrize("values", [[0.5, 1.0], [-1.0, 0.0], [2.0, 0.0], [float("nan"), 1.0]])
+def test_search_rejects_labels_that_are_not_classes(values):
+    features = np.array([[True], [False]])
+    with pytest.raises(ValueError):
+        maptree.search(features, values, ALPHA, BETA, RHO)
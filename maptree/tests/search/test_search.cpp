@@ -1,9 +1,17 @@
 #include <iostream>
 #include <array>
+#include <chrono>
+#include <cstdio>
+#include <limits>
+#include <random>
+#include <stdexcept>
+#include <string>
 
 #include "doctest/doctest.h"
 // #include "search/bnb_map_search.h"
 #include "search/befs_map_search.h"
+#include "search/cross_validation.h"
+#include "search/hyperparameter_sweep.h"
 #include "data/binary_data_loader.h"
 
 using namespace std;
@@ -32,7 +40,7 @@ TEST_CASE("search test on small dataset")
     BinaryDataLoader bdl("data/test_data_small.txt");
     double alpha = 0.95;
     double beta = 0.5;
-    array<double, 2> rho = {1, 1};
+    vector<double> rho = {1, 1};
 
     DataManager dm(bdl.getFeatures(), bdl.getLabels());
     TreeLikelihood likelihood(rho);
@@ -53,7 +61,7 @@ TEST_CASE("search test on medium dataset")
     BinaryDataLoader bdl("data/test_data_medium.txt");
     double alpha = 0.95;
     double beta = 0.5;
-    array<double, 2> rho = {2.5, 2.5};
+    vector<double> rho = {2.5, 2.5};
 
     DataManager dm(bdl.getFeatures(), bdl.getLabels());
     TreeLikelihood likelihood(rho);
@@ -63,4 +71,459 @@ TEST_CASE("search test on medium dataset")
     Solution befsResult = befsSearch.search();
     CHECK(befsResult.upperBound == doctest::Approx(66.006945));
 
+    BestFirstSearchMAPSearch exactSearch(dm, likelihood, prior,
+        BestFirstSearchMAPSearch::INF_EXPANSIONS, BestFirstSearchMAPSearch::INF_TIME_LIMIT, true);
+    Solution exactResult = exactSearch.search();
+    CHECK(exactResult.upperBound == doctest::Approx(66.006945));
+    CHECK(exactResult.treeRepresentation == befsResult.treeRepresentation);
+
+}
+
+TEST_CASE("search test with multi-class labels")
+{
+    // the positive samples of the medium dataset are split into two classes
+    // by x_8
+    BinaryDataLoader bdl("data/test_data_medium.txt");
+    const vector<vector<bool>>& features = bdl.getFeatures();
+    vector<int> labels;
+    for (size_t i = 0; i < features.size(); i++) {
+        labels.push_back(bdl.getLabels()[i] ? (features[i][8] ? 2 : 1) : 0);
+    }
+
+    DataManager dm(features, labels);
+    TreeLikelihood likelihood({2.5, 2.5, 2.5});
+    BCARTTreePrior prior(0.95, 0.5);
+
+    BestFirstSearchMAPSearch befsSearch(dm, likelihood, prior);
+    Solution befsResult = befsSearch.search();
+    CHECK(befsResult.lowerBound == doctest::Approx(befsResult.upperBound));
+    CHECK(befsResult.treeRepresentation.find('8') != std::string::npos);
+
+    BestFirstSearchMAPSearch exactSearch(dm, likelihood, prior,
+        BestFirstSearchMAPSearch::INF_EXPANSIONS, BestFirstSearchMAPSearch::INF_TIME_LIMIT, true);
+    Solution exactResult = exactSearch.search();
+    CHECK(exactResult.upperBound == doctest::Approx(befsResult.upperBound));
+    CHECK(exactResult.treeRepresentation == befsResult.treeRepresentation);
+}
+
+TEST_CASE("search test with redundant features")
+{
+    // small dataset with a constant feature, a copy of x_2 and the complement
+    // of x_3 appended; the log posterior still counts every valid split
+    BinaryDataLoader bdl("data/test_data_small.txt");
+    vector<vector<bool>> features = bdl.getFeatures();
+    for (vector<bool>& sample : features) {
+        sample.push_back(true);
+        sample.push_back(sample[2]);
+        sample.push_back(!sample[3]);
+    }
+
+    DataManager dm(features, bdl.getLabels());
+    TreeLikelihood likelihood({1, 1});
+    BCARTTreePrior prior(0.95, 0.5);
+
+    BestFirstSearchMAPSearch befsSearch(dm, likelihood, prior);
+    Solution befsResult = befsSearch.search();
+    CHECK(befsResult.upperBound == doctest::Approx(14.271709));
+    CHECK(befsResult.treeRepresentation == "(2(1))");
+}
+
+TEST_CASE("search test with partition-equivalent splits")
+{
+    // x_4 = x_0 & x_2 and x_5 = x_1 | !x_3 coincide with other features in
+    // some subproblems, where their splits share AND nodes
+    BinaryDataLoader bdl("data/test_data_medium.txt");
+    vector<vector<bool>> features = bdl.getFeatures();
+    for (vector<bool>& sample : features) {
+        sample.push_back(sample[0] && sample[2]);
+        sample.push_back(sample[1] || !sample[3]);
+    }
+
+    DataManager dm(features, bdl.getLabels());
+    TreeLikelihood likelihood({2.5, 2.5});
+    BCARTTreePrior prior(0.95, 0.5);
+
+    BestFirstSearchMAPSearch befsSearch(dm, likelihood, prior);
+    Solution befsResult = befsSearch.search();
+    CHECK(befsResult.upperBound == doctest::Approx(67.164444));
+}
+
+TEST_CASE("search statistics")
+{
+    BinaryDataLoader bdl("data/test_data_medium.txt");
+    DataManager dm(bdl.getFeatures(), bdl.getLabels());
+    TreeLikelihood likelihood({2.5, 2.5});
+    BCARTTreePrior prior(0.95, 0.5);
+
+    BestFirstSearchMAPSearch befsSearch(dm, likelihood, prior, 50);
+    SearchStats stats = befsSearch.search().stats;
+    CHECK(stats.numExpansions == 50);
+    CHECK(stats.numOrNodes == stats.numCacheMisses + 1);
+    CHECK(stats.numCacheHits + stats.numCacheMisses >= 2 * stats.numAndNodes);
+    CHECK(stats.numStructureCacheMisses + stats.numStructureCacheHits == stats.numExpansions);
+    CHECK(stats.peakGraphMemory >= stats.numOrNodes * sizeof(OrNode) + stats.numAndNodes * sizeof(AndNode));
+    if (!SearchStats::TIMERS_ENABLED) {
+        CHECK(stats.expandTime == 0.0);
+    }
+}
+
+TEST_CASE("search progress and trajectory")
+{
+    BinaryDataLoader bdl("data/test_data_medium.txt");
+    DataManager dm(bdl.getFeatures(), bdl.getLabels());
+    TreeLikelihood likelihood({2.5, 2.5});
+    BCARTTreePrior prior(0.95, 0.5);
+
+    std::vector<SearchProgress> reports;
+    BestFirstSearchMAPSearch befsSearch(dm, likelihood, prior, 50);
+    befsSearch.setProgressCallback(
+        [&reports](const SearchProgress& progress) { reports.push_back(progress); },
+        10
+    );
+    Solution befsResult = befsSearch.search();
+
+    // the trajectory starts before the first expansion, ends with the result
+    // and its bounds never get worse
+    const SearchTrajectory& trajectory = befsResult.trajectory;
+    REQUIRE(trajectory.lowerBounds.size() >= 2);
+    CHECK(trajectory.numExpansions.front() == 0);
+    CHECK(trajectory.numExpansions.back() == 50);
+    CHECK(trajectory.lowerBounds.back() == befsResult.lowerBound);
+    CHECK(trajectory.upperBounds.back() == befsResult.upperBound);
+    for (size_t i = 1; i < trajectory.lowerBounds.size(); ++i) {
+        CHECK(trajectory.lowerBounds[i] >= trajectory.lowerBounds[i - 1]);
+        CHECK(trajectory.upperBounds[i] <= trajectory.upperBounds[i - 1]);
+    }
+
+    // the callback is called at least every 10 expansions and at the end
+    REQUIRE(reports.size() >= 6);
+    CHECK(reports.back().numExpansions == 50);
+    CHECK(reports.back().upperBound == befsResult.upperBound);
+    CHECK(reports.back().treeRepresentation == befsResult.treeRepresentation);
+}
+
+TEST_CASE("search cancellation and fractional time limit")
+{
+    BinaryDataLoader bdl("data/test_data_medium.txt");
+    DataManager dm(bdl.getFeatures(), bdl.getLabels());
+    TreeLikelihood likelihood({2.5, 2.5});
+    BCARTTreePrior prior(0.95, 0.5);
+
+    // a cancelled token stops the search before its first expansion
+    CancellationToken token;
+    token.cancel();
+    BestFirstSearchMAPSearch cancelledSearch(dm, likelihood, prior);
+    cancelledSearch.setCancellationToken(&token);
+    Solution cancelledResult = cancelledSearch.search();
+    CHECK(cancelledResult.stats.numExpansions == 0);
+    CHECK(cancelledResult.lowerBound <= cancelledResult.upperBound);
+
+    // an exception thrown by the interrupt check aborts the search
+    BestFirstSearchMAPSearch interruptedSearch(dm, likelihood, prior);
+    interruptedSearch.setInterruptCheck([]() { throw std::runtime_error("interrupted"); }, 0.0);
+    CHECK_THROWS_AS(interruptedSearch.search(), std::runtime_error);
+
+    // a sub-second time limit stops the search long before it is solved
+    BestFirstSearchMAPSearch timedSearch(dm, likelihood, prior,
+        BestFirstSearchMAPSearch::INF_EXPANSIONS, 1e-9);
+    CHECK(timedSearch.search().stats.numExpansions == 1);
+}
+
+TEST_CASE("search time limit including destruction")
+{
+    // the explicit graph grows large within the time limit, and freeing it
+    // must not delay the return from a search object destroyed right after
+    TreeLikelihood likelihood({2.5, 2.5});
+    BCARTTreePrior prior(0.95, 0.5);
+    std::mt19937 generator(0);
+    vector<vector<bool>> features(400, vector<bool>(40));
+    vector<int> labels(400);
+    for (size_t i = 0; i < features.size(); i++) {
+        for (size_t j = 0; j < features[i].size(); j++) features[i][j] = generator() & 1;
+        labels[i] = generator() & 1;
+    }
+    DataManager dm(features, labels);
+
+    double timeLimit = 0.3;
+    auto startTime = std::chrono::steady_clock::now();
+    {
+        BestFirstSearchMAPSearch befsSearch(dm, likelihood, prior,
+            BestFirstSearchMAPSearch::INF_EXPANSIONS, timeLimit);
+        befsSearch.search();
+    }
+    double elapsedTime = std::chrono::duration<double>(std::chrono::steady_clock::now() - startTime).count();
+    CHECK(elapsedTime < timeLimit + 0.1);
+}
+
+TEST_CASE("search checkpoint and restore")
+{
+    BinaryDataLoader bdl("data/test_data_medium.txt");
+    DataManager dm(bdl.getFeatures(), bdl.getLabels());
+    TreeLikelihood likelihood({2.5, 2.5});
+    BCARTTreePrior prior(0.95, 0.5);
+    const std::string path = "test_search_checkpoint.bin";
+
+    for (bool exactCache : {false, true}) {
+        BestFirstSearchMAPSearch uninterruptedSearch(dm, likelihood, prior, 200,
+            BestFirstSearchMAPSearch::INF_TIME_LIMIT, exactCache);
+        Solution uninterruptedResult = uninterruptedSearch.search();
+
+        // a search interrupted after 80 expansions and continued from its
+        // checkpoint up to the same limit returns the same solution
+        BestFirstSearchMAPSearch interruptedSearch(dm, likelihood, prior, 80,
+            BestFirstSearchMAPSearch::INF_TIME_LIMIT, exactCache);
+        interruptedSearch.setCheckpoint(path, 1e9);
+        interruptedSearch.search();
+
+        BestFirstSearchMAPSearch resumedSearch(dm, likelihood, prior, 200,
+            BestFirstSearchMAPSearch::INF_TIME_LIMIT, exactCache);
+        resumedSearch.restoreCheckpoint(path);
+        Solution resumedResult = resumedSearch.search();
+
+        CHECK(resumedResult.lowerBound == uninterruptedResult.lowerBound);
+        CHECK(resumedResult.upperBound == uninterruptedResult.upperBound);
+        CHECK(resumedResult.treeRepresentation == uninterruptedResult.treeRepresentation);
+        CHECK(resumedResult.stats.numExpansions == 200);
+        CHECK(resumedResult.stats.numOrNodes == uninterruptedResult.stats.numOrNodes);
+        CHECK(resumedResult.stats.numAndNodes == uninterruptedResult.stats.numAndNodes);
+        // the trajectory before the checkpoint is carried over
+        CHECK(resumedResult.trajectory.numExpansions.front() == 0);
+        CHECK(resumedResult.trajectory.lowerBounds.front() == uninterruptedResult.trajectory.lowerBounds.front());
+
+        // checkpoints cannot be restored into a search with another cache mode
+        BestFirstSearchMAPSearch otherSearch(dm, likelihood, prior, 200,
+            BestFirstSearchMAPSearch::INF_TIME_LIMIT, !exactCache);
+        CHECK_THROWS_AS(otherSearch.restoreCheckpoint(path), std::runtime_error);
+    }
+
+    // nor into a search of the same size with other labels, prior, likelihood
+    // or rows
+    BestFirstSearchMAPSearch savedSearch(dm, likelihood, prior, 80);
+    savedSearch.saveCheckpoint(path);
+    vector<bool> otherLabels(bdl.getLabels());
+    otherLabels[0] = !otherLabels[0];
+    DataManager otherDm(bdl.getFeatures(), otherLabels);
+    REQUIRE(otherDm.getNumRows() == dm.getNumRows());
+    TreeLikelihood otherLikelihood({5.0, 5.0});
+    BCARTTreePrior otherPrior(0.95, 0.6);
+    BCARTDegenTreePrior degenPrior(0.95, 0.5);
+    FixedBitset rowMask(dm.getNumRows());
+    for (size_t r = 1; r < dm.getNumRows(); r++) rowMask.setBit(r);
+
+    BestFirstSearchMAPSearch otherDataSearch(otherDm, likelihood, prior);
+    CHECK_THROWS_AS(otherDataSearch.restoreCheckpoint(path), std::runtime_error);
+    BestFirstSearchMAPSearch otherLikelihoodSearch(dm, otherLikelihood, prior);
+    CHECK_THROWS_AS(otherLikelihoodSearch.restoreCheckpoint(path), std::runtime_error);
+    BestFirstSearchMAPSearch otherPriorSearch(dm, likelihood, otherPrior);
+    CHECK_THROWS_AS(otherPriorSearch.restoreCheckpoint(path), std::runtime_error);
+    BestFirstSearchMAPSearch degenPriorSearch(dm, likelihood, degenPrior);
+    CHECK_THROWS_AS(degenPriorSearch.restoreCheckpoint(path), std::runtime_error);
+    BestFirstSearchMAPSearch otherRowsSearch(dm, likelihood, prior, BestFirstSearchMAPSearch::INF_EXPANSIONS,
+        BestFirstSearchMAPSearch::INF_TIME_LIMIT, false, nullptr, &rowMask);
+    CHECK_THROWS_AS(otherRowsSearch.restoreCheckpoint(path), std::runtime_error);
+    BestFirstSearchMAPSearch sameSearch(dm, likelihood, prior);
+    sameSearch.restoreCheckpoint(path);
+    CHECK(sameSearch.search().stats.numExpansions > 80);
+    std::remove(path.c_str());
+}
+
+TEST_CASE("hyperparameter sweep")
+{
+    BinaryDataLoader bdl("data/test_data_medium.txt");
+    DataManager dm(bdl.getFeatures(), bdl.getLabels());
+    TreeLikelihood likelihood({2.5, 2.5});
+    BCARTTreePrior prior1(0.95, 0.5);
+    BCARTTreePrior prior2(0.8, 2.0);
+    BCARTTreePrior prior3(0.99, 0.2);
+    std::vector<const TreePrior *> priors = {&prior1, &prior2, &prior3};
+
+    for (bool exactCache : {false, true}) {
+        std::vector<Solution> sweepResults = sweepBeFS(dm, likelihood, priors,
+            BestFirstSearchMAPSearch::INF_EXPANSIONS, BestFirstSearchMAPSearch::INF_TIME_LIMIT, exactCache);
+        REQUIRE(sweepResults.size() == priors.size());
+
+        // sharing structure does not change the results of the searches, but
+        // later searches find most of it already computed
+        size_t numStructureCacheMisses = 0;
+        for (size_t i = 0; i < priors.size(); i++) {
+            BestFirstSearchMAPSearch befsSearch(dm, likelihood, *priors[i],
+                BestFirstSearchMAPSearch::INF_EXPANSIONS, BestFirstSearchMAPSearch::INF_TIME_LIMIT, exactCache);
+            Solution befsResult = befsSearch.search();
+            CHECK(sweepResults[i].lowerBound == befsResult.lowerBound);
+            CHECK(sweepResults[i].upperBound == befsResult.upperBound);
+            CHECK(sweepResults[i].treeRepresentation == befsResult.treeRepresentation);
+            CHECK(sweepResults[i].stats.numStructureCacheMisses <= befsResult.stats.numStructureCacheMisses);
+            numStructureCacheMisses += befsResult.stats.numStructureCacheMisses;
+        }
+        size_t numSweepStructureCacheMisses = 0;
+        for (const Solution& sweepResult : sweepResults) {
+            numSweepStructureCacheMisses += sweepResult.stats.numStructureCacheMisses;
+        }
+        CHECK(numSweepStructureCacheMisses < numStructureCacheMisses);
+    }
+}
+
+TEST_CASE("search test with weights near 2^30")
+{
+    // the log posterior of a perfect split grows with the weight of the
+    // samples it separates, also once their total weight exceeds the range
+    // of int
+    vector<vector<bool>> features = {
+        {0, 1},
+        {0, 1},
+        {1, 0},
+        {1, 1},
+    };
+    vector<int> labels = {1, 1, 0, 0};
+    TreeLikelihood likelihood({2.5, 2.5});
+    BCARTTreePrior prior(0.95, 0.5);
+
+    double previousLowerBound = 0.0;
+    for (int weight : {1 << 29, 1 << 30, numeric_limits<int>::max()}) {
+        vector<int> weights = {weight, weight, 5, 3};
+        DataManager dm(features, labels, vector<size_t>(), 0, weights);
+        BestFirstSearchMAPSearch befsSearch(dm, likelihood, prior);
+        Solution result = befsSearch.search();
+
+        // the stump on x_0 separates the labels; x_1 can still split its
+        // right leaf
+        LabelCounts left = {0, 2 * static_cast<long long>(weight)};
+        LabelCounts right = {8, 0};
+        double stump = -(prior.logSplitProb(0, 2, 2) + prior.logStopProb(1, 0, 2) + prior.logStopProb(1, 1, 2)
+            + likelihood.logLikelihood(left) + likelihood.logLikelihood(right));
+        CHECK(result.treeRepresentation == "(0)");
+        CHECK(result.upperBound == doctest::Approx(stump));
+        CHECK(result.lowerBound > previousLowerBound);
+        previousLowerBound = result.lowerBound;
+    }
+}
+
+TEST_CASE("search test on small random datasets")
+{
+    // a leaf without valid splits is solved as soon as it is expanded, and
+    // its parents' lower bounds must follow so that the search never descends
+    // into a solved node
+    TreeLikelihood likelihood({2.5, 2.5});
+    BCARTTreePrior prior(0.95, 0.5);
+    unsigned int state = 12345;
+    auto nextBit = [&state]() {
+        state = state * 1103515245u + 12345u;
+        return (state >> 16) & 1u;
+    };
+    for (size_t numFeatures : {2, 3}) {
+        for (int seed = 0; seed < 20; seed++) {
+            vector<vector<bool>> features(126, vector<bool>(numFeatures));
+            vector<int> labels(126);
+            for (size_t i = 0; i < features.size(); i++) {
+                for (size_t j = 0; j < numFeatures; j++) features[i][j] = nextBit();
+                labels[i] = nextBit();
+            }
+            DataManager dm(features, labels);
+            BestFirstSearchMAPSearch befsSearch(dm, likelihood, prior);
+            Solution result = befsSearch.search();
+            CHECK(result.lowerBound == result.upperBound);
+        }
+    }
+}
+
+TEST_CASE("cross-validation over sample groups")
+{
+    BinaryDataLoader bdl("data/test_data_medium.txt");
+    const vector<vector<bool>>& features = bdl.getFeatures();
+    const vector<bool>& labels = bdl.getLabels();
+    const size_t numFolds = 3;
+    vector<size_t> folds(labels.size());
+    for (size_t i = 0; i < folds.size(); i++) folds[i] = i % numFolds;
+
+    DataManager dm(features, labels, folds);
+    TreeLikelihood likelihood({2.5, 2.5});
+    BCARTTreePrior prior(0.95, 0.5);
+    vector<FoldResult> results = crossValidateBeFS(dm, likelihood, prior);
+    REQUIRE(results.size() == numFolds);
+
+    for (size_t fold = 0; fold < numFolds; fold++) {
+        // searching the training rows of the shared data manager is the same
+        // as searching a copy of the training samples
+        vector<vector<bool>> trainFeatures;
+        vector<bool> trainLabels;
+        for (size_t i = 0; i < folds.size(); i++) {
+            if (folds[i] == fold) continue;
+            trainFeatures.push_back(features[i]);
+            trainLabels.push_back(labels[i]);
+        }
+        DataManager trainDm(trainFeatures, trainLabels);
+        BestFirstSearchMAPSearch befsSearch(trainDm, likelihood, prior);
+        Solution befsResult = befsSearch.search();
+
+        const FoldResult& result = results[fold];
+        CHECK(result.solution.upperBound == doctest::Approx(befsResult.upperBound));
+        CHECK(result.solution.treeRepresentation == befsResult.treeRepresentation);
+        CHECK(result.numTrainSamples == trainLabels.size());
+        CHECK(result.numTrainSamples + result.numTestSamples == labels.size());
+        CHECK(result.numTestCorrect <= result.numTestSamples);
+        CHECK(result.trainLogLikelihood < 0.0);
+        CHECK(result.testLogLikelihood < 0.0);
+    }
+}
+
+TEST_CASE("cross-validation with a fold empty under a split")
+{
+    // the held-out fold has no samples with x_0 = 1 and x_2 = 1, so the tree
+    // learned on the other fold splits nodes without held-out samples
+    vector<vector<bool>> features;
+    vector<int> labels;
+    vector<size_t> folds;
+    for (size_t i = 0; i < 40; i++) {
+        features.push_back({(i & 1) != 0, (i & 2) != 0, (i & 4) != 0});
+        labels.push_back((i & 1) ^ ((i >> 2) & 1));
+        folds.push_back(i % 4 == 0 ? 1 : 0);
+    }
+
+    DataManager dm(features, labels, folds);
+    TreeLikelihood likelihood({2.5, 2.5});
+    BCARTTreePrior prior(0.95, 0.5);
+    vector<FoldResult> results = crossValidateBeFS(dm, likelihood, prior);
+    REQUIRE(results.size() == 2);
+
+    for (const FoldResult& result : results) {
+        CHECK(result.numTrainSamples + result.numTestSamples == labels.size());
+        CHECK(result.numTrainCorrect <= result.numTrainSamples);
+        CHECK(result.numTestCorrect <= result.numTestSamples);
+        CHECK(result.trainLogLikelihood < 0.0);
+        CHECK(result.testLogLikelihood < 0.0);
+    }
+}
+
+TEST_CASE("search test with sample weights")
+{
+    // weighing each sample matches repeating it that many times
+    BinaryDataLoader bdl("data/test_data_medium.txt");
+    const vector<vector<bool>>& features = bdl.getFeatures();
+    vector<int> labels(bdl.getLabels().begin(), bdl.getLabels().end());
+    vector<int> weights;
+    vector<vector<bool>> expandedFeatures;
+    vector<int> expandedLabels;
+    for (size_t i = 0; i < features.size(); i++) {
+        weights.push_back((i * 7) % 4);
+        for (int w = 0; w < weights.back(); w++) {
+            expandedFeatures.push_back(features[i]);
+            expandedLabels.push_back(labels[i]);
+        }
+    }
+
+    TreeLikelihood likelihood({2.5, 2.5});
+    BCARTTreePrior prior(0.95, 0.5);
+
+    DataManager dm(features, labels, vector<size_t>(), 0, weights);
+    DataManager expandedDm(expandedFeatures, expandedLabels);
+    CHECK(dm.getNumSamples() == expandedDm.getNumSamples());
+    CHECK(dm.getNumRows() == expandedDm.getNumRows());
+
+    BestFirstSearchMAPSearch search(dm, likelihood, prior);
+    Solution result = search.search();
+    BestFirstSearchMAPSearch expandedSearch(expandedDm, likelihood, prior);
+    Solution expandedResult = expandedSearch.search();
+    CHECK(result.upperBound == expandedResult.upperBound);
+    CHECK(result.lowerBound == expandedResult.lowerBound);
+    CHECK(result.treeRepresentation == expandedResult.treeRepresentation);
 }
@@ -1,24 +1,38 @@
 from argparse import ArgumentParser
 
-from experiments.experiments.fig1.runner import run as run_fig1
-from experiments.experiments.fig2.runner import run as run_fig2
-from experiments.experiments.fig3.runner import run as run_fig3
+from experiments.experiments.fig1.runner import get_tasks as get_fig1_tasks
+from experiments.experiments.fig2.runner import get_tasks as get_fig2_tasks
+from experiments.experiments.fig3.runner import get_tasks as get_fig3_tasks
 
-from experiments.globals import CP4IM_DATASET_NAMES, SYNTH_NUM_TREES
+from experiments.globals import CP4IM_DATASET_NAMES, SYNTH_NUM_TREES, get_results_store
+from experiments.scheduler import run_tasks
 
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('--job_index', '-j', default=None, type=int)
+    parser.add_argument('--num_cpus', '-c', default=None, type=int,
+                        help="number of runs to execute concurrently (default: all physical cores)")
+    parser.add_argument('--memory_gb', '-m', default=None, type=float,
+                        help="estimated memory budget of concurrent runs in GB (default: unbounded)")
     args = parser.parse_args()
 
     jobs = list(range(52)) if args.job_index is None else [args.job_index]
+    # each job of a cluster array stores its results in a file of its own
+    if args.job_index is not None:
+        get_results_store(f"job{args.job_index}")
 
+    # the runs of all jobs are scheduled together, and each run's results are
+    # stored as soon as it completes
+    tasks = []
     for job in jobs:
         if job < 2 * len(CP4IM_DATASET_NAMES):
-            run = run_fig1 if (job % 2 == 0) else run_fig2
-            run(CP4IM_DATASET_NAMES[job // 2])
+            get_tasks = get_fig1_tasks if (job % 2 == 0) else get_fig2_tasks
+            tasks += get_tasks(CP4IM_DATASET_NAMES[job // 2])
         else:
             job -= 2 * len(CP4IM_DATASET_NAMES)
             tree_id = job % SYNTH_NUM_TREES
-            run_fig3(tree_id)
+            tasks += get_fig3_tasks(tree_id)
+
+    memory_budget = args.memory_gb * 2 ** 30 if args.memory_gb is not None else None
+    run_tasks(tasks, args.num_cpus, memory_budget)
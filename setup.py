@@ -1,3 +1,4 @@
+import os
 from glob import glob
 from setuptools import setup
 try:
@@ -38,6 +39,8 @@ ext_modules = [
         ALL_SOURCE_FILES,
         include_dirs=[get_pybind_include(), join("maptree", "include")],
         extra_compile_args=['-O3', '-DNDEBUG'],
+        # set MAPTREE_ENABLE_TIMERS=1 to collect per-phase search times
+        define_macros=[("MAPTREE_ENABLE_TIMERS", None)] if os.environ.get("MAPTREE_ENABLE_TIMERS") else [],
     ),
 ]
 